@@ -13,16 +13,38 @@ parser = argparse.ArgumentParser(description="Benchmark maxminddb.")
 parser.add_argument("--count", default=250000, type=int, help="number of lookups")
 parser.add_argument("--mode", default=0, type=int, help="reader mode to use")
 parser.add_argument("--file", default="GeoIP2-City.mmdb", help="path to mmdb file")
+parser.add_argument(
+    "--pointer-cache-size",
+    default=0,
+    type=int,
+    help="number of values reached through pointers to cache",
+)
+parser.add_argument(
+    "--networks",
+    action="store_true",
+    help="look up addresses in the networks of the database rather than random "
+    "IPv4 addresses. Useful with small databases, such as the test databases.",
+)
 
 args = parser.parse_args()
 
 random.seed(0)
-reader = maxminddb.open_database(args.file, args.mode)
+reader = maxminddb.open_database(
+    args.file,
+    args.mode,
+    pointer_cache_size=args.pointer_cache_size,
+)
+addresses = (
+    [str(network.network_address) for network, _ in reader] if args.networks else []
+)
 
 
 def lookup_ip_address() -> None:
     """Look up the IP."""
-    ip = socket.inet_ntoa(struct.pack("!L", random.getrandbits(32)))
+    if addresses:
+        ip = random.choice(addresses)  # noqa: S311
+    else:
+        ip = socket.inet_ntoa(struct.pack("!L", random.getrandbits(32)))
     reader.get(str(ip))
 
 
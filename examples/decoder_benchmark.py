@@ -0,0 +1,67 @@
+#!/usr/bin/python
+"""Microbenchmark for the pure Python data section decoder."""
+
+import argparse
+import timeit
+
+import maxminddb
+from maxminddb.decoder import Decoder, ExtensionDecoder, FileBufferDecoder
+
+parser = argparse.ArgumentParser(description="Benchmark maxminddb.decoder.")
+parser.add_argument("--count", default=20, type=int, help="number of passes")
+parser.add_argument("--file", default="GeoIP2-City.mmdb", help="path to mmdb file")
+parser.add_argument(
+    "--mode",
+    default=maxminddb.MODE_MMAP,
+    type=int,
+    help="pure Python reader mode to use",
+)
+parser.add_argument(
+    "--specialize-maps",
+    action="store_true",
+    help="compile specialized functions for frequently seen map layouts",
+)
+parser.add_argument(
+    "--extension",
+    action="store_true",
+    help="decode with the C extension rather than the pure Python decoder",
+)
+
+args = parser.parse_args()
+
+reader = maxminddb.Reader(args.file, args.mode)
+# The offset of the record of each network. Records shared by several
+# networks are decoded once per network, as they would be by lookups.
+offsets = [
+    reader._data_offset(reader._lookup_pointer(network.network_address)[0])  # noqa: SLF001
+    for network, _ in reader
+]
+metadata = reader.metadata()
+if args.extension:
+    decoder: Decoder = ExtensionDecoder(
+        reader._buffer,  # noqa: SLF001
+        metadata.search_tree_size + 16,
+    )
+else:
+    decoder_class = FileBufferDecoder if args.mode == maxminddb.MODE_FILE else Decoder
+    decoder = decoder_class(
+        reader._buffer,  # noqa: SLF001
+        metadata.search_tree_size + 16,
+        specialize_maps=args.specialize_maps,
+    )
+
+
+def decode_records() -> None:
+    """Decode the record of every network."""
+    decode = decoder.decode
+    for offset in offsets:
+        decode(offset)
+
+
+elapsed = timeit.timeit(
+    "decode_records()",
+    setup="from __main__ import decode_records",
+    number=args.count,
+)
+
+print(f"{int(args.count * len(offsets) / elapsed):,}", "records per second")  # noqa: T201
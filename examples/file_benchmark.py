@@ -0,0 +1,65 @@
+#!/usr/bin/python
+"""Benchmark concurrent MODE_FILE lookups with an increasing number of threads."""
+
+import argparse
+import random
+import socket
+import struct
+import threading
+import timeit
+
+import maxminddb
+import maxminddb.file
+
+parser = argparse.ArgumentParser(description="Benchmark MODE_FILE scaling.")
+parser.add_argument("--count", default=50000, type=int, help="lookups per thread")
+parser.add_argument("--file", default="GeoIP2-City.mmdb", help="path to mmdb file")
+parser.add_argument(
+    "--threads",
+    default="1,2,4,8",
+    help="comma-separated numbers of threads to benchmark",
+)
+parser.add_argument(
+    "--no-pread",
+    action="store_true",
+    help="read through a pool of file handles as on platforms without pread",
+)
+
+args = parser.parse_args()
+
+if args.no_pread:
+    maxminddb.file._HAS_PREAD = False  # noqa: SLF001
+
+random.seed(0)
+ips = [
+    socket.inet_ntoa(struct.pack("!L", random.getrandbits(32)))
+    for _ in range(args.count)
+]
+
+
+def lookup(reader: maxminddb.Reader) -> None:
+    """Look up every address in ips."""
+    get = reader.get
+    for ip in ips:
+        get(ip)
+
+
+for thread_count in (int(count) for count in args.threads.split(",")):
+    with maxminddb.open_database(args.file, maxminddb.MODE_FILE) as reader:
+        threads = [
+            threading.Thread(target=lookup, args=(reader,)) for _ in range(thread_count)
+        ]
+
+        def run(threads: list[threading.Thread] = threads) -> None:
+            """Run the lookups in each thread and wait for them."""
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        elapsed = timeit.timeit(run, number=1)
+
+    print(  # noqa: T201
+        f"{thread_count:>3} threads: {int(thread_count * args.count / elapsed):,}",
+        "lookups per second",
+    )
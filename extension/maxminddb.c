@@ -6,9 +6,11 @@
 #else
 #include <arpa/inet.h>
 #include <netinet/in.h>
+#include <sys/mman.h>
 #include <sys/socket.h>
 #include <unistd.h>
 #endif
+#include <math.h>
 #include <maxminddb.h>
 #include <stdbool.h>
 #include <structmember.h>
@@ -61,12 +63,75 @@ typedef struct {
 // Type definitions
 // =============================================================================
 
+// The number of map keys cached by a reader
+#define KEY_CACHE_SIZE 4096
+
+// The values of maxminddb.const.Mode supported by this extension
+#define MODE_AUTO 0
+#define MODE_MMAP_EXT 1
+#define MODE_MEMORY 8
+#define MODE_FD 16
+
+// The metadata is within this many bytes of the end of the database
+#define METADATA_BLOCK_MAX_SIZE 131072
+
+// The size of the separator between the search tree and the data section
+#define DATA_SECTION_SEPARATOR 16
+
+// The number of bytes Reader.warm reads between checks of its budget
+#define WARM_CHUNK_SIZE 1048576
+
+// The options for the memory map of a database opened with MODE_AUTO or
+// MODE_MMAP_EXT
+typedef struct {
+    int madvise_random;
+    int madvise_willneed;
+    int madvise_hugepage;
+    int populate;
+    int mlock_tree;
+} mmap_options;
+
+// Entry in a direct-mapped cache keyed by data section offset
+typedef struct {
+    uint32_t offset;
+    PyObject *value;
+} offset_cache_entry;
+
 // clang-format off
 typedef struct Reader_obj_struct {
     PyObject_HEAD /* no semicolon */
     MMDB_s *mmdb;
     PyObject *closed;
     reader_rwlock_t rwlock;
+    offset_cache_entry *json_cache;
+    Py_ssize_t json_cache_size;
+    offset_cache_entry *key_cache;
+    offset_cache_entry *pointer_cache;
+    Py_ssize_t pointer_cache_size;
+    offset_cache_entry *string_cache;
+    Py_ssize_t string_cache_size;
+    int immutable_records;
+    // Whether bytes values are decoded as bytes rather than bytearray. They
+    // are with immutable records, and with MODE_MEMORY and MODE_FD, where
+    // the pure Python reader was used before and returned bytes.
+    int bytes_values;
+    PyObject *map_factory;
+    PyObject *array_factory;
+    // The number of decodes and visits in progress that may call back into
+    // Python, and of warms reading the database without the GIL. The
+    // database is not closed while it is non-zero as they hold pointers into
+    // it.
+    Py_ssize_t busy;
+    // The database read with MODE_MEMORY or MODE_FD. obj is NULL when the
+    // database is a memory mapped file.
+    Py_buffer buffer;
+    // The arguments of maxminddb.reader._open_pickled after the type, or
+    // NULL if the database was not opened from a path.
+    PyObject *pickle_args;
+    PyObject *weakreflist;
+#ifndef MAXMINDDB_USE_GIL_ONLY
+    PyMutex cache_mutex;
+#endif
 } Reader_obj;
 
 typedef struct record record;
@@ -83,6 +148,9 @@ typedef struct {
     PyObject_HEAD /* no semicolon */
     Reader_obj *reader;
     struct record *next;
+    // Whether the offsets of the records are returned rather than the
+    // records.
+    int offsets;
 } ReaderIter_obj;
 
 typedef struct {
@@ -109,6 +177,9 @@ typedef struct {
     PyObject *Metadata_Type;
     PyObject *MaxMindDB_error;
     PyObject *ipaddress_ip_network;
+    // A weakref.WeakSet of the open readers, which are reset in the child
+    // process after a fork.
+    PyObject *readers;
 } maxminddb_state;
 
 // Helper function to get module state from module
@@ -137,7 +208,17 @@ static PyObject *from_map(maxminddb_state *state,
 static PyObject *from_array(maxminddb_state *state,
                             MMDB_entry_data_list_s **entry_data_list);
 static PyObject *from_uint128(const MMDB_entry_data_list_s *entry_data_list);
+static PyObject *uint128_to_pylong(uint64_t high, uint64_t low);
+static PyObject *
+decode_entry(Reader_obj *reader, const MMDB_entry_s *entry, int *status);
+static int visit_entry(Reader_obj *reader,
+                       const MMDB_entry_s *entry,
+                       PyObject *visitor,
+                       int *status);
+static PyObject *json_from_entry(maxminddb_state *state,
+                                 const MMDB_entry_s *entry);
 static int ip_converter(PyObject *obj, struct sockaddr_storage *ip_address);
+static PyObject *Reader_close(PyObject *self, PyObject *args);
 
 #ifdef __GNUC__
 #define UNUSED(x) UNUSED_##x __attribute__((__unused__))
@@ -304,89 +385,725 @@ static void reader_release_write_lock(Reader_obj *reader) {
 #endif
 }
 
+// The caches are written while only the read lock is held, so they need their
+// own lock when running without the GIL.
+static inline void reader_lock_cache(Reader_obj *reader) {
+#ifndef MAXMINDDB_USE_GIL_ONLY
+    PyMutex_Lock(&reader->cache_mutex);
+#else
+    (void)reader;
+#endif
+}
+
+static inline void reader_unlock_cache(Reader_obj *reader) {
+#ifndef MAXMINDDB_USE_GIL_ONLY
+    PyMutex_Unlock(&reader->cache_mutex);
+#else
+    (void)reader;
+#endif
+}
+
+// Marks the start and end of a read of the database that may run Python code,
+// such as map_factory or a visitor, or that releases the GIL, either of which
+// could otherwise close the database being read.
+static inline void reader_enter_busy(Reader_obj *reader) {
+    reader_lock_cache(reader);
+    reader->busy++;
+    reader_unlock_cache(reader);
+}
+
+static inline void reader_leave_busy(Reader_obj *reader) {
+    reader_lock_cache(reader);
+    // The count is reset after a fork, possibly while this thread was busy.
+    if (reader->busy > 0) {
+        reader->busy--;
+    }
+    reader_unlock_cache(reader);
+}
+
+static inline offset_cache_entry *
+offset_cache_slot(offset_cache_entry *cache, Py_ssize_t size, uint32_t offset) {
+    // Fibonacci hashing spreads the mostly sequential offsets over the table.
+    return &cache[(Py_ssize_t)((offset * UINT64_C(11400714819323198485)) %
+                               (uint64_t)size)];
+}
+
+// Closes and frees mmdb, releasing the database read with MODE_MEMORY or
+// MODE_FD.
+static void reader_close_mmdb(Reader_obj *reader, MMDB_s *mmdb) {
+    if (reader->buffer.obj != NULL) {
+        // MMDB_close would unmap the contents, which belong to the buffer.
+        mmdb->file_content = NULL;
+        PyBuffer_Release(&reader->buffer);
+    }
+    MMDB_close(mmdb);
+    free(mmdb);
+}
+
+static void offset_cache_clear(offset_cache_entry *cache, Py_ssize_t size) {
+    if (cache == NULL) {
+        return;
+    }
+    for (Py_ssize_t i = 0; i < size; i++) {
+        Py_CLEAR(cache[i].value);
+    }
+}
+
+static void offset_cache_free(offset_cache_entry **cache, Py_ssize_t size) {
+    if (*cache == NULL) {
+        return;
+    }
+    offset_cache_clear(*cache, size);
+    PyMem_Free(*cache);
+    *cache = NULL;
+}
+
+// Resets a reader in the child process after a fork. Only the forking thread
+// exists in the child, so the locks, which other threads of the parent may
+// have held, are initialized again, and the reads those threads had in
+// progress are no longer counted. Without the GIL, such threads may also
+// have been updating the caches, which are emptied.
+static void reader_after_fork(Reader_obj *reader) {
+    reader->busy = 0;
+#ifdef MAXMINDDB_USE_PTHREAD_LOCKS
+    pthread_rwlock_init(&reader->rwlock, NULL);
+#endif
+#ifndef MAXMINDDB_USE_GIL_ONLY
+    memset(&reader->cache_mutex, 0, sizeof(reader->cache_mutex));
+    offset_cache_clear(reader->key_cache, KEY_CACHE_SIZE);
+    offset_cache_clear(reader->json_cache, reader->json_cache_size);
+    offset_cache_clear(reader->pointer_cache, reader->pointer_cache_size);
+    offset_cache_clear(reader->string_cache, reader->string_cache_size);
+#endif
+}
+
+static void reader_free_caches(Reader_obj *reader) {
+    offset_cache_free(&reader->key_cache, KEY_CACHE_SIZE);
+    offset_cache_free(&reader->json_cache, reader->json_cache_size);
+    reader->json_cache_size = 0;
+    offset_cache_free(&reader->pointer_cache, reader->pointer_cache_size);
+    reader->pointer_cache_size = 0;
+    offset_cache_free(&reader->string_cache, reader->string_cache_size);
+    reader->string_cache_size = 0;
+}
+
 // =============================================================================
 // Reader implementation
 // =============================================================================
 
+// Sets *factory to NULL if it is None. Returns -1 with a TypeError set if
+// it is not callable.
+static int check_factory(const char *name, PyObject **factory) {
+    if (*factory == Py_None) {
+        *factory = NULL;
+    } else if (*factory != NULL && !PyCallable_Check(*factory)) {
+        PyErr_Format(PyExc_TypeError, "%s must be callable", name);
+        return -1;
+    }
+    return 0;
+}
+
+// Gets the contents of the database passed with MODE_MEMORY, a path, or
+// MODE_FD, a bytes-like object, file descriptor, or file object, into view.
+// Bytes-like objects are used without copying them, and file descriptors are
+// memory mapped so that processes opening the same one share its pages.
+// Returns -1 with an exception set on failure.
+static int load_database(PyObject *database, int mode, Py_buffer *view) {
+    PyObject *data = NULL;
+    if (mode == MODE_FD && PyObject_CheckBuffer(database)) {
+        data = Py_NewRef(database);
+    } else if (mode == MODE_FD && PyLong_Check(database)) {
+        PyObject *mmap = PyImport_ImportModule("mmap");
+        if (mmap == NULL) {
+            return -1;
+        }
+        // mmap.mmap(database, 0, access=mmap.ACCESS_READ). The position of
+        // the access argument differs between platforms.
+        PyObject *mmap_type = PyObject_GetAttrString(mmap, "mmap");
+        PyObject *access = PyObject_GetAttrString(mmap, "ACCESS_READ");
+        PyObject *mmap_args = Py_BuildValue("(Oi)", database, 0);
+        PyObject *mmap_kwargs = NULL;
+        if (mmap_type != NULL && access != NULL && mmap_args != NULL) {
+            mmap_kwargs = Py_BuildValue("{sO}", "access", access);
+        }
+        if (mmap_kwargs != NULL) {
+            data = PyObject_Call(mmap_type, mmap_args, mmap_kwargs);
+            Py_DECREF(mmap_kwargs);
+        }
+        Py_XDECREF(mmap_args);
+        Py_XDECREF(access);
+        Py_XDECREF(mmap_type);
+        Py_DECREF(mmap);
+    } else if (mode == MODE_FD) {
+        data = PyObject_CallMethod(database, "read", NULL);
+    } else {
+        PyObject *io = PyImport_ImportModule("io");
+        if (io == NULL) {
+            return -1;
+        }
+        PyObject *file = PyObject_CallMethod(io, "open", "Os", database, "rb");
+        Py_DECREF(io);
+        if (file == NULL) {
+            return -1;
+        }
+        data = PyObject_CallMethod(file, "read", NULL);
+        PyObject *closed = PyObject_CallMethod(file, "close", NULL);
+        Py_DECREF(file);
+        if (closed == NULL) {
+            Py_XDECREF(data);
+            return -1;
+        }
+        Py_DECREF(closed);
+    }
+    if (data == NULL) {
+        return -1;
+    }
+
+    int const status = PyObject_GetBuffer(data, view, PyBUF_SIMPLE);
+    Py_DECREF(data);
+    return status;
+}
+
+// Returns the name of the database used in error messages, as the pure
+// Python reader does.
+static PyObject *database_name(PyObject *database, int mode) {
+    if (mode != MODE_FD) {
+        return PyObject_Str(database);
+    }
+    if (PyLong_Check(database)) {
+        return PyUnicode_FromFormat("<fd %S>", database);
+    }
+    PyObject *name = PyObject_GetAttrString(database, "name");
+    if (name != NULL || !PyErr_ExceptionMatches(PyExc_AttributeError)) {
+        return name;
+    }
+    PyErr_Clear();
+    return PyUnicode_FromFormat("<%R>", (PyObject *)Py_TYPE(database));
+}
+
+// Sets *value to the value of key in the metadata map, which must have the
+// given type.
+static int metadata_value(MMDB_entry_s *metadata,
+                          const char *key,
+                          uint32_t type,
+                          MMDB_entry_data_s *value) {
+    const char *path[] = {key, NULL};
+    int const status = MMDB_aget_value(metadata, value, path);
+    if (status != MMDB_SUCCESS) {
+        return status;
+    }
+    if (!value->has_data || value->type != type) {
+        return MMDB_INVALID_METADATA_ERROR;
+    }
+    return MMDB_SUCCESS;
+}
+
+// Sets up mmdb to read the database in content, as MMDB_open does for a
+// memory mapped file. libmaxminddb cannot open a database in memory, so only
+// the fields that libmaxminddb reads after MMDB_open returns are set.
+// These are:
+//
+// * file_content and metadata.node_count, by MMDB_read_node and the lookups.
+// * file_size, with file_content, by MMDB_close to unmap the file.
+//   reader_close_mmdb clears file_content first, so the buffer is never
+//   unmapped.
+// * data_section and data_section_size, by the lookups, MMDB_read_node, and
+//   MMDB_get_entry_data_list and MMDB_aget_value.
+// * metadata_section and metadata_section_size, by
+//   MMDB_get_metadata_as_entry_data_list, which Reader.metadata uses.
+// * metadata.ip_version, depth, and ipv4_start_node, by the lookups.
+// * full_record_byte_size, by the lookups and MMDB_read_node. The extension
+//   also uses it and metadata.record_size for the search tree size.
+//
+// filename, metadata.languages and metadata.description are left NULL, which
+// MMDB_close then skips. The other fields of metadata are only read by
+// MMDB_open. If a libmaxminddb release reads another field, the tests
+// opening databases with MODE_MEMORY and MODE_FD catch it.
+static int
+mmdb_open_memory(const uint8_t *content, Py_ssize_t size, MMDB_s *mmdb) {
+    memset(mmdb, 0, sizeof(MMDB_s));
+    mmdb->flags = MMDB_MODE_MMAP;
+    mmdb->file_content = content;
+    mmdb->file_size = size;
+
+    static const char marker[] = "\xAB\xCD\xEFMaxMind.com";
+    Py_ssize_t const marker_size = sizeof(marker) - 1;
+    Py_ssize_t const search_start =
+        size > METADATA_BLOCK_MAX_SIZE ? size - METADATA_BLOCK_MAX_SIZE : 0;
+    const uint8_t *metadata = NULL;
+    for (Py_ssize_t i = size - marker_size; i >= search_start; i--) {
+        if (memcmp(content + i, marker, (size_t)marker_size) == 0) {
+            metadata = content + i + marker_size;
+            break;
+        }
+    }
+    if (metadata == NULL) {
+        return MMDB_INVALID_METADATA_ERROR;
+    }
+    mmdb->metadata_section = metadata;
+    mmdb->metadata_section_size = (uint32_t)(content + size - metadata);
+
+    MMDB_s metadata_db = {.data_section = mmdb->metadata_section,
+                          .data_section_size = mmdb->metadata_section_size};
+    MMDB_entry_s metadata_start = {.mmdb = &metadata_db, .offset = 0};
+    MMDB_entry_data_s value;
+    int status = metadata_value(
+        &metadata_start, "node_count", MMDB_DATA_TYPE_UINT32, &value);
+    if (status != MMDB_SUCCESS) {
+        return status;
+    }
+    mmdb->metadata.node_count = value.uint32;
+    status = metadata_value(
+        &metadata_start, "record_size", MMDB_DATA_TYPE_UINT16, &value);
+    if (status != MMDB_SUCCESS) {
+        return status;
+    }
+    mmdb->metadata.record_size = value.uint16;
+    status = metadata_value(
+        &metadata_start, "ip_version", MMDB_DATA_TYPE_UINT16, &value);
+    if (status != MMDB_SUCCESS) {
+        return status;
+    }
+    mmdb->metadata.ip_version = value.uint16;
+    status = metadata_value(&metadata_start,
+                            "binary_format_major_version",
+                            MMDB_DATA_TYPE_UINT16,
+                            &value);
+    if (status != MMDB_SUCCESS) {
+        return status;
+    }
+    mmdb->metadata.binary_format_major_version = value.uint16;
+
+    if (mmdb->metadata.node_count == 0 ||
+        (mmdb->metadata.ip_version != 4 && mmdb->metadata.ip_version != 6)) {
+        return MMDB_INVALID_METADATA_ERROR;
+    }
+    if (mmdb->metadata.binary_format_major_version != 2 ||
+        (mmdb->metadata.record_size != 24 && mmdb->metadata.record_size != 28 &&
+         mmdb->metadata.record_size != 32)) {
+        return MMDB_UNKNOWN_DATABASE_FORMAT_ERROR;
+    }
+    mmdb->full_record_byte_size = mmdb->metadata.record_size * 2 / 8U;
+    mmdb->depth = mmdb->metadata.ip_version == 4 ? 32 : 128;
+
+    uint64_t const search_tree_size =
+        (uint64_t)mmdb->metadata.node_count * mmdb->full_record_byte_size;
+    if ((uint64_t)size < search_tree_size + DATA_SECTION_SEPARATOR) {
+        return MMDB_INVALID_METADATA_ERROR;
+    }
+    uint64_t const data_section_size =
+        (uint64_t)size - search_tree_size - DATA_SECTION_SEPARATOR;
+    if (data_section_size > UINT32_MAX || data_section_size < 3) {
+        return MMDB_INVALID_DATA_ERROR;
+    }
+    mmdb->data_section = content + search_tree_size + DATA_SECTION_SEPARATOR;
+    mmdb->data_section_size = (uint32_t)data_section_size;
+
+    if (mmdb->metadata.ip_version == 6) {
+        // The node of ::/96, where IPv4 lookups start, as found by MMDB_open.
+        uint32_t node = 0;
+        uint16_t netmask = 0;
+        for (; netmask < 96 && node < mmdb->metadata.node_count; netmask++) {
+            MMDB_search_node_s search_node;
+            status = MMDB_read_node(mmdb, node, &search_node);
+            if (status != MMDB_SUCCESS) {
+                return status;
+            }
+            node = (uint32_t)search_node.left_record;
+        }
+        mmdb->ipv4_start_node.node_value = node;
+        mmdb->ipv4_start_node.netmask = netmask;
+    }
+    return MMDB_SUCCESS;
+}
+
+static uint64_t search_tree_size(const MMDB_s *mmdb) {
+    return (uint64_t)mmdb->metadata.node_count * mmdb->full_record_byte_size;
+}
+
+// Reads a byte of each page of content so that it is in memory.
+static void touch_pages(const uint8_t *content, size_t size) {
+#ifdef MS_WINDOWS
+    SYSTEM_INFO info;
+    GetSystemInfo(&info);
+    size_t const page_size = info.dwPageSize;
+#else
+    size_t const page_size = (size_t)sysconf(_SC_PAGESIZE);
+#endif
+    volatile uint8_t sink = 0;
+    for (size_t i = 0; i < size; i += page_size) {
+        sink ^= content[i];
+    }
+    (void)sink;
+}
+
+// Applies the options to the memory map of the database. Advice that the
+// platform does not support is ignored, but failing to lock the search tree
+// is an error.
+static int apply_mmap_options(const MMDB_s *mmdb, const mmap_options *options) {
+    void *content = (void *)mmdb->file_content;
+    size_t const size = (size_t)mmdb->file_size;
+#ifdef MS_WINDOWS
+    (void)content;
+    (void)size;
+    if (options->populate) {
+        touch_pages(mmdb->file_content, size);
+    }
+    if (options->mlock_tree) {
+        PyErr_SetString(PyExc_OSError,
+                        "mlock_tree is not supported on this platform");
+        return -1;
+    }
+#else
+#ifdef MADV_RANDOM
+    if (options->madvise_random) {
+        madvise(content, size, MADV_RANDOM);
+    }
+#endif
+#ifdef MADV_WILLNEED
+    if (options->madvise_willneed) {
+        madvise(content, size, MADV_WILLNEED);
+    }
+#endif
+#ifdef MADV_HUGEPAGE
+    if (options->madvise_hugepage) {
+        madvise(content, size, MADV_HUGEPAGE);
+    }
+#endif
+    if (options->populate) {
+        int populated = 0;
+        Py_BEGIN_ALLOW_THREADS
+#ifdef MADV_POPULATE_READ
+            populated = madvise(content, size, MADV_POPULATE_READ) == 0;
+#endif
+        if (!populated) {
+            touch_pages(mmdb->file_content, size);
+        }
+        Py_END_ALLOW_THREADS
+    }
+    if (options->mlock_tree &&
+        mlock(content, (size_t)search_tree_size(mmdb)) != 0) {
+        PyErr_SetFromErrno(PyExc_OSError);
+        return -1;
+    }
+#endif
+    return 0;
+}
+
+#ifndef MS_WINDOWS
+// Returns the number of bytes of the size bytes at start that are in memory,
+// or -1 with an exception set.
+static Py_ssize_t resident_bytes(const uint8_t *start, size_t size) {
+    if (size == 0) {
+        return 0;
+    }
+    uintptr_t const page_size = (uintptr_t)sysconf(_SC_PAGESIZE);
+    uintptr_t const first = (uintptr_t)start & ~(page_size - 1);
+    uintptr_t const end = (uintptr_t)start + size;
+    size_t const pages = (size_t)((end - first + page_size - 1) / page_size);
+    unsigned char *vec = PyMem_Malloc(pages);
+    if (vec == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    if (mincore((void *)first, (size_t)(end - first), (void *)vec) != 0) {
+        PyMem_Free(vec);
+        PyErr_SetFromErrno(PyExc_OSError);
+        return -1;
+    }
+    Py_ssize_t resident = 0;
+    for (size_t i = 0; i < pages; i++) {
+        if (!(vec[i] & 1)) {
+            continue;
+        }
+        uintptr_t const page = first + i * page_size;
+        uintptr_t const low = page < (uintptr_t)start ? (uintptr_t)start : page;
+        uintptr_t const high = page + page_size > end ? end : page + page_size;
+        resident += (Py_ssize_t)(high - low);
+    }
+    PyMem_Free(vec);
+    return resident;
+}
+#endif
+
+// Returns the identity of the file at path as compared by
+// maxminddb.reader._open_pickled: its device, inode, size, and modification
+// time.
+static PyObject *file_identity(PyObject *path) {
+    PyObject *os = PyImport_ImportModule("os");
+    if (os == NULL) {
+        return NULL;
+    }
+    PyObject *stat = PyObject_CallMethod(os, "stat", "O", path);
+    Py_DECREF(os);
+    if (stat == NULL) {
+        return NULL;
+    }
+    static const char *fields[] = {
+        "st_dev", "st_ino", "st_size", "st_mtime_ns"};
+    PyObject *identity = PyTuple_New(4);
+    for (Py_ssize_t i = 0; identity != NULL && i < 4; i++) {
+        PyObject *value = PyObject_GetAttrString(stat, fields[i]);
+        if (value == NULL) {
+            Py_CLEAR(identity);
+            break;
+        }
+        PyTuple_SET_ITEM(identity, i, value);
+    }
+    Py_DECREF(stat);
+    return identity;
+}
+
+// Returns the absolute path of database, or the path as given if the current
+// directory has been removed.
+static PyObject *absolute_path(PyObject *database) {
+    PyObject *path = PyOS_FSPath(database);
+    if (path == NULL) {
+        return NULL;
+    }
+    PyObject *os_path = PyImport_ImportModule("os.path");
+    if (os_path == NULL) {
+        Py_DECREF(path);
+        return NULL;
+    }
+    PyObject *abspath = PyObject_CallMethod(os_path, "abspath", "O", path);
+    Py_DECREF(os_path);
+    if (abspath == NULL && PyErr_ExceptionMatches(PyExc_OSError)) {
+        PyErr_Clear();
+        return path;
+    }
+    Py_DECREF(path);
+    return abspath;
+}
+
 static int Reader_init(PyObject *self, PyObject *args, PyObject *kwds) {
     maxminddb_state *state = get_maxminddb_state_from_self(self);
     if (state == NULL) {
         return -1;
     }
 
-    PyObject *filepath = NULL;
+    PyObject *database = NULL;
     int mode = 0;
-
-    static char *kwlist[] = {"database", "mode", NULL};
+    Py_ssize_t json_cache_size = 0;
+    Py_ssize_t pointer_cache_size = 0;
+    Py_ssize_t string_cache_size = 0;
+    int immutable_records = 0;
+    PyObject *map_factory = NULL;
+    PyObject *array_factory = NULL;
+    mmap_options mmap_opts = {0};
+
+    static char *kwlist[] = {"database",
+                             "mode",
+                             "json_cache_size",
+                             "pointer_cache_size",
+                             "string_cache_size",
+                             "immutable_records",
+                             "map_factory",
+                             "array_factory",
+                             "madvise_random",
+                             "madvise_willneed",
+                             "madvise_hugepage",
+                             "mmap_populate",
+                             "mlock_tree",
+                             NULL};
     if (!PyArg_ParseTupleAndKeywords(args,
                                      kwds,
-                                     "O&|i",
+                                     "O|i$nnnpOOppppp",
                                      kwlist,
-                                     PyUnicode_FSConverter,
-                                     &filepath,
-                                     &mode)) {
+                                     &database,
+                                     &mode,
+                                     &json_cache_size,
+                                     &pointer_cache_size,
+                                     &string_cache_size,
+                                     &immutable_records,
+                                     &map_factory,
+                                     &array_factory,
+                                     &mmap_opts.madvise_random,
+                                     &mmap_opts.madvise_willneed,
+                                     &mmap_opts.madvise_hugepage,
+                                     &mmap_opts.populate,
+                                     &mmap_opts.mlock_tree)) {
         return -1;
     }
 
-    char *filename = PyBytes_AS_STRING(filepath);
-    if (filename == NULL) {
+    if (json_cache_size < 0) {
+        PyErr_SetString(PyExc_ValueError,
+                        "json_cache_size must not be negative");
         return -1;
     }
 
-    if (mode != 0 && mode != 1) {
-        Py_XDECREF(filepath);
-        PyErr_Format(
-            PyExc_ValueError,
-            "Unsupported open mode (%i). Only "
-            "MODE_AUTO and MODE_MMAP_EXT are supported by this extension.",
-            mode);
+    if (pointer_cache_size < 0) {
+        PyErr_SetString(PyExc_ValueError,
+                        "pointer_cache_size must not be negative");
+        return -1;
+    }
+
+    if (string_cache_size < 0) {
+        PyErr_SetString(PyExc_ValueError,
+                        "string_cache_size must not be negative");
         return -1;
     }
 
-    if (!can_read(filename)) {
-        PyErr_SetFromErrnoWithFilenameObject(PyExc_OSError, filepath);
-        Py_XDECREF(filepath);
+    if (check_factory("map_factory", &map_factory) != 0 ||
+        check_factory("array_factory", &array_factory) != 0) {
         return -1;
     }
 
-    MMDB_s *mmdb = (MMDB_s *)malloc(sizeof(MMDB_s));
-    if (mmdb == NULL) {
-        Py_XDECREF(filepath);
-        PyErr_NoMemory();
+    if (mode != MODE_AUTO && mode != MODE_MMAP_EXT && mode != MODE_MEMORY &&
+        mode != MODE_FD) {
+        PyErr_Format(PyExc_ValueError,
+                     "Unsupported open mode (%i). Only "
+                     "MODE_AUTO, MODE_MMAP_EXT, MODE_MEMORY, and MODE_FD are "
+                     "supported by this extension.",
+                     mode);
         return -1;
     }
 
     Reader_obj *mmdb_obj = (Reader_obj *)self;
-    if (!mmdb_obj) {
-        Py_XDECREF(filepath);
-        free(mmdb);
+    MMDB_s *mmdb = (MMDB_s *)malloc(sizeof(MMDB_s));
+    if (mmdb == NULL) {
         PyErr_NoMemory();
         return -1;
     }
 
+    int status;
+    if (mode == MODE_MEMORY || mode == MODE_FD) {
+        if (load_database(database, mode, &mmdb_obj->buffer) != 0) {
+            free(mmdb);
+            return -1;
+        }
+        status =
+            mmdb_open_memory(mmdb_obj->buffer.buf, mmdb_obj->buffer.len, mmdb);
+        if (status != MMDB_SUCCESS) {
+            PyBuffer_Release(&mmdb_obj->buffer);
+            free(mmdb);
+            PyObject *name = database_name(database, mode);
+            if (name != NULL) {
+                PyErr_Format(state->MaxMindDB_error,
+                             "Error opening database file (%S). Is this a "
+                             "valid MaxMind DB file?",
+                             name);
+                Py_DECREF(name);
+            }
+            return -1;
+        }
+    } else {
+        PyObject *filepath = NULL;
+        if (!PyUnicode_FSConverter(database, &filepath)) {
+            free(mmdb);
+            return -1;
+        }
+        char *filename = PyBytes_AS_STRING(filepath);
+
+        if (!can_read(filename)) {
+            PyErr_SetFromErrnoWithFilenameObject(PyExc_OSError, filepath);
+            Py_DECREF(filepath);
+            free(mmdb);
+            return -1;
+        }
+
+        status = MMDB_open(filename, MMDB_MODE_MMAP, mmdb);
+        if (status != MMDB_SUCCESS) {
+            free(mmdb);
+            PyErr_Format(state->MaxMindDB_error,
+                         "Error opening database file (%s). Is this a valid "
+                         "MaxMind DB file?",
+                         filename);
+            Py_DECREF(filepath);
+            return -1;
+        }
+        Py_DECREF(filepath);
+        if (apply_mmap_options(mmdb, &mmap_opts) != 0) {
+            MMDB_close(mmdb);
+            free(mmdb);
+            return -1;
+        }
+    }
+
     if (reader_lock_init(&mmdb_obj->rwlock) != 0) {
-        free(mmdb);
-        Py_XDECREF(filepath);
+        reader_close_mmdb(mmdb_obj, mmdb);
         return -1;
     }
 
-    int const status = MMDB_open(filename, MMDB_MODE_MMAP, mmdb);
-
-    if (status != MMDB_SUCCESS) {
+    mmdb_obj->key_cache =
+        PyMem_Calloc(KEY_CACHE_SIZE, sizeof(offset_cache_entry));
+    if (json_cache_size > 0) {
+        mmdb_obj->json_cache =
+            PyMem_Calloc((size_t)json_cache_size, sizeof(offset_cache_entry));
+        mmdb_obj->json_cache_size = json_cache_size;
+    }
+    if (pointer_cache_size > 0) {
+        mmdb_obj->pointer_cache = PyMem_Calloc((size_t)pointer_cache_size,
+                                               sizeof(offset_cache_entry));
+        mmdb_obj->pointer_cache_size = pointer_cache_size;
+    }
+    if (string_cache_size > 0) {
+        mmdb_obj->string_cache =
+            PyMem_Calloc((size_t)string_cache_size, sizeof(offset_cache_entry));
+        mmdb_obj->string_cache_size = string_cache_size;
+    }
+    if (mmdb_obj->key_cache == NULL ||
+        (json_cache_size > 0 && mmdb_obj->json_cache == NULL) ||
+        (pointer_cache_size > 0 && mmdb_obj->pointer_cache == NULL) ||
+        (string_cache_size > 0 && mmdb_obj->string_cache == NULL)) {
+        reader_free_caches(mmdb_obj);
+        reader_close_mmdb(mmdb_obj, mmdb);
         reader_lock_destroy(&mmdb_obj->rwlock);
-        free(mmdb);
-        PyErr_Format(state->MaxMindDB_error,
-                     "Error opening database file (%s). Is this a valid "
-                     "MaxMind DB file?",
-                     filename);
-        Py_XDECREF(filepath);
+        PyErr_NoMemory();
         return -1;
     }
 
-    Py_XDECREF(filepath);
-
     mmdb_obj->mmdb = mmdb;
+    mmdb_obj->immutable_records = immutable_records;
+    mmdb_obj->bytes_values =
+        immutable_records || mode == MODE_MEMORY || mode == MODE_FD;
+    mmdb_obj->map_factory = Py_XNewRef(map_factory);
+    mmdb_obj->array_factory = Py_XNewRef(array_factory);
     mmdb_obj->closed = Py_False;
+
+    if (mode != MODE_FD) {
+        PyObject *abspath = absolute_path(database);
+        if (abspath != NULL) {
+            mmdb_obj->pickle_args = Py_BuildValue(
+                "(Oi{s:n,s:n,s:n,s:O,s:O,s:O,s:N,s:N,s:N,s:N,s:N})",
+                abspath,
+                mode,
+                "json_cache_size",
+                json_cache_size,
+                "pointer_cache_size",
+                pointer_cache_size,
+                "string_cache_size",
+                string_cache_size,
+                "immutable_records",
+                immutable_records ? Py_True : Py_False,
+                "map_factory",
+                map_factory != NULL ? map_factory : Py_None,
+                "array_factory",
+                array_factory != NULL ? array_factory : Py_None,
+                "madvise_random",
+                PyBool_FromLong(mmap_opts.madvise_random),
+                "madvise_willneed",
+                PyBool_FromLong(mmap_opts.madvise_willneed),
+                "madvise_hugepage",
+                PyBool_FromLong(mmap_opts.madvise_hugepage),
+                "mmap_populate",
+                PyBool_FromLong(mmap_opts.populate),
+                "mlock_tree",
+                PyBool_FromLong(mmap_opts.mlock_tree));
+        }
+        Py_XDECREF(abspath);
+        if (mmdb_obj->pickle_args == NULL) {
+            Reader_close(self, NULL);
+            return -1;
+        }
+    }
+
+    PyObject *added = PyObject_CallMethod(state->readers, "add", "O", self);
+    if (added == NULL) {
+        Reader_close(self, NULL);
+        return -1;
+    }
+    Py_DECREF(added);
     return 0;
 }
 
@@ -411,18 +1128,47 @@ static PyObject *Reader_get_with_prefix_len(PyObject *self, PyObject *args) {
     return tuple;
 }
 
-static int get_record(PyObject *self, PyObject *args, PyObject **record) {
-    maxminddb_state *state = get_maxminddb_state_from_self(self);
-    if (state == NULL) {
-        return -1;
+// Returns the prefix length of the network found by looking up ip_address.
+static int result_prefix_len(const MMDB_s *mmdb,
+                             const struct sockaddr *ip_address,
+                             const MMDB_lookup_result_s *result) {
+    int prefix_len = result->netmask;
+    if (ip_address->sa_family == AF_INET && mmdb->metadata.ip_version == 6) {
+        // We return the prefix length given the IPv4 address. If there is
+        // no IPv4 subtree, we return a prefix length of 0.
+        prefix_len = prefix_len >= 96 ? prefix_len - 96 : 0;
+    }
+    return prefix_len;
+}
+
+// Sets the exception for a failed lookup of ip_address.
+static void set_lookup_error(maxminddb_state *state,
+                             int mmdb_error,
+                             struct sockaddr *ip_address) {
+    PyObject *exception = mmdb_error == MMDB_IPV6_LOOKUP_IN_IPV4_DATABASE_ERROR
+                              ? PyExc_ValueError
+                              : state->MaxMindDB_error;
+    char ipstr[INET6_ADDRSTRLEN] = {0};
+    if (format_sockaddr(ip_address, ipstr)) {
+        PyErr_Format(exception,
+                     "Error looking up %s. %s",
+                     ipstr,
+                     MMDB_strerror(mmdb_error));
     }
+}
 
-    struct sockaddr_storage ip_address_ss = {0};
-    struct sockaddr *ip_address = (struct sockaddr *)&ip_address_ss;
-    if (!PyArg_ParseTuple(args, "O&", ip_converter, &ip_address_ss)) {
+// Looks up an IP address converted by ip_converter. On success, the prefix
+// length is returned and the read lock is held; the caller must release it.
+// On failure, -1 is returned with an exception set and the lock released.
+static int lookup_sockaddr(PyObject *self,
+                           struct sockaddr_storage *ip_address_ss,
+                           MMDB_lookup_result_s *result) {
+    maxminddb_state *state = get_maxminddb_state_from_self(self);
+    if (state == NULL) {
         return -1;
     }
 
+    struct sockaddr *ip_address = (struct sockaddr *)ip_address_ss;
     if (!ip_address->sa_family) {
         PyErr_SetString(PyExc_ValueError, "Error parsing argument");
         return -1;
@@ -443,34 +1189,43 @@ static int get_record(PyObject *self, PyObject *args, PyObject **record) {
     }
 
     int mmdb_error = MMDB_SUCCESS;
-    MMDB_lookup_result_s result =
-        MMDB_lookup_sockaddr(mmdb, ip_address, &mmdb_error);
+    *result = MMDB_lookup_sockaddr(mmdb, ip_address, &mmdb_error);
 
     if (mmdb_error != MMDB_SUCCESS) {
         reader_release_read_lock(reader);
-        PyObject *exception;
-        if (MMDB_IPV6_LOOKUP_IN_IPV4_DATABASE_ERROR == mmdb_error) {
-            exception = PyExc_ValueError;
-        } else {
-            exception = state->MaxMindDB_error;
-        }
-        char ipstr[INET6_ADDRSTRLEN] = {0};
-        if (format_sockaddr(ip_address, ipstr)) {
-            PyErr_Format(exception,
-                         "Error looking up %s. %s",
-                         ipstr,
-                         MMDB_strerror(mmdb_error));
-        }
+        set_lookup_error(state, mmdb_error, ip_address);
         return -1;
     }
 
-    int prefix_len = result.netmask;
-    if (ip_address->sa_family == AF_INET && mmdb->metadata.ip_version == 6) {
-        // We return the prefix length given the IPv4 address. If there is
-        // no IPv4 subtree, we return a prefix length of 0.
-        prefix_len = prefix_len >= 96 ? prefix_len - 96 : 0;
+    return result_prefix_len(mmdb, ip_address, result);
+}
+
+// Looks up the IP address passed in args, like lookup_sockaddr.
+static int lookup_address(PyObject *self,
+                          PyObject *args,
+                          struct sockaddr_storage *ip_address_ss,
+                          MMDB_lookup_result_s *result) {
+    if (!PyArg_ParseTuple(args, "O&", ip_converter, ip_address_ss)) {
+        return -1;
+    }
+    return lookup_sockaddr(self, ip_address_ss, result);
+}
+
+static int get_record(PyObject *self, PyObject *args, PyObject **record) {
+    maxminddb_state *state = get_maxminddb_state_from_self(self);
+    if (state == NULL) {
+        return -1;
+    }
+
+    struct sockaddr_storage ip_address_ss = {0};
+    MMDB_lookup_result_s result;
+    int prefix_len = lookup_address(self, args, &ip_address_ss, &result);
+    if (prefix_len == -1) {
+        return -1;
     }
 
+    Reader_obj *reader = (Reader_obj *)self;
+
     if (!result.found_entry) {
         reader_release_read_lock(reader);
         Py_INCREF(Py_None);
@@ -478,33 +1233,569 @@ static int get_record(PyObject *self, PyObject *args, PyObject **record) {
         return prefix_len;
     }
 
-    MMDB_entry_data_list_s *entry_data_list = NULL;
-    int status = MMDB_get_entry_data_list(&result.entry, &entry_data_list);
-    if (status != MMDB_SUCCESS) {
-        reader_release_read_lock(reader);
+    int status = MMDB_SUCCESS;
+    *record = decode_entry(reader, &result.entry, &status);
+
+    reader_release_read_lock(reader);
+
+    if (*record == NULL) {
         char ipstr[INET6_ADDRSTRLEN] = {0};
-        if (format_sockaddr(ip_address, ipstr)) {
+        if (status != MMDB_SUCCESS &&
+            format_sockaddr((struct sockaddr *)&ip_address_ss, ipstr)) {
             PyErr_Format(state->MaxMindDB_error,
                          "Error while looking up data for %s. %s",
                          ipstr,
                          MMDB_strerror(status));
         }
-        MMDB_free_entry_data_list(entry_data_list);
         return -1;
     }
 
-    MMDB_entry_data_list_s *original_entry_data_list = entry_data_list;
-    *record = from_entry_data_list(state, &entry_data_list);
-    MMDB_free_entry_data_list(original_entry_data_list);
-
-    reader_release_read_lock(reader);
+    return prefix_len;
+}
 
-    // from_entry_data_list will return NULL on errors.
-    if (*record == NULL) {
-        return -1;
+static PyObject *Reader_visit(PyObject *self, PyObject *args) {
+    maxminddb_state *state = get_maxminddb_state_from_self(self);
+    if (state == NULL) {
+        return NULL;
     }
 
-    return prefix_len;
+    struct sockaddr_storage ip_address_ss = {0};
+    PyObject *visitor;
+    if (!PyArg_ParseTuple(
+            args, "O&O", ip_converter, &ip_address_ss, &visitor)) {
+        return NULL;
+    }
+    MMDB_lookup_result_s result;
+    int prefix_len = lookup_sockaddr(self, &ip_address_ss, &result);
+    if (prefix_len == -1) {
+        return NULL;
+    }
+
+    Reader_obj *reader = (Reader_obj *)self;
+    int status = MMDB_SUCCESS;
+    int ret;
+    if (result.found_entry) {
+        ret = visit_entry(reader, &result.entry, visitor, &status);
+    } else {
+        PyObject *value = PyObject_CallMethod(visitor, "value", "(O)", Py_None);
+        ret = value == NULL ? -1 : 0;
+        Py_XDECREF(value);
+    }
+
+    reader_release_read_lock(reader);
+
+    if (ret != 0) {
+        char ipstr[INET6_ADDRSTRLEN] = {0};
+        if (status != MMDB_SUCCESS &&
+            format_sockaddr((struct sockaddr *)&ip_address_ss, ipstr)) {
+            PyErr_Format(state->MaxMindDB_error,
+                         "Error while looking up data for %s. %s",
+                         ipstr,
+                         MMDB_strerror(status));
+        }
+        return NULL;
+    }
+    return PyLong_FromLong(prefix_len);
+}
+
+static PyObject *Reader_get_json(PyObject *self, PyObject *args) {
+    maxminddb_state *state = get_maxminddb_state_from_self(self);
+    if (state == NULL) {
+        return NULL;
+    }
+
+    struct sockaddr_storage ip_address_ss = {0};
+    MMDB_lookup_result_s result;
+    if (lookup_address(self, args, &ip_address_ss, &result) == -1) {
+        return NULL;
+    }
+
+    Reader_obj *reader = (Reader_obj *)self;
+
+    if (!result.found_entry) {
+        reader_release_read_lock(reader);
+        return PyBytes_FromStringAndSize("null", 4);
+    }
+
+    offset_cache_entry *slot = NULL;
+    if (reader->json_cache != NULL) {
+        slot = offset_cache_slot(
+            reader->json_cache, reader->json_cache_size, result.entry.offset);
+        reader_lock_cache(reader);
+        PyObject *cached =
+            slot->value != NULL && slot->offset == result.entry.offset
+                ? Py_NewRef(slot->value)
+                : NULL;
+        reader_unlock_cache(reader);
+        if (cached != NULL) {
+            reader_release_read_lock(reader);
+            return cached;
+        }
+    }
+
+    PyObject *json = json_from_entry(state, &result.entry);
+    if (json != NULL && slot != NULL) {
+        reader_lock_cache(reader);
+        PyObject *old = slot->value;
+        slot->offset = result.entry.offset;
+        slot->value = Py_NewRef(json);
+        reader_unlock_cache(reader);
+        Py_XDECREF(old);
+    }
+
+    reader_release_read_lock(reader);
+    return json;
+}
+
+// Returns the value at path in the record at entry. Missing values are
+// returned as None.
+static PyObject *column_value(maxminddb_state *state,
+                              Reader_obj *reader,
+                              MMDB_entry_s *entry,
+                              const char *const *path) {
+    MMDB_entry_data_s entry_data;
+    int status = MMDB_aget_value(entry, &entry_data, path);
+    if (status == MMDB_LOOKUP_PATH_DOES_NOT_MATCH_DATA_ERROR ||
+        status == MMDB_INVALID_LOOKUP_PATH_ERROR || !entry_data.has_data) {
+        Py_RETURN_NONE;
+    }
+    if (status != MMDB_SUCCESS) {
+        PyErr_Format(state->MaxMindDB_error,
+                     "Error while looking up data. %s",
+                     MMDB_strerror(status));
+        return NULL;
+    }
+
+    MMDB_entry_s value_entry = {.mmdb = entry->mmdb,
+                                .offset = entry_data.offset};
+    PyObject *value = decode_entry(reader, &value_entry, &status);
+    if (value == NULL && status != MMDB_SUCCESS) {
+        PyErr_Format(state->MaxMindDB_error,
+                     "Error while looking up data. %s",
+                     MMDB_strerror(status));
+    }
+    return value;
+}
+
+// Splits each field on "." into a NULL-terminated path for MMDB_aget_value.
+// The returned array and its paths are allocated as a single block.
+static const char ***column_paths(PyObject *fields) {
+    Py_ssize_t field_count = PySequence_Fast_GET_SIZE(fields);
+    size_t pointer_count = (size_t)field_count;
+    size_t chars = 0;
+    for (Py_ssize_t i = 0; i < field_count; i++) {
+        PyObject *field = PySequence_Fast_GET_ITEM(fields, i);
+        Py_ssize_t len;
+        const char *str = PyUnicode_AsUTF8AndSize(field, &len);
+        if (str == NULL) {
+            return NULL;
+        }
+        pointer_count += 2;
+        for (Py_ssize_t j = 0; j < len; j++) {
+            pointer_count += str[j] == '.';
+        }
+        chars += (size_t)len + 1;
+    }
+
+    char *block =
+        PyMem_Malloc(pointer_count * sizeof(const char *) + chars + 1);
+    if (block == NULL) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+    const char ***paths = (const char ***)block;
+    const char **segments = (const char **)(paths + field_count);
+    char *copy = (char *)(paths + pointer_count);
+    for (Py_ssize_t i = 0; i < field_count; i++) {
+        Py_ssize_t len;
+        const char *str =
+            PyUnicode_AsUTF8AndSize(PySequence_Fast_GET_ITEM(fields, i), &len);
+        memcpy(copy, str, (size_t)len + 1);
+        paths[i] = segments;
+        *segments++ = copy;
+        for (Py_ssize_t j = 0; j < len; j++) {
+            if (copy[j] == '.') {
+                copy[j] = '\0';
+                *segments++ = copy + j + 1;
+            }
+        }
+        *segments++ = NULL;
+        copy += len + 1;
+    }
+    return paths;
+}
+
+// Implements get_columns and, if with_prefix_len is set,
+// get_columns_with_prefix_len.
+static PyObject *get_columns(PyObject *self,
+                             PyObject *args,
+                             PyObject *kwds,
+                             int with_prefix_len) {
+    maxminddb_state *state = get_maxminddb_state_from_self(self);
+    if (state == NULL) {
+        return NULL;
+    }
+
+    static char *kwlist[] = {"ip_addresses", "fields", NULL};
+    PyObject *ip_addresses_obj = NULL;
+    PyObject *fields_obj = NULL;
+    if (!PyArg_ParseTupleAndKeywords(
+            args, kwds, "OO", kwlist, &ip_addresses_obj, &fields_obj)) {
+        return NULL;
+    }
+
+    PyObject *ip_addresses = NULL;
+    PyObject *fields = NULL;
+    const char ***paths = NULL;
+    struct sockaddr_storage *addresses = NULL;
+    uint32_t *offsets = NULL;
+    PyObject **rows = NULL;
+    PyObject *rows_by_offset = NULL;
+    PyObject *columns = NULL;
+    PyObject *prefix_lens = NULL;
+
+    ip_addresses =
+        PySequence_Fast(ip_addresses_obj, "ip_addresses must be iterable");
+    if (ip_addresses == NULL) {
+        goto error;
+    }
+    fields = PySequence_Fast(fields_obj, "fields must be iterable");
+    if (fields == NULL) {
+        goto error;
+    }
+    paths = column_paths(fields);
+    if (paths == NULL) {
+        goto error;
+    }
+
+    Py_ssize_t count = PySequence_Fast_GET_SIZE(ip_addresses);
+    Py_ssize_t field_count = PySequence_Fast_GET_SIZE(fields);
+    size_t alloc_count = count > 0 ? (size_t)count : 1;
+    addresses = PyMem_Calloc(alloc_count, sizeof(struct sockaddr_storage));
+    offsets = PyMem_Calloc(alloc_count, sizeof(uint32_t));
+    rows = PyMem_Calloc(alloc_count, sizeof(PyObject *));
+    if (addresses == NULL || offsets == NULL || rows == NULL) {
+        PyErr_NoMemory();
+        goto error;
+    }
+
+    // Convert the addresses before taking the lock as this may call into
+    // arbitrary Python code.
+    for (Py_ssize_t i = 0; i < count; i++) {
+        PyObject *ip = PySequence_Fast_GET_ITEM(ip_addresses, i);
+        if (!ip_converter(ip, &addresses[i])) {
+            goto error;
+        }
+        if (!addresses[i].ss_family) {
+            PyErr_SetString(PyExc_ValueError, "Error parsing argument");
+            goto error;
+        }
+    }
+
+    rows_by_offset = PyDict_New();
+    if (rows_by_offset == NULL) {
+        goto error;
+    }
+    if (with_prefix_len) {
+        prefix_lens = PyList_New(count);
+        if (prefix_lens == NULL) {
+            goto error;
+        }
+    }
+
+    Reader_obj *reader = (Reader_obj *)self;
+    if (reader_acquire_read_lock(reader) != 0) {
+        goto error;
+    }
+
+    MMDB_s *mmdb = reader->mmdb;
+    if (mmdb == NULL) {
+        reader_release_read_lock(reader);
+        PyErr_SetString(PyExc_ValueError,
+                        "Attempt to read from a closed MaxMind DB.");
+        goto error;
+    }
+
+    // Look up every address first and then decode each requested value once
+    // per distinct record.
+    for (Py_ssize_t i = 0; i < count; i++) {
+        struct sockaddr *ip_address = (struct sockaddr *)&addresses[i];
+        int mmdb_error = MMDB_SUCCESS;
+        MMDB_lookup_result_s result =
+            MMDB_lookup_sockaddr(mmdb, ip_address, &mmdb_error);
+        if (mmdb_error != MMDB_SUCCESS) {
+            reader_release_read_lock(reader);
+            set_lookup_error(state, mmdb_error, ip_address);
+            goto error;
+        }
+        if (prefix_lens != NULL) {
+            PyObject *prefix_len =
+                PyLong_FromLong(result_prefix_len(mmdb, ip_address, &result));
+            if (prefix_len == NULL) {
+                reader_release_read_lock(reader);
+                goto error;
+            }
+            PyList_SET_ITEM(prefix_lens, i, prefix_len);
+        }
+        if (!result.found_entry) {
+            continue;
+        }
+        offsets[i] = result.entry.offset;
+
+        if (i > 0 && rows[i - 1] != NULL && offsets[i - 1] == offsets[i]) {
+            rows[i] = rows[i - 1];
+            continue;
+        }
+
+        PyObject *key = PyLong_FromUnsignedLong(result.entry.offset);
+        if (key == NULL) {
+            reader_release_read_lock(reader);
+            goto error;
+        }
+        PyObject *row = PyDict_GetItemWithError(rows_by_offset, key);
+        if (row == NULL && !PyErr_Occurred()) {
+            row = PyTuple_New(field_count);
+            for (Py_ssize_t j = 0; row != NULL && j < field_count; j++) {
+                PyObject *value =
+                    column_value(state, reader, &result.entry, paths[j]);
+                if (value == NULL) {
+                    Py_CLEAR(row);
+                    break;
+                }
+                PyTuple_SET_ITEM(row, j, value);
+            }
+            if (row != NULL) {
+                int status = PyDict_SetItem(rows_by_offset, key, row);
+                // The dictionary keeps the row alive.
+                Py_DECREF(row);
+                if (status != 0) {
+                    row = NULL;
+                }
+            }
+        }
+        Py_DECREF(key);
+        if (row == NULL) {
+            reader_release_read_lock(reader);
+            goto error;
+        }
+        rows[i] = row;
+    }
+
+    reader_release_read_lock(reader);
+
+    columns = PyDict_New();
+    if (columns == NULL) {
+        goto error;
+    }
+    for (Py_ssize_t j = 0; j < field_count; j++) {
+        PyObject *column = PyList_New(count);
+        if (column == NULL) {
+            goto error;
+        }
+        for (Py_ssize_t i = 0; i < count; i++) {
+            PyObject *value =
+                rows[i] == NULL ? Py_None : PyTuple_GET_ITEM(rows[i], j);
+            PyList_SET_ITEM(column, i, Py_NewRef(value));
+        }
+        int status = PyDict_SetItem(
+            columns, PySequence_Fast_GET_ITEM(fields, j), column);
+        Py_DECREF(column);
+        if (status != 0) {
+            goto error;
+        }
+    }
+    if (with_prefix_len) {
+        columns = Py_BuildValue("(NN)", columns, prefix_lens);
+        prefix_lens = NULL;
+    }
+    goto done;
+
+error:
+    Py_CLEAR(columns);
+done:
+    Py_XDECREF(prefix_lens);
+    Py_XDECREF(rows_by_offset);
+    PyMem_Free(rows);
+    PyMem_Free(offsets);
+    PyMem_Free(addresses);
+    PyMem_Free(paths);
+    Py_XDECREF(fields);
+    Py_XDECREF(ip_addresses);
+    return columns;
+}
+
+static PyObject *
+Reader_get_columns(PyObject *self, PyObject *args, PyObject *kwds) {
+    return get_columns(self, args, kwds, 0);
+}
+
+static PyObject *Reader_get_columns_with_prefix_len(PyObject *self,
+                                                    PyObject *args,
+                                                    PyObject *kwds) {
+    return get_columns(self, args, kwds, 1);
+}
+
+static PyObject *Reader_get_offsets_with_prefix_len(PyObject *self,
+                                                    PyObject *args,
+                                                    PyObject *kwds) {
+    maxminddb_state *state = get_maxminddb_state_from_self(self);
+    if (state == NULL) {
+        return NULL;
+    }
+
+    static char *kwlist[] = {"ip_addresses", NULL};
+    PyObject *ip_addresses_obj = NULL;
+    if (!PyArg_ParseTupleAndKeywords(
+            args, kwds, "O", kwlist, &ip_addresses_obj)) {
+        return NULL;
+    }
+
+    PyObject *ip_addresses =
+        PySequence_Fast(ip_addresses_obj, "ip_addresses must be iterable");
+    if (ip_addresses == NULL) {
+        return NULL;
+    }
+    Py_ssize_t count = PySequence_Fast_GET_SIZE(ip_addresses);
+    struct sockaddr_storage *addresses = PyMem_Calloc(
+        count > 0 ? (size_t)count : 1, sizeof(struct sockaddr_storage));
+    PyObject *offsets = PyList_New(count);
+    PyObject *prefix_lens = PyList_New(count);
+    PyObject *result = NULL;
+    if (addresses == NULL) {
+        PyErr_NoMemory();
+        goto done;
+    }
+    if (offsets == NULL || prefix_lens == NULL) {
+        goto done;
+    }
+
+    // Convert the addresses before taking the lock as this may call into
+    // arbitrary Python code.
+    for (Py_ssize_t i = 0; i < count; i++) {
+        PyObject *ip = PySequence_Fast_GET_ITEM(ip_addresses, i);
+        if (!ip_converter(ip, &addresses[i])) {
+            goto done;
+        }
+        if (!addresses[i].ss_family) {
+            PyErr_SetString(PyExc_ValueError, "Error parsing argument");
+            goto done;
+        }
+    }
+
+    Reader_obj *reader = (Reader_obj *)self;
+    if (reader_acquire_read_lock(reader) != 0) {
+        goto done;
+    }
+
+    MMDB_s *mmdb = reader->mmdb;
+    if (mmdb == NULL) {
+        reader_release_read_lock(reader);
+        PyErr_SetString(PyExc_ValueError,
+                        "Attempt to read from a closed MaxMind DB.");
+        goto done;
+    }
+
+    for (Py_ssize_t i = 0; i < count; i++) {
+        struct sockaddr *ip_address = (struct sockaddr *)&addresses[i];
+        int mmdb_error = MMDB_SUCCESS;
+        MMDB_lookup_result_s lookup =
+            MMDB_lookup_sockaddr(mmdb, ip_address, &mmdb_error);
+        if (mmdb_error != MMDB_SUCCESS) {
+            reader_release_read_lock(reader);
+            set_lookup_error(state, mmdb_error, ip_address);
+            goto done;
+        }
+        PyObject *offset = lookup.found_entry
+                               ? PyLong_FromUnsignedLong(lookup.entry.offset)
+                               : Py_NewRef(Py_None);
+        PyObject *prefix_len =
+            PyLong_FromLong(result_prefix_len(mmdb, ip_address, &lookup));
+        if (offset == NULL || prefix_len == NULL) {
+            reader_release_read_lock(reader);
+            Py_XDECREF(offset);
+            Py_XDECREF(prefix_len);
+            goto done;
+        }
+        PyList_SET_ITEM(offsets, i, offset);
+        PyList_SET_ITEM(prefix_lens, i, prefix_len);
+    }
+
+    reader_release_read_lock(reader);
+    result = PyTuple_Pack(2, offsets, prefix_lens);
+
+done:
+    Py_XDECREF(prefix_lens);
+    Py_XDECREF(offsets);
+    PyMem_Free(addresses);
+    Py_DECREF(ip_addresses);
+    return result;
+}
+
+static PyObject *
+Reader_get_by_offset(PyObject *self, PyObject *args, PyObject *kwds) {
+    maxminddb_state *state = get_maxminddb_state_from_self(self);
+    if (state == NULL) {
+        return NULL;
+    }
+
+    static char *kwlist[] = {"offset", "field", NULL};
+    Py_ssize_t offset;
+    PyObject *field = Py_None;
+    if (!PyArg_ParseTupleAndKeywords(
+            args, kwds, "n|O", kwlist, &offset, &field)) {
+        return NULL;
+    }
+    const char ***paths = NULL;
+    if (field != Py_None) {
+        if (!PyUnicode_Check(field)) {
+            PyErr_SetString(PyExc_TypeError, "field must be a str or None");
+            return NULL;
+        }
+        PyObject *fields = PyTuple_Pack(1, field);
+        if (fields == NULL) {
+            return NULL;
+        }
+        paths = column_paths(fields);
+        Py_DECREF(fields);
+        if (paths == NULL) {
+            return NULL;
+        }
+    }
+
+    Reader_obj *reader = (Reader_obj *)self;
+    if (reader_acquire_read_lock(reader) != 0) {
+        PyMem_Free(paths);
+        return NULL;
+    }
+
+    MMDB_s *mmdb = reader->mmdb;
+    PyObject *value = NULL;
+    if (mmdb == NULL) {
+        PyErr_SetString(PyExc_ValueError,
+                        "Attempt to read from a closed MaxMind DB.");
+    } else if (offset < 0 || (size_t)offset >= mmdb->data_section_size) {
+        PyErr_Format(PyExc_ValueError,
+                     "Offset %zd is outside the data section.",
+                     offset);
+    } else {
+        MMDB_entry_s entry = {.mmdb = mmdb, .offset = (uint32_t)offset};
+        if (paths != NULL) {
+            value = column_value(state, reader, &entry, paths[0]);
+        } else {
+            int status = MMDB_SUCCESS;
+            value = decode_entry(reader, &entry, &status);
+            if (value == NULL && status != MMDB_SUCCESS) {
+                PyErr_Format(state->MaxMindDB_error,
+                             "Error while decoding data at offset %zd. %s",
+                             offset,
+                             MMDB_strerror(status));
+            }
+        }
+    }
+
+    reader_release_read_lock(reader);
+    PyMem_Free(paths);
+    return value;
 }
 
 static int ip_converter(PyObject *obj, struct sockaddr_storage *ip_address) {
@@ -604,42 +1895,255 @@ static bool format_sockaddr(struct sockaddr *sa, char *dst) {
     return false;
 }
 
-static PyObject *Reader_metadata(PyObject *self, PyObject *UNUSED(args)) {
-    maxminddb_state *state = get_maxminddb_state_from_self(self);
-    if (state == NULL) {
-        return NULL;
+// Returns whether the deadline, a time.monotonic() value, has passed, or -1
+// with an exception set. A negative deadline never passes.
+static int warm_deadline_passed(PyObject *monotonic, double deadline) {
+    if (deadline < 0) {
+        return 0;
+    }
+    PyObject *now = PyObject_CallNoArgs(monotonic);
+    if (now == NULL) {
+        return -1;
     }
+    double const seconds = PyFloat_AsDouble(now);
+    Py_DECREF(now);
+    if (seconds == -1.0 && PyErr_Occurred()) {
+        return -1;
+    }
+    return seconds >= deadline;
+}
 
-    Reader_obj *mmdb_obj = (Reader_obj *)self;
+// Reads the pages of the search tree, and of the rest of the database if
+// all is set, a chunk at a time. Returns 1 if done, 0 if the deadline
+// passed first, or -1 with an exception set.
+static int
+warm_pages(Reader_obj *reader, int all, PyObject *monotonic, double deadline) {
+    for (size_t offset = 0;; offset += WARM_CHUNK_SIZE) {
+        int const passed = warm_deadline_passed(monotonic, deadline);
+        if (passed != 0) {
+            return passed < 0 ? -1 : 0;
+        }
+        if (reader_acquire_read_lock(reader) != 0) {
+            return -1;
+        }
+        MMDB_s *mmdb = reader->mmdb;
+        if (mmdb == NULL) {
+            reader_release_read_lock(reader);
+            PyErr_SetString(PyExc_ValueError,
+                            "Attempt to read from a closed MaxMind DB.");
+            return -1;
+        }
+        size_t const end =
+            all ? (size_t)mmdb->file_size : (size_t)search_tree_size(mmdb);
+        if (offset >= end) {
+            reader_release_read_lock(reader);
+            return 1;
+        }
+        size_t const size =
+            end - offset < WARM_CHUNK_SIZE ? end - offset : WARM_CHUNK_SIZE;
+        const uint8_t *content = mmdb->file_content + offset;
+        // Other threads keep serving lookups while the pages are read, but
+        // must not close the database under this thread.
+        reader_enter_busy(reader);
+        // clang-format off
+        Py_BEGIN_ALLOW_THREADS
+        touch_pages(content, size);
+        Py_END_ALLOW_THREADS
+        reader_leave_busy(reader);
+        // clang-format on
+        reader_release_read_lock(reader);
+    }
+}
 
-    if (reader_acquire_read_lock(mmdb_obj) != 0) {
+static PyObject *Reader_warm(PyObject *self, PyObject *args, PyObject *kwds) {
+    const char *level = "tree";
+    PyObject *budget_seconds = Py_None;
+    PyObject *ip_addresses = Py_None;
+    static char *kwlist[] = {"level", "budget_seconds", "ip_addresses", NULL};
+    if (!PyArg_ParseTupleAndKeywords(args,
+                                     kwds,
+                                     "|s$OO",
+                                     kwlist,
+                                     &level,
+                                     &budget_seconds,
+                                     &ip_addresses)) {
         return NULL;
     }
 
-    if (mmdb_obj->mmdb == NULL) {
-        reader_release_read_lock(mmdb_obj);
-        PyErr_SetString(PyExc_IOError,
-                        "Attempt to read from a closed MaxMind DB.");
+    int all;
+    if (strcmp(level, "tree") == 0) {
+        all = 0;
+    } else if (strcmp(level, "all") == 0) {
+        all = 1;
+    } else {
+        PyErr_SetString(PyExc_ValueError, "level must be 'tree' or 'all'");
         return NULL;
     }
 
-    MMDB_entry_data_list_s *entry_data_list;
-    int status =
-        MMDB_get_metadata_as_entry_data_list(mmdb_obj->mmdb, &entry_data_list);
-    if (status != MMDB_SUCCESS) {
-        reader_release_read_lock(mmdb_obj);
-        PyErr_Format(state->MaxMindDB_error,
-                     "Error decoding metadata. %s",
-                     MMDB_strerror(status));
+    PyObject *time_mod = PyImport_ImportModule("time");
+    if (time_mod == NULL) {
         return NULL;
     }
-    MMDB_entry_data_list_s *original_entry_data_list = entry_data_list;
-
-    PyObject *metadata_dict = from_entry_data_list(state, &entry_data_list);
-    MMDB_free_entry_data_list(original_entry_data_list);
-    if (metadata_dict == NULL || !PyDict_Check(metadata_dict)) {
-        reader_release_read_lock(mmdb_obj);
-        PyErr_SetString(state->MaxMindDB_error, "Error decoding metadata.");
+    PyObject *monotonic = PyObject_GetAttrString(time_mod, "monotonic");
+    Py_DECREF(time_mod);
+    if (monotonic == NULL) {
+        return NULL;
+    }
+
+    double deadline = -1;
+    if (budget_seconds != Py_None) {
+        double const budget = PyFloat_AsDouble(budget_seconds);
+        if (budget == -1.0 && PyErr_Occurred()) {
+            Py_DECREF(monotonic);
+            return NULL;
+        }
+        if (budget < 0) {
+            Py_DECREF(monotonic);
+            PyErr_SetString(PyExc_ValueError,
+                            "budget_seconds must not be negative");
+            return NULL;
+        }
+        PyObject *now = PyObject_CallNoArgs(monotonic);
+        if (now == NULL) {
+            Py_DECREF(monotonic);
+            return NULL;
+        }
+        deadline = PyFloat_AsDouble(now) + budget;
+        Py_DECREF(now);
+    }
+
+    int done = warm_pages((Reader_obj *)self, all, monotonic, deadline);
+    if (done == 1 && ip_addresses != Py_None) {
+        PyObject *iterator = PyObject_GetIter(ip_addresses);
+        if (iterator == NULL) {
+            done = -1;
+        }
+        PyObject *ip;
+        while (done == 1 && (ip = PyIter_Next(iterator)) != NULL) {
+            int const passed = warm_deadline_passed(monotonic, deadline);
+            PyObject *lookup_args = passed == 0 ? PyTuple_Pack(1, ip) : NULL;
+            Py_DECREF(ip);
+            if (passed != 0) {
+                done = passed < 0 ? -1 : 0;
+                break;
+            }
+            if (lookup_args == NULL) {
+                done = -1;
+                break;
+            }
+            // Looking up the records fills the caches of the reader.
+            PyObject *record = Reader_get(self, lookup_args);
+            Py_XDECREF(record);
+            if (record != NULL && ((Reader_obj *)self)->json_cache != NULL) {
+                record = Reader_get_json(self, lookup_args);
+                Py_XDECREF(record);
+            }
+            Py_DECREF(lookup_args);
+            if (record == NULL) {
+                done = -1;
+            }
+        }
+        if (done == 1 && PyErr_Occurred()) {
+            done = -1;
+        }
+        Py_XDECREF(iterator);
+    }
+    Py_DECREF(monotonic);
+
+    if (done < 0) {
+        return NULL;
+    }
+    return PyBool_FromLong(done);
+}
+
+static PyObject *Reader_residency(PyObject *self, PyObject *UNUSED(args)) {
+    Reader_obj *mmdb_obj = (Reader_obj *)self;
+
+    if (reader_acquire_read_lock(mmdb_obj) != 0) {
+        return NULL;
+    }
+
+    MMDB_s *mmdb = mmdb_obj->mmdb;
+    if (mmdb == NULL) {
+        reader_release_read_lock(mmdb_obj);
+        PyErr_SetString(PyExc_ValueError,
+                        "Attempt to read from a closed MaxMind DB.");
+        return NULL;
+    }
+
+#ifdef MS_WINDOWS
+    reader_release_read_lock(mmdb_obj);
+    Py_RETURN_NONE;
+#else
+    size_t const tree_size = (size_t)search_tree_size(mmdb);
+    size_t const data_size = (size_t)mmdb->file_size - tree_size;
+    Py_ssize_t const tree_resident =
+        resident_bytes(mmdb->file_content, tree_size);
+    Py_ssize_t const data_resident =
+        tree_resident < 0
+            ? -1
+            : resident_bytes(mmdb->file_content + tree_size, data_size);
+    reader_release_read_lock(mmdb_obj);
+    if (data_resident < 0) {
+        return NULL;
+    }
+
+    PyObject *reader_mod = PyImport_ImportModule("maxminddb.reader");
+    if (reader_mod == NULL) {
+        return NULL;
+    }
+    PyObject *residency_type = PyObject_GetAttrString(reader_mod, "Residency");
+    Py_DECREF(reader_mod);
+    if (residency_type == NULL) {
+        return NULL;
+    }
+    PyObject *residency = PyObject_CallFunction(residency_type,
+                                                "nnnn",
+                                                tree_resident,
+                                                (Py_ssize_t)tree_size,
+                                                data_resident,
+                                                (Py_ssize_t)data_size);
+    Py_DECREF(residency_type);
+    return residency;
+#endif
+}
+
+static PyObject *Reader_metadata(PyObject *self, PyObject *UNUSED(args)) {
+    maxminddb_state *state = get_maxminddb_state_from_self(self);
+    if (state == NULL) {
+        return NULL;
+    }
+
+    Reader_obj *mmdb_obj = (Reader_obj *)self;
+
+    if (reader_acquire_read_lock(mmdb_obj) != 0) {
+        return NULL;
+    }
+
+    if (mmdb_obj->mmdb == NULL) {
+        reader_release_read_lock(mmdb_obj);
+        PyErr_SetString(PyExc_IOError,
+                        "Attempt to read from a closed MaxMind DB.");
+        return NULL;
+    }
+
+    MMDB_entry_data_list_s *entry_data_list;
+    int status =
+        MMDB_get_metadata_as_entry_data_list(mmdb_obj->mmdb, &entry_data_list);
+    if (status != MMDB_SUCCESS) {
+        reader_release_read_lock(mmdb_obj);
+        PyErr_Format(state->MaxMindDB_error,
+                     "Error decoding metadata. %s",
+                     MMDB_strerror(status));
+        return NULL;
+    }
+    MMDB_entry_data_list_s *original_entry_data_list = entry_data_list;
+
+    PyObject *metadata_dict = from_entry_data_list(state, &entry_data_list);
+    MMDB_free_entry_data_list(original_entry_data_list);
+    if (metadata_dict == NULL || !PyDict_Check(metadata_dict)) {
+        reader_release_read_lock(mmdb_obj);
+        PyErr_SetString(state->MaxMindDB_error, "Error decoding metadata.");
         return NULL;
     }
 
@@ -662,16 +2166,30 @@ static PyObject *Reader_metadata(PyObject *self, PyObject *UNUSED(args)) {
 static PyObject *Reader_close(PyObject *self, PyObject *UNUSED(args)) {
     Reader_obj *mmdb_obj = (Reader_obj *)self;
 
+    // Closing while a factory, a visitor, or Reader.warm is reading the
+    // database would unmap it under them. Without the GIL, closing from a
+    // factory or visitor would also wait forever for the read lock held by
+    // this thread.
+    reader_lock_cache(mmdb_obj);
+    Py_ssize_t busy = mmdb_obj->busy;
+    reader_unlock_cache(mmdb_obj);
+    if (busy > 0) {
+        PyErr_SetString(PyExc_ValueError,
+                        "Cannot close the MaxMind DB while it is being read.");
+        return NULL;
+    }
+
     if (reader_acquire_write_lock(mmdb_obj) != 0) {
         return NULL;
     }
 
     if (mmdb_obj->mmdb != NULL) {
-        MMDB_close(mmdb_obj->mmdb);
-        free(mmdb_obj->mmdb);
+        reader_close_mmdb(mmdb_obj, mmdb_obj->mmdb);
         mmdb_obj->mmdb = NULL;
     }
 
+    reader_free_caches(mmdb_obj);
+
     mmdb_obj->closed = Py_True;
 
     reader_release_write_lock(mmdb_obj);
@@ -700,22 +2218,70 @@ static PyObject *Reader__enter__(PyObject *self, PyObject *UNUSED(args)) {
 }
 
 static PyObject *Reader__exit__(PyObject *self, PyObject *UNUSED(args)) {
-    Reader_close(self, NULL);
+    PyObject *ret = Reader_close(self, NULL);
+    if (ret == NULL) {
+        return NULL;
+    }
+    Py_DECREF(ret);
     Py_RETURN_NONE;
 }
 
+static PyObject *Reader__reduce__(PyObject *self, PyObject *UNUSED(args)) {
+    Reader_obj *mmdb_obj = (Reader_obj *)self;
+    if (mmdb_obj->pickle_args == NULL) {
+        PyErr_SetString(PyExc_TypeError,
+                        "Cannot pickle a Reader opened with MODE_FD.");
+        return NULL;
+    }
+    PyObject *reader_mod = PyImport_ImportModule("maxminddb.reader");
+    if (reader_mod == NULL) {
+        return NULL;
+    }
+    PyObject *open_pickled =
+        PyObject_GetAttrString(reader_mod, "_open_pickled");
+    Py_DECREF(reader_mod);
+    if (open_pickled == NULL) {
+        return NULL;
+    }
+    // The identity of the file is only needed once the reader is pickled.
+    PyObject *path = PyTuple_GET_ITEM(mmdb_obj->pickle_args, 0);
+    PyObject *identity = file_identity(path);
+    PyObject *open_args = NULL;
+    if (identity != NULL) {
+        open_args = Py_BuildValue("(OONOO)",
+                                  (PyObject *)Py_TYPE(self),
+                                  path,
+                                  identity,
+                                  PyTuple_GET_ITEM(mmdb_obj->pickle_args, 1),
+                                  PyTuple_GET_ITEM(mmdb_obj->pickle_args, 2));
+    }
+    if (open_args == NULL) {
+        Py_DECREF(open_pickled);
+        return NULL;
+    }
+    return Py_BuildValue("(NN)", open_pickled, open_args);
+}
+
 static void Reader_dealloc(PyObject *self) {
     Reader_obj *obj = (Reader_obj *)self;
+    if (obj->weakreflist != NULL) {
+        PyObject_ClearWeakRefs(self);
+    }
     if (obj->mmdb != NULL) {
         Reader_close(self, NULL);
     }
 
     reader_lock_destroy(&obj->rwlock);
+    Py_CLEAR(obj->map_factory);
+    Py_CLEAR(obj->array_factory);
+    Py_CLEAR(obj->pickle_args);
 
     PyObject_Del(self);
 }
 
-static PyObject *Reader_iter(PyObject *obj) {
+// Returns an iterator over the networks and their records, or the offsets of
+// the records if offsets is set.
+static PyObject *reader_iter(PyObject *obj, int offsets) {
     maxminddb_state *state = get_maxminddb_state_from_self(obj);
     if (state == NULL) {
         return NULL;
@@ -744,6 +2310,7 @@ static PyObject *Reader_iter(PyObject *obj) {
 
     ri->reader = reader;
     Py_INCREF(reader);
+    ri->offsets = offsets;
 
     // Currently, we are always starting from the 0 node with the 0 IP
     ri->next = calloc(1, sizeof(record));
@@ -757,6 +2324,13 @@ static PyObject *Reader_iter(PyObject *obj) {
     return (PyObject *)ri;
 }
 
+static PyObject *Reader_iter(PyObject *obj) { return reader_iter(obj, 0); }
+
+static PyObject *Reader_iter_offsets(PyObject *self,
+                                     PyObject *Py_UNUSED(args)) {
+    return reader_iter(self, 1);
+}
+
 static bool is_ipv6(char ip[16]) {
     char z = 0;
     for (int i = 0; i < 12; i++) {
@@ -851,27 +2425,19 @@ static PyObject *ReaderIter_next(PyObject *self) {
             case MMDB_RECORD_TYPE_EMPTY:
                 break;
             case MMDB_RECORD_TYPE_DATA: {
-                MMDB_entry_data_list_s *entry_data_list = NULL;
-                int status =
-                    MMDB_get_entry_data_list(&cur->entry, &entry_data_list);
-                if (status != MMDB_SUCCESS) {
-                    reader_release_read_lock(ri->reader);
-                    PyErr_Format(
-                        state->MaxMindDB_error,
-                        "Error looking up data while iterating over tree: %s",
-                        MMDB_strerror(status));
-                    MMDB_free_entry_data_list(entry_data_list);
-                    free(cur);
-                    return NULL;
-                }
-
-                MMDB_entry_data_list_s *original_entry_data_list =
-                    entry_data_list;
+                int status = MMDB_SUCCESS;
                 PyObject *record =
-                    from_entry_data_list(state, &entry_data_list);
-                MMDB_free_entry_data_list(original_entry_data_list);
+                    ri->offsets
+                        ? PyLong_FromUnsignedLong(cur->entry.offset)
+                        : decode_entry(ri->reader, &cur->entry, &status);
                 if (record == NULL) {
                     reader_release_read_lock(ri->reader);
+                    if (status != MMDB_SUCCESS) {
+                        PyErr_Format(state->MaxMindDB_error,
+                                     "Error looking up data while iterating "
+                                     "over tree: %s",
+                                     MMDB_strerror(status));
+                    }
                     free(cur);
                     return NULL;
                 }
@@ -970,204 +2536,1195 @@ static int Metadata_init(PyObject *self, PyObject *args, PyObject *kwds) {
                              "record_size",
                              NULL};
 
-    if (!PyArg_ParseTupleAndKeywords(args,
-                                     kwds,
-                                     "|OOOOOOOOO",
-                                     kwlist,
-                                     &binary_format_major_version,
-                                     &binary_format_minor_version,
-                                     &build_epoch,
-                                     &database_type,
-                                     &description,
-                                     &ip_version,
-                                     &languages,
-                                     &node_count,
-                                     &record_size)) {
+    if (!PyArg_ParseTupleAndKeywords(args,
+                                     kwds,
+                                     "|OOOOOOOOO",
+                                     kwlist,
+                                     &binary_format_major_version,
+                                     &binary_format_minor_version,
+                                     &build_epoch,
+                                     &database_type,
+                                     &description,
+                                     &ip_version,
+                                     &languages,
+                                     &node_count,
+                                     &record_size)) {
+        return -1;
+    }
+
+    Metadata_obj *obj = (Metadata_obj *)self;
+
+    obj->binary_format_major_version = binary_format_major_version;
+    obj->binary_format_minor_version = binary_format_minor_version;
+    obj->build_epoch = build_epoch;
+    obj->database_type = database_type;
+    obj->description = description;
+    obj->ip_version = ip_version;
+    obj->languages = languages;
+    obj->node_count = node_count;
+    obj->record_size = record_size;
+
+    Py_INCREF(obj->binary_format_major_version);
+    Py_INCREF(obj->binary_format_minor_version);
+    Py_INCREF(obj->build_epoch);
+    Py_INCREF(obj->database_type);
+    Py_INCREF(obj->description);
+    Py_INCREF(obj->ip_version);
+    Py_INCREF(obj->languages);
+    Py_INCREF(obj->node_count);
+    Py_INCREF(obj->record_size);
+
+    return 0;
+}
+
+static void Metadata_dealloc(PyObject *self) {
+    Metadata_obj *obj = (Metadata_obj *)self;
+    Py_DECREF(obj->binary_format_major_version);
+    Py_DECREF(obj->binary_format_minor_version);
+    Py_DECREF(obj->build_epoch);
+    Py_DECREF(obj->database_type);
+    Py_DECREF(obj->description);
+    Py_DECREF(obj->ip_version);
+    Py_DECREF(obj->languages);
+    Py_DECREF(obj->node_count);
+    Py_DECREF(obj->record_size);
+    PyObject_Del(self);
+}
+
+static PyObject *
+from_entry_data_list(maxminddb_state *state,
+                     MMDB_entry_data_list_s **entry_data_list) {
+    if (entry_data_list == NULL || *entry_data_list == NULL) {
+        PyErr_SetString(state->MaxMindDB_error,
+                        "Error while looking up data. Your database may be "
+                        "corrupt or you have found a bug in libmaxminddb.");
+        return NULL;
+    }
+
+    switch ((*entry_data_list)->entry_data.type) {
+        case MMDB_DATA_TYPE_MAP:
+            return from_map(state, entry_data_list);
+        case MMDB_DATA_TYPE_ARRAY:
+            return from_array(state, entry_data_list);
+        case MMDB_DATA_TYPE_UTF8_STRING:
+            return PyUnicode_FromStringAndSize(
+                (*entry_data_list)->entry_data.utf8_string,
+                (*entry_data_list)->entry_data.data_size);
+        case MMDB_DATA_TYPE_BYTES:
+            return PyByteArray_FromStringAndSize(
+                (const char *)(*entry_data_list)->entry_data.bytes,
+                (Py_ssize_t)(*entry_data_list)->entry_data.data_size);
+        case MMDB_DATA_TYPE_DOUBLE:
+            return PyFloat_FromDouble(
+                (*entry_data_list)->entry_data.double_value);
+        case MMDB_DATA_TYPE_FLOAT:
+            return PyFloat_FromDouble(
+                (*entry_data_list)->entry_data.float_value);
+        case MMDB_DATA_TYPE_UINT16:
+            return PyLong_FromLong((*entry_data_list)->entry_data.uint16);
+        case MMDB_DATA_TYPE_UINT32:
+            return PyLong_FromLong((*entry_data_list)->entry_data.uint32);
+        case MMDB_DATA_TYPE_BOOLEAN:
+            return PyBool_FromLong((*entry_data_list)->entry_data.boolean);
+        case MMDB_DATA_TYPE_UINT64:
+            return PyLong_FromUnsignedLongLong(
+                (*entry_data_list)->entry_data.uint64);
+        case MMDB_DATA_TYPE_UINT128:
+            return from_uint128(*entry_data_list);
+        case MMDB_DATA_TYPE_INT32:
+            return PyLong_FromLong((*entry_data_list)->entry_data.int32);
+        default:
+            PyErr_Format(state->MaxMindDB_error,
+                         "Invalid data type arguments: %d",
+                         (*entry_data_list)->entry_data.type);
+            return NULL;
+    }
+    return NULL;
+}
+
+static PyObject *from_map(maxminddb_state *state,
+                          MMDB_entry_data_list_s **entry_data_list) {
+    PyObject *py_obj = PyDict_New();
+    if (py_obj == NULL) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+
+    const uint32_t map_size = (*entry_data_list)->entry_data.data_size;
+
+    uint32_t i;
+    for (i = 0; i < map_size && *entry_data_list; i++) {
+        *entry_data_list = (*entry_data_list)->next;
+
+        PyObject *key = PyUnicode_FromStringAndSize(
+            (*entry_data_list)->entry_data.utf8_string,
+            (*entry_data_list)->entry_data.data_size);
+        if (!key) {
+            // PyUnicode_FromStringAndSize will set an appropriate exception
+            // in this case.
+            return NULL;
+        }
+
+        *entry_data_list = (*entry_data_list)->next;
+
+        PyObject *value = from_entry_data_list(state, entry_data_list);
+        if (value == NULL) {
+            Py_DECREF(key);
+            Py_DECREF(py_obj);
+            return NULL;
+        }
+        PyDict_SetItem(py_obj, key, value);
+        Py_DECREF(value);
+        Py_DECREF(key);
+    }
+
+    return py_obj;
+}
+
+static PyObject *from_array(maxminddb_state *state,
+                            MMDB_entry_data_list_s **entry_data_list) {
+    const uint32_t size = (*entry_data_list)->entry_data.data_size;
+
+    PyObject *py_obj = PyList_New(size);
+    if (py_obj == NULL) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+
+    uint32_t i;
+    for (i = 0; i < size && *entry_data_list; i++) {
+        *entry_data_list = (*entry_data_list)->next;
+        PyObject *value = from_entry_data_list(state, entry_data_list);
+        if (value == NULL) {
+            Py_DECREF(py_obj);
+            return NULL;
+        }
+        // PyList_SetItem 'steals' the reference
+        PyList_SetItem(py_obj, i, value);
+    }
+    return py_obj;
+}
+
+static PyObject *from_uint128(const MMDB_entry_data_list_s *entry_data_list) {
+    uint64_t high = 0;
+    uint64_t low = 0;
+#if MMDB_UINT128_IS_BYTE_ARRAY
+    int i;
+    for (i = 0; i < 8; i++) {
+        high = (high << 8) | entry_data_list->entry_data.uint128[i];
+    }
+
+    for (i = 8; i < 16; i++) {
+        low = (low << 8) | entry_data_list->entry_data.uint128[i];
+    }
+#else
+    high = entry_data_list->entry_data.uint128 >> 64;
+    low = (uint64_t)entry_data_list->entry_data.uint128;
+#endif
+
+    return uint128_to_pylong(high, low);
+}
+
+static PyObject *uint128_to_pylong(uint64_t high, uint64_t low) {
+    char num_str[33];
+    snprintf(num_str, sizeof(num_str), "%016" PRIX64 "%016" PRIX64, high, low);
+    return PyLong_FromString(num_str, NULL, 16);
+}
+
+// =============================================================================
+// Data section decoding
+// =============================================================================
+
+// The decoder below builds Python objects in a single pass directly from the
+// data section rather than first building an MMDB_entry_data_list_s with
+// MMDB_get_entry_data_list. It performs the same validation as libmaxminddb.
+// On invalid data, the functions return NULL and set decoder->status without
+// setting a Python exception so that callers may format their own error.
+
+#define MAX_DATA_STRUCTURE_DEPTH 512
+
+// Decodes values from a data section. reader may be NULL, in which case
+// nothing is cached and values are decoded with the default options.
+typedef struct {
+    Reader_obj *reader;
+    const uint8_t *data;
+    uint32_t size;
+    int status;
+} data_decoder;
+
+static PyObject *
+decode_value(data_decoder *decoder, uint32_t *offset, int depth);
+
+static inline PyObject *decoder_invalid(data_decoder *decoder) {
+    decoder->status = MMDB_INVALID_DATA_ERROR;
+    return NULL;
+}
+
+static inline uint64_t decode_uint(const uint8_t *p, uint32_t size) {
+    uint64_t value = 0;
+    for (uint32_t i = 0; i < size; i++) {
+        value = (value << 8) | p[i];
+    }
+    return value;
+}
+
+// Reads the control byte, and any extended type and size bytes, at *offset,
+// advancing it to the payload. For pointers, *size is set to the pointer
+// and *offset is advanced past it. Returns -1 if the data is invalid.
+static int decode_control(const data_decoder *decoder,
+                          uint32_t *offset,
+                          int *type,
+                          uint32_t *size) {
+    const uint8_t *data = decoder->data;
+    uint32_t remaining = decoder->size;
+    uint32_t off = *offset;
+    if (off >= remaining) {
+        return -1;
+    }
+    uint8_t ctrl = data[off++];
+    int data_type = ctrl >> 5;
+    if (data_type == MMDB_DATA_TYPE_EXTENDED) {
+        if (off >= remaining) {
+            return -1;
+        }
+        data_type = 7 + data[off++];
+    }
+    remaining -= off;
+
+    if (data_type == MMDB_DATA_TYPE_POINTER) {
+        uint32_t pointer_size = ((ctrl >> 3) & 3) + 1;
+        if (pointer_size > remaining) {
+            return -1;
+        }
+        uint32_t pointer = (uint32_t)decode_uint(&data[off], pointer_size);
+        switch (pointer_size) {
+            case 1:
+                pointer |= (uint32_t)(ctrl & 7) << 8;
+                break;
+            case 2:
+                pointer = 2048 + (pointer | (uint32_t)(ctrl & 7) << 16);
+                break;
+            case 3:
+                pointer = 526336 + (pointer | (uint32_t)(ctrl & 7) << 24);
+                break;
+            default:
+                break;
+        }
+        *type = data_type;
+        *size = pointer;
+        *offset = off + pointer_size;
+        return 0;
+    }
+
+    uint32_t data_size = ctrl & 31;
+    if (data_size >= 29) {
+        uint32_t bytes = data_size - 28;
+        if (bytes > remaining) {
+            return -1;
+        }
+        static const uint32_t size_base[] = {29, 285, 65821};
+        data_size =
+            size_base[bytes - 1] + (uint32_t)decode_uint(&data[off], bytes);
+        off += bytes;
+    }
+    *type = data_type;
+    *size = data_size;
+    *offset = off;
+    return 0;
+}
+
+// Reads the control byte at *offset, following a pointer if there is one.
+// *offset is advanced past the control byte or pointer and *value_offset is
+// set to the value's payload. Returns 1 if a pointer was followed, 0 if not,
+// and -1 if the data is invalid.
+static int decode_control_follow(const data_decoder *decoder,
+                                 uint32_t *offset,
+                                 uint32_t *value_offset,
+                                 int *type,
+                                 uint32_t *size) {
+    if (decode_control(decoder, offset, type, size) != 0) {
+        return -1;
+    }
+    *value_offset = *offset;
+    if (*type != MMDB_DATA_TYPE_POINTER) {
+        return 0;
+    }
+    *value_offset = *size;
+    if (decode_control(decoder, value_offset, type, size) != 0 ||
+        *type == MMDB_DATA_TYPE_POINTER) {
+        // Pointers to pointers are invalid.
+        return -1;
+    }
+    return 1;
+}
+
+// Decodes the string of the given size at offset, caching it in the given
+// table by its offset so that equal values share the same object.
+static PyObject *decode_cached_string(data_decoder *decoder,
+                                      offset_cache_entry *cache,
+                                      Py_ssize_t cache_size,
+                                      uint32_t offset,
+                                      uint32_t size) {
+    Reader_obj *reader = decoder->reader;
+    offset_cache_entry *slot = offset_cache_slot(cache, cache_size, offset);
+    reader_lock_cache(reader);
+    PyObject *value = slot->value != NULL && slot->offset == offset
+                          ? Py_NewRef(slot->value)
+                          : NULL;
+    reader_unlock_cache(reader);
+    if (value != NULL) {
+        return value;
+    }
+
+    value = PyUnicode_DecodeUTF8(
+        (const char *)&decoder->data[offset], (Py_ssize_t)size, NULL);
+    if (value != NULL) {
+        reader_lock_cache(reader);
+        PyObject *old = slot->value;
+        slot->offset = offset;
+        slot->value = Py_NewRef(value);
+        reader_unlock_cache(reader);
+        Py_XDECREF(old);
+    }
+    return value;
+}
+
+static PyObject *decode_key(data_decoder *decoder, uint32_t *offset) {
+    int type;
+    uint32_t size;
+    uint32_t key_offset;
+    int followed =
+        decode_control_follow(decoder, offset, &key_offset, &type, &size);
+    if (followed < 0 || type != MMDB_DATA_TYPE_UTF8_STRING ||
+        size > decoder->size - key_offset) {
+        return decoder_invalid(decoder);
+    }
+    if (!followed) {
+        *offset += size;
+    }
+
+    if (decoder->reader == NULL) {
+        // Without a key cache, keys are interned so that records still share
+        // the same key objects.
+        PyObject *key = PyUnicode_DecodeUTF8(
+            (const char *)&decoder->data[key_offset], (Py_ssize_t)size, NULL);
+        if (key != NULL) {
+            PyUnicode_InternInPlace(&key);
+        }
+        return key;
+    }
+    // Map keys are usually pointers to strings shared by every record. Keys
+    // are cached by the offset of the string so that records share the same
+    // key objects.
+    return decode_cached_string(
+        decoder, decoder->reader->key_cache, KEY_CACHE_SIZE, key_offset, size);
+}
+
+static PyObject *
+decode_map(data_decoder *decoder, uint32_t size, uint32_t *offset, int depth) {
+    // Each map entry needs at least a key and a value (1 byte each).
+    if (size > (decoder->size - *offset) / 2) {
+        return decoder_invalid(decoder);
+    }
+    PyObject *map = PyDict_New();
+    if (map == NULL) {
+        return NULL;
+    }
+    for (uint32_t i = 0; i < size; i++) {
+        PyObject *key = decode_key(decoder, offset);
+        if (key == NULL) {
+            Py_DECREF(map);
+            return NULL;
+        }
+        PyObject *value = decode_value(decoder, offset, depth);
+        if (value == NULL || PyDict_SetItem(map, key, value) != 0) {
+            Py_XDECREF(value);
+            Py_DECREF(key);
+            Py_DECREF(map);
+            return NULL;
+        }
+        Py_DECREF(value);
+        Py_DECREF(key);
+    }
+    Reader_obj *reader = decoder->reader;
+    if (reader == NULL) {
+        return map;
+    }
+    if (reader->map_factory != NULL) {
+        PyObject *result = PyObject_CallOneArg(reader->map_factory, map);
+        Py_DECREF(map);
+        return result;
+    }
+    if (reader->immutable_records) {
+        PyObject *proxy = PyDictProxy_New(map);
+        Py_DECREF(map);
+        return proxy;
+    }
+    return map;
+}
+
+static PyObject *decode_array(data_decoder *decoder,
+                              uint32_t size,
+                              uint32_t *offset,
+                              int depth) {
+    // Each array element needs at least 1 byte.
+    if (size > decoder->size - *offset) {
+        return decoder_invalid(decoder);
+    }
+    Reader_obj *reader = decoder->reader;
+    PyObject *factory = reader != NULL ? reader->array_factory : NULL;
+    // Arrays passed to a factory are always lists.
+    int immutable =
+        reader != NULL && reader->immutable_records && factory == NULL;
+    PyObject *array = immutable ? PyTuple_New(size) : PyList_New(size);
+    if (array == NULL) {
+        return NULL;
+    }
+    for (uint32_t i = 0; i < size; i++) {
+        PyObject *value = decode_value(decoder, offset, depth);
+        if (value == NULL) {
+            Py_DECREF(array);
+            return NULL;
+        }
+        if (immutable) {
+            PyTuple_SET_ITEM(array, i, value);
+        } else {
+            PyList_SET_ITEM(array, i, value);
+        }
+    }
+    if (factory != NULL) {
+        PyObject *result = PyObject_CallOneArg(factory, array);
+        Py_DECREF(array);
+        return result;
+    }
+    return array;
+}
+
+// Decodes the value of the given type whose payload starts at *offset,
+// advancing *offset past it.
+static PyObject *decode_payload(data_decoder *decoder,
+                                int type,
+                                uint32_t size,
+                                uint32_t *offset,
+                                int depth) {
+    switch (type) {
+        case MMDB_DATA_TYPE_MAP:
+            return decode_map(decoder, size, offset, depth + 1);
+        case MMDB_DATA_TYPE_ARRAY:
+            return decode_array(decoder, size, offset, depth + 1);
+        case MMDB_DATA_TYPE_BOOLEAN:
+            return PyBool_FromLong(size != 0);
+        default:
+            break;
+    }
+
+    if (size > decoder->size - *offset) {
+        return decoder_invalid(decoder);
+    }
+    const uint8_t *p = &decoder->data[*offset];
+    *offset += size;
+    Reader_obj *reader = decoder->reader;
+
+    switch (type) {
+        case MMDB_DATA_TYPE_UTF8_STRING:
+            if (reader != NULL && reader->string_cache != NULL) {
+                return decode_cached_string(decoder,
+                                            reader->string_cache,
+                                            reader->string_cache_size,
+                                            (uint32_t)(p - decoder->data),
+                                            size);
+            }
+            return PyUnicode_DecodeUTF8(
+                (const char *)p, (Py_ssize_t)size, NULL);
+        case MMDB_DATA_TYPE_BYTES:
+            // The pure Python reader, which decodes without a reader, returns
+            // bytes values as bytes.
+            if (reader == NULL || reader->bytes_values) {
+                return PyBytes_FromStringAndSize((const char *)p,
+                                                 (Py_ssize_t)size);
+            }
+            return PyByteArray_FromStringAndSize((const char *)p,
+                                                 (Py_ssize_t)size);
+        case MMDB_DATA_TYPE_DOUBLE: {
+            if (size != 8) {
+                return decoder_invalid(decoder);
+            }
+            uint64_t bits = decode_uint(p, 8);
+            double value;
+            memcpy(&value, &bits, sizeof(value));
+            return PyFloat_FromDouble(value);
+        }
+        case MMDB_DATA_TYPE_FLOAT: {
+            if (size != 4) {
+                return decoder_invalid(decoder);
+            }
+            uint32_t bits = (uint32_t)decode_uint(p, 4);
+            float value;
+            memcpy(&value, &bits, sizeof(value));
+            return PyFloat_FromDouble(value);
+        }
+        case MMDB_DATA_TYPE_UINT16:
+            if (size > 2) {
+                return decoder_invalid(decoder);
+            }
+            return PyLong_FromLong((long)decode_uint(p, size));
+        case MMDB_DATA_TYPE_UINT32:
+            if (size > 4) {
+                return decoder_invalid(decoder);
+            }
+            return PyLong_FromUnsignedLong((unsigned long)decode_uint(p, size));
+        case MMDB_DATA_TYPE_INT32:
+            if (size > 4) {
+                return decoder_invalid(decoder);
+            }
+            return PyLong_FromLong((int32_t)(uint32_t)decode_uint(p, size));
+        case MMDB_DATA_TYPE_UINT64:
+            if (size > 8) {
+                return decoder_invalid(decoder);
+            }
+            return PyLong_FromUnsignedLongLong(decode_uint(p, size));
+        case MMDB_DATA_TYPE_UINT128:
+            if (size > 16) {
+                return decoder_invalid(decoder);
+            }
+            if (size <= 8) {
+                return PyLong_FromUnsignedLongLong(decode_uint(p, size));
+            }
+            return uint128_to_pylong(decode_uint(p, size - 8),
+                                     decode_uint(p + size - 8, 8));
+        default:
+            return decoder_invalid(decoder);
+    }
+}
+
+// Returns whether a cached value must be copied before it is returned.
+static int is_mutable_value(PyObject *value) {
+    return PyDict_CheckExact(value) || PyList_CheckExact(value) ||
+           PyByteArray_CheckExact(value);
+}
+
+// Returns a copy of a cached value. Maps, arrays and bytes are copied as
+// the caller may modify them. Other values, including the maps, arrays and
+// bytes of readers with immutable records, are immutable and are shared
+// with the cache rather than copied.
+static PyObject *copy_value(PyObject *value) {
+    if (PyDict_CheckExact(value)) {
+        PyObject *copy = PyDict_Copy(value);
+        if (copy == NULL) {
+            return NULL;
+        }
+        Py_ssize_t pos = 0;
+        PyObject *key;
+        PyObject *item;
+        while (PyDict_Next(value, &pos, &key, &item)) {
+            if (!is_mutable_value(item)) {
+                continue;
+            }
+            PyObject *item_copy = copy_value(item);
+            if (item_copy == NULL ||
+                PyDict_SetItem(copy, key, item_copy) != 0) {
+                Py_XDECREF(item_copy);
+                Py_DECREF(copy);
+                return NULL;
+            }
+            Py_DECREF(item_copy);
+        }
+        return copy;
+    }
+    if (PyList_CheckExact(value)) {
+        Py_ssize_t size = PyList_GET_SIZE(value);
+        PyObject *copy = PyList_GetSlice(value, 0, size);
+        if (copy == NULL) {
+            return NULL;
+        }
+        for (Py_ssize_t i = 0; i < size; i++) {
+            PyObject *item = PyList_GET_ITEM(value, i);
+            if (!is_mutable_value(item)) {
+                continue;
+            }
+            PyObject *item_copy = copy_value(item);
+            // Steals the copy and releases the cached item.
+            if (item_copy == NULL || PyList_SetItem(copy, i, item_copy) != 0) {
+                Py_DECREF(copy);
+                return NULL;
+            }
+        }
+        return copy;
+    }
+    if (PyByteArray_CheckExact(value)) {
+        return PyByteArray_FromStringAndSize(PyByteArray_AS_STRING(value),
+                                             PyByteArray_GET_SIZE(value));
+    }
+    return Py_NewRef(value);
+}
+
+// Decodes the value a pointer points to. Shared structures, such as the
+// names of a country, are stored once and referenced with pointers, so the
+// decoded values are cached when the reader has a pointer cache.
+static PyObject *
+decode_pointer_target(data_decoder *decoder, uint32_t pointer, int depth) {
+    int type;
+    uint32_t size;
+    uint32_t offset = pointer;
+    if (decode_control(decoder, &offset, &type, &size) != 0 ||
+        type == MMDB_DATA_TYPE_POINTER) {
+        // Pointers to pointers are invalid.
+        return decoder_invalid(decoder);
+    }
+
+    Reader_obj *reader = decoder->reader;
+    if (reader == NULL || reader->pointer_cache == NULL) {
+        return decode_payload(decoder, type, size, &offset, depth);
+    }
+
+    offset_cache_entry *slot = offset_cache_slot(
+        reader->pointer_cache, reader->pointer_cache_size, pointer);
+    reader_lock_cache(reader);
+    PyObject *cached = slot->value != NULL && slot->offset == pointer
+                           ? Py_NewRef(slot->value)
+                           : NULL;
+    reader_unlock_cache(reader);
+    if (cached == NULL) {
+        cached = decode_payload(decoder, type, size, &offset, depth);
+        if (cached == NULL) {
+            return NULL;
+        }
+        reader_lock_cache(reader);
+        PyObject *old = slot->value;
+        slot->offset = pointer;
+        slot->value = Py_NewRef(cached);
+        reader_unlock_cache(reader);
+        Py_XDECREF(old);
+    }
+
+    PyObject *value = copy_value(cached);
+    Py_DECREF(cached);
+    return value;
+}
+
+static PyObject *
+decode_value(data_decoder *decoder, uint32_t *offset, int depth) {
+    if (depth >= MAX_DATA_STRUCTURE_DEPTH) {
+        return decoder_invalid(decoder);
+    }
+    int type;
+    uint32_t size;
+    if (decode_control(decoder, offset, &type, &size) != 0) {
+        return decoder_invalid(decoder);
+    }
+    if (type == MMDB_DATA_TYPE_POINTER) {
+        // The value following a pointer starts after the pointer rather
+        // than after the value it points to, so *offset is not advanced.
+        return decode_pointer_target(decoder, size, depth);
+    }
+    return decode_payload(decoder, type, size, offset, depth);
+}
+
+// Decodes the record at entry. On invalid data, NULL is returned with
+// *status set to the libmaxminddb error and no Python exception set.
+static PyObject *
+decode_entry(Reader_obj *reader, const MMDB_entry_s *entry, int *status) {
+    data_decoder decoder = {.reader = reader,
+                            .data = entry->mmdb->data_section,
+                            .size = entry->mmdb->data_section_size,
+                            .status = MMDB_SUCCESS};
+    uint32_t offset = entry->offset;
+    int busy = reader->map_factory != NULL || reader->array_factory != NULL;
+    if (busy) {
+        reader_enter_busy(reader);
+    }
+    PyObject *value = decode_value(&decoder, &offset, 0);
+    if (busy) {
+        reader_leave_busy(reader);
+    }
+    *status = decoder.status;
+    return value;
+}
+
+// Decodes the value at offset in any object supporting the buffer protocol,
+// such as the bytes or mmap of the pure Python reader. Pointers are relative
+// to pointer_base, the start of the data section. Returns a tuple of the
+// value and the offset following it, like maxminddb.decoder.Decoder.decode.
+static PyObject *maxminddb_decode(PyObject *module, PyObject *args) {
+    maxminddb_state *state = get_maxminddb_state(module);
+    Py_buffer buffer;
+    Py_ssize_t offset;
+    Py_ssize_t pointer_base;
+    if (!PyArg_ParseTuple(args, "y*nn", &buffer, &offset, &pointer_base)) {
+        return NULL;
+    }
+    if (pointer_base < 0 || pointer_base > buffer.len ||
+        offset < pointer_base) {
+        PyBuffer_Release(&buffer);
+        PyErr_SetString(PyExc_ValueError,
+                        "pointer_base must be within the buffer and not "
+                        "after offset");
+        return NULL;
+    }
+
+    // Offsets in the data section are 32 bits, so larger buffers are only
+    // read up to the first 4 GiB following pointer_base.
+    Py_ssize_t size = buffer.len - pointer_base;
+    Py_ssize_t start = offset - pointer_base;
+    data_decoder decoder = {.reader = NULL,
+                            .data = (const uint8_t *)buffer.buf + pointer_base,
+                            .size =
+                                size > UINT32_MAX ? UINT32_MAX : (uint32_t)size,
+                            .status = MMDB_SUCCESS};
+    uint32_t value_offset = start > UINT32_MAX ? UINT32_MAX : (uint32_t)start;
+    PyObject *value = decode_value(&decoder, &value_offset, 0);
+    PyBuffer_Release(&buffer);
+    if (value == NULL) {
+        if (decoder.status != MMDB_SUCCESS) {
+            PyErr_Format(state->MaxMindDB_error,
+                         "Error while decoding data at offset %zd. %s",
+                         offset,
+                         MMDB_strerror(decoder.status));
+        }
+        return NULL;
+    }
+    return Py_BuildValue(
+        "(Nn)", value, pointer_base + (Py_ssize_t)value_offset);
+}
+
+// The methods of a visitor passed to Reader.visit.
+typedef struct {
+    PyObject *start_map;
+    PyObject *end_map;
+    PyObject *start_array;
+    PyObject *end_array;
+    PyObject *key;
+    PyObject *value;
+} visitor_methods;
+
+static void visitor_methods_clear(visitor_methods *methods) {
+    Py_CLEAR(methods->start_map);
+    Py_CLEAR(methods->end_map);
+    Py_CLEAR(methods->start_array);
+    Py_CLEAR(methods->end_array);
+    Py_CLEAR(methods->key);
+    Py_CLEAR(methods->value);
+}
+
+static int visitor_methods_get(visitor_methods *methods, PyObject *visitor) {
+    *methods = (visitor_methods){0};
+    if ((methods->start_map = PyObject_GetAttrString(visitor, "start_map")) ==
+            NULL ||
+        (methods->end_map = PyObject_GetAttrString(visitor, "end_map")) ==
+            NULL ||
+        (methods->start_array =
+             PyObject_GetAttrString(visitor, "start_array")) == NULL ||
+        (methods->end_array = PyObject_GetAttrString(visitor, "end_array")) ==
+            NULL ||
+        (methods->key = PyObject_GetAttrString(visitor, "key")) == NULL ||
+        (methods->value = PyObject_GetAttrString(visitor, "value")) == NULL) {
+        visitor_methods_clear(methods);
+        return -1;
+    }
+    return 0;
+}
+
+// Calls method with arg, which is stolen. arg may be NULL if creating it
+// failed, in which case -1 is returned without calling the method.
+static int visitor_call(PyObject *method, PyObject *arg) {
+    if (arg == NULL) {
+        return -1;
+    }
+    PyObject *result = PyObject_CallOneArg(method, arg);
+    Py_DECREF(arg);
+    if (result == NULL) {
+        return -1;
+    }
+    Py_DECREF(result);
+    return 0;
+}
+
+static int visitor_end(PyObject *method) {
+    PyObject *result = PyObject_CallNoArgs(method);
+    if (result == NULL) {
+        return -1;
+    }
+    Py_DECREF(result);
+    return 0;
+}
+
+// Passes the value at *offset to the visitor, advancing *offset past it.
+// Maps and arrays are reported by their start and end events rather than
+// being built.
+static int visit_value(data_decoder *decoder,
+                       const visitor_methods *visitor,
+                       uint32_t *offset,
+                       int depth) {
+    if (depth >= MAX_DATA_STRUCTURE_DEPTH) {
+        decoder_invalid(decoder);
+        return -1;
+    }
+    int type;
+    uint32_t size;
+    uint32_t value_offset;
+    int followed =
+        decode_control_follow(decoder, offset, &value_offset, &type, &size);
+    if (followed < 0) {
+        decoder_invalid(decoder);
+        return -1;
+    }
+    // The value following a pointer starts after the pointer rather than
+    // after the value it points to.
+    uint32_t *payload = followed ? &value_offset : offset;
+
+    switch (type) {
+        case MMDB_DATA_TYPE_MAP:
+            // Each map entry needs at least a key and a value (1 byte each).
+            if (size > (decoder->size - *payload) / 2) {
+                decoder_invalid(decoder);
+                return -1;
+            }
+            if (visitor_call(visitor->start_map,
+                             PyLong_FromUnsignedLong(size)) != 0) {
+                return -1;
+            }
+            for (uint32_t i = 0; i < size; i++) {
+                if (visitor_call(visitor->key, decode_key(decoder, payload)) !=
+                        0 ||
+                    visit_value(decoder, visitor, payload, depth + 1) != 0) {
+                    return -1;
+                }
+            }
+            return visitor_end(visitor->end_map);
+        case MMDB_DATA_TYPE_ARRAY:
+            // Each array element needs at least 1 byte.
+            if (size > decoder->size - *payload) {
+                decoder_invalid(decoder);
+                return -1;
+            }
+            if (visitor_call(visitor->start_array,
+                             PyLong_FromUnsignedLong(size)) != 0) {
+                return -1;
+            }
+            for (uint32_t i = 0; i < size; i++) {
+                if (visit_value(decoder, visitor, payload, depth + 1) != 0) {
+                    return -1;
+                }
+            }
+            return visitor_end(visitor->end_array);
+        default:
+            return visitor_call(
+                visitor->value,
+                decode_payload(decoder, type, size, payload, depth));
+    }
+}
+
+// Passes the record at entry to visitor. On invalid data, -1 is returned
+// with *status set to the libmaxminddb error and no Python exception set.
+static int visit_entry(Reader_obj *reader,
+                       const MMDB_entry_s *entry,
+                       PyObject *visitor,
+                       int *status) {
+    visitor_methods methods;
+    if (visitor_methods_get(&methods, visitor) != 0) {
+        return -1;
+    }
+    data_decoder decoder = {.reader = reader,
+                            .data = entry->mmdb->data_section,
+                            .size = entry->mmdb->data_section_size,
+                            .status = MMDB_SUCCESS};
+    uint32_t offset = entry->offset;
+    reader_enter_busy(reader);
+    int ret = visit_value(&decoder, &methods, &offset, 0);
+    reader_leave_busy(reader);
+    visitor_methods_clear(&methods);
+    *status = decoder.status;
+    return ret;
+}
+
+// =============================================================================
+// JSON encoding
+// =============================================================================
+
+typedef struct {
+    char *data;
+    size_t size;
+    size_t capacity;
+} json_buffer;
+
+static int json_reserve(json_buffer *buf, size_t needed) {
+    if (buf->capacity - buf->size >= needed) {
+        return 0;
+    }
+    size_t capacity = buf->capacity ? buf->capacity : 256;
+    while (capacity - buf->size < needed) {
+        if (capacity > PY_SSIZE_T_MAX / 2) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        capacity *= 2;
+    }
+    char *data = PyMem_Realloc(buf->data, capacity);
+    if (data == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    buf->data = data;
+    buf->capacity = capacity;
+    return 0;
+}
+
+static int json_append(json_buffer *buf, const char *str, size_t len) {
+    if (json_reserve(buf, len) != 0) {
+        return -1;
+    }
+    memcpy(buf->data + buf->size, str, len);
+    buf->size += len;
+    return 0;
+}
+
+static inline int json_append_char(json_buffer *buf, char c) {
+    return json_append(buf, &c, 1);
+}
+
+static int json_append_object_str(json_buffer *buf, PyObject *obj) {
+    if (obj == NULL) {
+        return -1;
+    }
+    PyObject *str = PyObject_Str(obj);
+    Py_DECREF(obj);
+    if (str == NULL) {
         return -1;
     }
+    Py_ssize_t len;
+    const char *utf8 = PyUnicode_AsUTF8AndSize(str, &len);
+    int status = utf8 == NULL ? -1 : json_append(buf, utf8, (size_t)len);
+    Py_DECREF(str);
+    return status;
+}
 
-    Metadata_obj *obj = (Metadata_obj *)self;
+// Appends a JSON string. The escaping matches json.dumps with
+// ensure_ascii=False so that both readers produce identical output.
+static int
+json_append_string(json_buffer *buf, const char *str, uint32_t size) {
+    static const char hex[] = "0123456789abcdef";
+    bool ascii = true;
 
-    obj->binary_format_major_version = binary_format_major_version;
-    obj->binary_format_minor_version = binary_format_minor_version;
-    obj->build_epoch = build_epoch;
-    obj->database_type = database_type;
-    obj->description = description;
-    obj->ip_version = ip_version;
-    obj->languages = languages;
-    obj->node_count = node_count;
-    obj->record_size = record_size;
+    // Worst case, every byte is escaped as \u00XX.
+    if (json_reserve(buf, (size_t)size * 6 + 2) != 0) {
+        return -1;
+    }
+    char *out = buf->data + buf->size;
+    *out++ = '"';
+    for (uint32_t i = 0; i < size; i++) {
+        unsigned char c = (unsigned char)str[i];
+        switch (c) {
+            case '"':
+                *out++ = '\\';
+                *out++ = '"';
+                break;
+            case '\\':
+                *out++ = '\\';
+                *out++ = '\\';
+                break;
+            case '\b':
+                *out++ = '\\';
+                *out++ = 'b';
+                break;
+            case '\f':
+                *out++ = '\\';
+                *out++ = 'f';
+                break;
+            case '\n':
+                *out++ = '\\';
+                *out++ = 'n';
+                break;
+            case '\r':
+                *out++ = '\\';
+                *out++ = 'r';
+                break;
+            case '\t':
+                *out++ = '\\';
+                *out++ = 't';
+                break;
+            default:
+                if (c < 0x20) {
+                    *out++ = '\\';
+                    *out++ = 'u';
+                    *out++ = '0';
+                    *out++ = '0';
+                    *out++ = hex[c >> 4];
+                    *out++ = hex[c & 0xF];
+                } else {
+                    ascii &= c < 0x80;
+                    *out++ = (char)c;
+                }
+        }
+    }
+    *out++ = '"';
 
-    Py_INCREF(obj->binary_format_major_version);
-    Py_INCREF(obj->binary_format_minor_version);
-    Py_INCREF(obj->build_epoch);
-    Py_INCREF(obj->database_type);
-    Py_INCREF(obj->description);
-    Py_INCREF(obj->ip_version);
-    Py_INCREF(obj->languages);
-    Py_INCREF(obj->node_count);
-    Py_INCREF(obj->record_size);
+    if (!ascii) {
+        // Raise the same UnicodeDecodeError as the record decoding would.
+        PyObject *check = PyUnicode_DecodeUTF8(str, size, "strict");
+        if (check == NULL) {
+            return -1;
+        }
+        Py_DECREF(check);
+    }
 
+    buf->size = (size_t)(out - buf->data);
     return 0;
 }
 
-static void Metadata_dealloc(PyObject *self) {
-    Metadata_obj *obj = (Metadata_obj *)self;
-    Py_DECREF(obj->binary_format_major_version);
-    Py_DECREF(obj->binary_format_minor_version);
-    Py_DECREF(obj->build_epoch);
-    Py_DECREF(obj->database_type);
-    Py_DECREF(obj->description);
-    Py_DECREF(obj->ip_version);
-    Py_DECREF(obj->languages);
-    Py_DECREF(obj->node_count);
-    Py_DECREF(obj->record_size);
-    PyObject_Del(self);
+static int json_append_double(json_buffer *buf, double value) {
+    if (isnan(value)) {
+        return json_append(buf, "NaN", 3);
+    }
+    if (isinf(value)) {
+        return value > 0 ? json_append(buf, "Infinity", 8)
+                         : json_append(buf, "-Infinity", 9);
+    }
+    char *repr = PyOS_double_to_string(value, 'r', 0, Py_DTSF_ADD_DOT_0, NULL);
+    if (repr == NULL) {
+        return -1;
+    }
+    int status = json_append(buf, repr, strlen(repr));
+    PyMem_Free(repr);
+    return status;
 }
 
-static PyObject *
-from_entry_data_list(maxminddb_state *state,
-                     MMDB_entry_data_list_s **entry_data_list) {
+static int json_from_entry_data_list(maxminddb_state *state,
+                                     json_buffer *buf,
+                                     MMDB_entry_data_list_s **entry_data_list) {
     if (entry_data_list == NULL || *entry_data_list == NULL) {
         PyErr_SetString(state->MaxMindDB_error,
                         "Error while looking up data. Your database may be "
                         "corrupt or you have found a bug in libmaxminddb.");
-        return NULL;
+        return -1;
     }
 
-    switch ((*entry_data_list)->entry_data.type) {
-        case MMDB_DATA_TYPE_MAP:
-            return from_map(state, entry_data_list);
-        case MMDB_DATA_TYPE_ARRAY:
-            return from_array(state, entry_data_list);
+    MMDB_entry_data_s *entry_data = &(*entry_data_list)->entry_data;
+    char number[32];
+    switch (entry_data->type) {
+        case MMDB_DATA_TYPE_MAP: {
+            const uint32_t map_size = entry_data->data_size;
+            if (json_append_char(buf, '{') != 0) {
+                return -1;
+            }
+            for (uint32_t i = 0; i < map_size && *entry_data_list; i++) {
+                *entry_data_list = (*entry_data_list)->next;
+                if (*entry_data_list == NULL) {
+                    break;
+                }
+                if ((i > 0 && json_append_char(buf, ',') != 0) ||
+                    json_append_string(
+                        buf,
+                        (*entry_data_list)->entry_data.utf8_string,
+                        (*entry_data_list)->entry_data.data_size) != 0 ||
+                    json_append_char(buf, ':') != 0) {
+                    return -1;
+                }
+                *entry_data_list = (*entry_data_list)->next;
+                if (json_from_entry_data_list(state, buf, entry_data_list) !=
+                    0) {
+                    return -1;
+                }
+            }
+            return json_append_char(buf, '}');
+        }
+        case MMDB_DATA_TYPE_ARRAY: {
+            const uint32_t size = entry_data->data_size;
+            if (json_append_char(buf, '[') != 0) {
+                return -1;
+            }
+            for (uint32_t i = 0; i < size && *entry_data_list; i++) {
+                *entry_data_list = (*entry_data_list)->next;
+                if ((i > 0 && json_append_char(buf, ',') != 0) ||
+                    json_from_entry_data_list(state, buf, entry_data_list) !=
+                        0) {
+                    return -1;
+                }
+            }
+            return json_append_char(buf, ']');
+        }
         case MMDB_DATA_TYPE_UTF8_STRING:
-            return PyUnicode_FromStringAndSize(
-                (*entry_data_list)->entry_data.utf8_string,
-                (*entry_data_list)->entry_data.data_size);
-        case MMDB_DATA_TYPE_BYTES:
-            return PyByteArray_FromStringAndSize(
-                (const char *)(*entry_data_list)->entry_data.bytes,
-                (Py_ssize_t)(*entry_data_list)->entry_data.data_size);
+            return json_append_string(
+                buf, entry_data->utf8_string, entry_data->data_size);
+        case MMDB_DATA_TYPE_BYTES: {
+            // JSON has no binary type, so bytes are written as a hex string.
+            static const char hex[] = "0123456789abcdef";
+            const uint32_t size = entry_data->data_size;
+            if (json_reserve(buf, (size_t)size * 2 + 2) != 0) {
+                return -1;
+            }
+            char *out = buf->data + buf->size;
+            *out++ = '"';
+            for (uint32_t i = 0; i < size; i++) {
+                *out++ = hex[entry_data->bytes[i] >> 4];
+                *out++ = hex[entry_data->bytes[i] & 0xF];
+            }
+            *out++ = '"';
+            buf->size = (size_t)(out - buf->data);
+            return 0;
+        }
         case MMDB_DATA_TYPE_DOUBLE:
-            return PyFloat_FromDouble(
-                (*entry_data_list)->entry_data.double_value);
+            return json_append_double(buf, entry_data->double_value);
         case MMDB_DATA_TYPE_FLOAT:
-            return PyFloat_FromDouble(
-                (*entry_data_list)->entry_data.float_value);
+            return json_append_double(buf, entry_data->float_value);
         case MMDB_DATA_TYPE_UINT16:
-            return PyLong_FromLong((*entry_data_list)->entry_data.uint16);
+            return json_append(
+                buf,
+                number,
+                (size_t)snprintf(
+                    number, sizeof(number), "%" PRIu16, entry_data->uint16));
         case MMDB_DATA_TYPE_UINT32:
-            return PyLong_FromLong((*entry_data_list)->entry_data.uint32);
+            return json_append(
+                buf,
+                number,
+                (size_t)snprintf(
+                    number, sizeof(number), "%" PRIu32, entry_data->uint32));
         case MMDB_DATA_TYPE_BOOLEAN:
-            return PyBool_FromLong((*entry_data_list)->entry_data.boolean);
+            return entry_data->boolean ? json_append(buf, "true", 4)
+                                       : json_append(buf, "false", 5);
         case MMDB_DATA_TYPE_UINT64:
-            return PyLong_FromUnsignedLongLong(
-                (*entry_data_list)->entry_data.uint64);
+            return json_append(
+                buf,
+                number,
+                (size_t)snprintf(
+                    number, sizeof(number), "%" PRIu64, entry_data->uint64));
         case MMDB_DATA_TYPE_UINT128:
-            return from_uint128(*entry_data_list);
+            return json_append_object_str(buf, from_uint128(*entry_data_list));
         case MMDB_DATA_TYPE_INT32:
-            return PyLong_FromLong((*entry_data_list)->entry_data.int32);
+            return json_append(
+                buf,
+                number,
+                (size_t)snprintf(
+                    number, sizeof(number), "%" PRId32, entry_data->int32));
         default:
             PyErr_Format(state->MaxMindDB_error,
                          "Invalid data type arguments: %d",
-                         (*entry_data_list)->entry_data.type);
-            return NULL;
-    }
-    return NULL;
-}
-
-static PyObject *from_map(maxminddb_state *state,
-                          MMDB_entry_data_list_s **entry_data_list) {
-    PyObject *py_obj = PyDict_New();
-    if (py_obj == NULL) {
-        PyErr_NoMemory();
-        return NULL;
+                         entry_data->type);
+            return -1;
     }
-
-    const uint32_t map_size = (*entry_data_list)->entry_data.data_size;
-
-    uint32_t i;
-    for (i = 0; i < map_size && *entry_data_list; i++) {
-        *entry_data_list = (*entry_data_list)->next;
-
-        PyObject *key = PyUnicode_FromStringAndSize(
-            (*entry_data_list)->entry_data.utf8_string,
-            (*entry_data_list)->entry_data.data_size);
-        if (!key) {
-            // PyUnicode_FromStringAndSize will set an appropriate exception
-            // in this case.
-            return NULL;
-        }
-
-        *entry_data_list = (*entry_data_list)->next;
-
-        PyObject *value = from_entry_data_list(state, entry_data_list);
-        if (value == NULL) {
-            Py_DECREF(key);
-            Py_DECREF(py_obj);
-            return NULL;
-        }
-        PyDict_SetItem(py_obj, key, value);
-        Py_DECREF(value);
-        Py_DECREF(key);
-    }
-
-    return py_obj;
 }
 
-static PyObject *from_array(maxminddb_state *state,
-                            MMDB_entry_data_list_s **entry_data_list) {
-    const uint32_t size = (*entry_data_list)->entry_data.data_size;
-
-    PyObject *py_obj = PyList_New(size);
-    if (py_obj == NULL) {
-        PyErr_NoMemory();
+static PyObject *json_from_entry(maxminddb_state *state,
+                                 const MMDB_entry_s *entry) {
+    MMDB_entry_data_list_s *entry_data_list = NULL;
+    int status =
+        MMDB_get_entry_data_list((MMDB_entry_s *)entry, &entry_data_list);
+    if (status != MMDB_SUCCESS) {
+        PyErr_Format(state->MaxMindDB_error,
+                     "Error while looking up data. %s",
+                     MMDB_strerror(status));
+        MMDB_free_entry_data_list(entry_data_list);
         return NULL;
     }
 
-    uint32_t i;
-    for (i = 0; i < size && *entry_data_list; i++) {
-        *entry_data_list = (*entry_data_list)->next;
-        PyObject *value = from_entry_data_list(state, entry_data_list);
-        if (value == NULL) {
-            Py_DECREF(py_obj);
-            return NULL;
-        }
-        // PyList_SetItem 'steals' the reference
-        PyList_SetItem(py_obj, i, value);
-    }
-    return py_obj;
-}
-
-static PyObject *from_uint128(const MMDB_entry_data_list_s *entry_data_list) {
-    uint64_t high = 0;
-    uint64_t low = 0;
-#if MMDB_UINT128_IS_BYTE_ARRAY
-    int i;
-    for (i = 0; i < 8; i++) {
-        high = (high << 8) | entry_data_list->entry_data.uint128[i];
-    }
-
-    for (i = 8; i < 16; i++) {
-        low = (low << 8) | entry_data_list->entry_data.uint128[i];
-    }
-#else
-    high = entry_data_list->entry_data.uint128 >> 64;
-    low = (uint64_t)entry_data_list->entry_data.uint128;
-#endif
-
-    char *num_str = malloc(33);
-    if (num_str == NULL) {
-        PyErr_NoMemory();
-        return NULL;
+    json_buffer buf = {0};
+    MMDB_entry_data_list_s *cur = entry_data_list;
+    PyObject *json = NULL;
+    if (json_from_entry_data_list(state, &buf, &cur) == 0) {
+        json = PyBytes_FromStringAndSize(buf.data, (Py_ssize_t)buf.size);
     }
-
-    snprintf(num_str, 33, "%016" PRIX64 "%016" PRIX64, high, low);
-
-    PyObject *py_obj = PyLong_FromString(num_str, NULL, 16);
-
-    free(num_str);
-    return py_obj;
+    PyMem_Free(buf.data);
+    MMDB_free_entry_data_list(entry_data_list);
+    return json;
 }
 
 static bool can_read(const char *path) {
@@ -1189,10 +3746,48 @@ static PyMethodDef Reader_methods[] = {
      Reader_get_with_prefix_len,
      METH_VARARGS,
      "Return a tuple with the record and the associated prefix length"},
+    {"get_json",
+     Reader_get_json,
+     METH_VARARGS,
+     "Return the record for the ip_address in the MaxMind DB as JSON bytes"},
+    {"get_columns",
+     (PyCFunction)(void (*)(void))Reader_get_columns,
+     METH_VARARGS | METH_KEYWORDS,
+     "Return the values of fields for many IP addresses as columns"},
+    {"get_columns_with_prefix_len",
+     (PyCFunction)(void (*)(void))Reader_get_columns_with_prefix_len,
+     METH_VARARGS | METH_KEYWORDS,
+     "Return the values of fields and the prefix lengths for many IP "
+     "addresses"},
+    {"get_offsets_with_prefix_len",
+     (PyCFunction)(void (*)(void))Reader_get_offsets_with_prefix_len,
+     METH_VARARGS | METH_KEYWORDS,
+     "Return the offsets of the records and the prefix lengths for many IP "
+     "addresses"},
+    {"iter_offsets",
+     Reader_iter_offsets,
+     METH_NOARGS,
+     "Iterate over the networks and the offsets of their records"},
+    {"get_by_offset",
+     (PyCFunction)(void (*)(void))Reader_get_by_offset,
+     METH_VARARGS | METH_KEYWORDS,
+     "Return the record at an offset in the data section, or a value in it"},
+    {"visit",
+     Reader_visit,
+     METH_VARARGS,
+     "Pass the record for the ip_address to a visitor as a series of events"},
     {"metadata",
      Reader_metadata,
      METH_NOARGS,
      "Return metadata object for database"},
+    {"warm",
+     (PyCFunction)(void (*)(void))Reader_warm,
+     METH_VARARGS | METH_KEYWORDS,
+     "Read the database into memory ahead of lookups"},
+    {"residency",
+     Reader_residency,
+     METH_NOARGS,
+     "Return how much of the search tree and data section is in memory"},
     {"close", Reader_close, METH_NOARGS, "Closes database"},
     {"__exit__",
      Reader__exit__,
@@ -1202,10 +3797,19 @@ static PyMethodDef Reader_methods[] = {
      Reader__enter__,
      METH_NOARGS,
      "Called when entering a with-context."},
+    {"__reduce__",
+     Reader__reduce__,
+     METH_NOARGS,
+     "Pickle the reader by the path and identity of the database file"},
     {NULL, NULL, 0, NULL}};
 
 static PyMemberDef Reader_members[] = {
     {"closed", T_OBJECT, offsetof(Reader_obj, closed), READONLY, NULL},
+    {"__weaklistoffset__",
+     T_PYSSIZET,
+     offsetof(Reader_obj, weakreflist),
+     READONLY,
+     NULL},
     {NULL, 0, 0, 0, NULL}};
 
 static PyMethodDef ReaderIter_methods[] = {{NULL, NULL, 0, NULL}};
@@ -1309,7 +3913,83 @@ static PyType_Spec ReaderIter_Type_spec = {
     .slots = ReaderIter_Type_slots,
 };
 
-static PyMethodDef MaxMindDB_methods[] = {{NULL, NULL, 0, NULL}};
+static PyObject *maxminddb_after_fork(PyObject *module,
+                                      PyObject *UNUSED(args)) {
+    maxminddb_state *state = get_maxminddb_state(module);
+    PyObject *readers = PySequence_List(state->readers);
+    if (readers == NULL) {
+        return NULL;
+    }
+    for (Py_ssize_t i = 0; i < PyList_GET_SIZE(readers); i++) {
+        reader_after_fork((Reader_obj *)PyList_GET_ITEM(readers, i));
+    }
+    Py_DECREF(readers);
+    Py_RETURN_NONE;
+}
+
+#ifndef MS_WINDOWS
+static PyObject *maxminddb_mlock(PyObject *UNUSED(module), PyObject *args) {
+    Py_buffer buffer;
+    Py_ssize_t length;
+    if (!PyArg_ParseTuple(args, "y*n", &buffer, &length)) {
+        return NULL;
+    }
+    if (length < 0 || length > buffer.len) {
+        PyBuffer_Release(&buffer);
+        PyErr_SetString(PyExc_ValueError, "length is out of range");
+        return NULL;
+    }
+    int const status = mlock(buffer.buf, (size_t)length);
+    PyBuffer_Release(&buffer);
+    if (status != 0) {
+        return PyErr_SetFromErrno(PyExc_OSError);
+    }
+    Py_RETURN_NONE;
+}
+
+static PyObject *maxminddb_resident(PyObject *UNUSED(module), PyObject *args) {
+    Py_buffer buffer;
+    Py_ssize_t offset;
+    Py_ssize_t length;
+    if (!PyArg_ParseTuple(args, "y*nn", &buffer, &offset, &length)) {
+        return NULL;
+    }
+    if (offset < 0 || length < 0 || offset > buffer.len ||
+        length > buffer.len - offset) {
+        PyBuffer_Release(&buffer);
+        PyErr_SetString(PyExc_ValueError, "offset or length is out of range");
+        return NULL;
+    }
+    Py_ssize_t const resident =
+        resident_bytes((const uint8_t *)buffer.buf + offset, (size_t)length);
+    PyBuffer_Release(&buffer);
+    if (resident < 0) {
+        return NULL;
+    }
+    return PyLong_FromSsize_t(resident);
+}
+#endif
+
+static PyMethodDef MaxMindDB_methods[] = {
+    {"decode",
+     maxminddb_decode,
+     METH_VARARGS,
+     "Decodes the value at an offset of a buffer containing a MaxMind DB"},
+#ifndef MS_WINDOWS
+    {"_mlock",
+     maxminddb_mlock,
+     METH_VARARGS,
+     "Locks the first length bytes of a buffer in memory"},
+    {"_resident",
+     maxminddb_resident,
+     METH_VARARGS,
+     "Returns the number of bytes of a range of a buffer that are in memory"},
+#endif
+    {"_after_fork",
+     maxminddb_after_fork,
+     METH_NOARGS,
+     "Resets the open readers in the child process after a fork"},
+    {NULL, NULL, 0, NULL}};
 
 // =============================================================================
 // Module state management functions for PEP 489
@@ -1322,6 +4002,7 @@ static int maxminddb_traverse(PyObject *module, visitproc visit, void *arg) {
     Py_VISIT(state->Metadata_Type);
     Py_VISIT(state->MaxMindDB_error);
     Py_VISIT(state->ipaddress_ip_network);
+    Py_VISIT(state->readers);
     return 0;
 }
 
@@ -1332,6 +4013,7 @@ static int maxminddb_clear(PyObject *module) {
     Py_CLEAR(state->Metadata_Type);
     Py_CLEAR(state->MaxMindDB_error);
     Py_CLEAR(state->ipaddress_ip_network);
+    Py_CLEAR(state->readers);
     return 0;
 }
 
@@ -1394,6 +4076,47 @@ static int maxminddb_exec(PyObject *module) {
         return -1;
     }
 
+    PyObject *weakref_mod = PyImport_ImportModule("weakref");
+    if (weakref_mod == NULL) {
+        return -1;
+    }
+    state->readers = PyObject_CallMethod(weakref_mod, "WeakSet", NULL);
+    Py_DECREF(weakref_mod);
+    if (state->readers == NULL) {
+        return -1;
+    }
+
+    PyObject *os_mod = PyImport_ImportModule("os");
+    if (os_mod == NULL) {
+        return -1;
+    }
+    if (PyObject_HasAttrString(os_mod, "register_at_fork")) {
+        PyObject *after_fork = PyObject_GetAttrString(module, "_after_fork");
+        PyObject *register_at_fork =
+            PyObject_GetAttrString(os_mod, "register_at_fork");
+        PyObject *fork_args = PyTuple_New(0);
+        PyObject *fork_kwargs =
+            after_fork != NULL
+                ? Py_BuildValue("{s:O}", "after_in_child", after_fork)
+                : NULL;
+        PyObject *registered = NULL;
+        if (register_at_fork != NULL && fork_args != NULL &&
+            fork_kwargs != NULL) {
+            registered =
+                PyObject_Call(register_at_fork, fork_args, fork_kwargs);
+        }
+        Py_XDECREF(after_fork);
+        Py_XDECREF(register_at_fork);
+        Py_XDECREF(fork_args);
+        Py_XDECREF(fork_kwargs);
+        if (registered == NULL) {
+            Py_DECREF(os_mod);
+            return -1;
+        }
+        Py_DECREF(registered);
+    }
+    Py_DECREF(os_mod);
+
     // Add error class to module for backwards compatibility
     if (PyModule_AddObject(module,
                            "InvalidDatabaseError",
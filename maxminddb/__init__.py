@@ -3,21 +3,29 @@
 from __future__ import annotations
 
 from importlib.metadata import version
-from typing import IO, TYPE_CHECKING, AnyStr, cast
+from typing import IO, TYPE_CHECKING, Any, AnyStr, cast
 
 from .const import (
     MODE_AUTO,
     MODE_FD,
     MODE_FILE,
+    MODE_HYBRID,
     MODE_MEMORY,
     MODE_MMAP,
     MODE_MMAP_EXT,
 )
 from .decoder import InvalidDatabaseError
+from .pipeline import enrich
 from .reader import Reader
+from .shared import SharedReader, shared_reader
 
 if TYPE_CHECKING:
     import os
+    from collections.abc import Callable
+
+    from typing_extensions import Buffer
+
+    from .types import Record
 
 try:
     from . import extension as _extension
@@ -29,39 +37,114 @@ __all__ = [
     "MODE_AUTO",
     "MODE_FD",
     "MODE_FILE",
+    "MODE_HYBRID",
     "MODE_MEMORY",
     "MODE_MMAP",
     "MODE_MMAP_EXT",
     "InvalidDatabaseError",
     "Reader",
+    "SharedReader",
+    "enrich",
     "open_database",
+    "shared_reader",
 ]
 
 
-def open_database(
-    database: AnyStr | int | os.PathLike | IO,
+def open_database(  # noqa: PLR0913
+    database: AnyStr | int | os.PathLike | IO | Buffer,
     mode: int = MODE_AUTO,
+    *,
+    json_cache_size: int = 0,
+    pointer_cache_size: int = 0,
+    string_cache_size: int = 0,
+    immutable_records: bool = False,
+    bytes_as_memoryview: bool = False,
+    specialize_maps: bool = False,
+    map_factory: Callable[[dict[str, Record]], Any] | None = None,
+    array_factory: Callable[[list[Record]], Any] | None = None,
+    file_cache_size: int = 0,
+    file_block_size: int = 4096,
+    madvise_random: bool = False,
+    madvise_willneed: bool = False,
+    madvise_hugepage: bool = False,
+    mmap_populate: bool = False,
+    mlock_tree: bool = False,
 ) -> Reader:
     """Open a MaxMind DB database.
 
     Arguments:
         database: A path to a valid MaxMind DB file such as a GeoIP database
-                  file, or a file descriptor in the case of MODE_FD.
+                  file, or a file object, file descriptor, or bytes-like object
+                  in the case of MODE_FD.
         mode: mode to open the database with. Valid mode are:
               * MODE_MMAP_EXT - use the C extension with memory map.
               * MODE_MMAP - read from memory map. Pure Python.
               * MODE_FILE - read database as standard file. Pure Python.
-              * MODE_MEMORY - load database into memory. Pure Python.
-              * MODE_FD - the param passed via database is a file descriptor, not
-                          a path. This mode implies MODE_MEMORY.
+              * MODE_MEMORY - load database into memory. Uses the C extension
+                          if available.
+              * MODE_FD - the param passed via database is a file object,
+                          file descriptor, or bytes-like object, not a path.
+                          This mode implies MODE_MEMORY. Bytes-like objects
+                          are not copied by the C extension.
+              * MODE_HYBRID - load the search tree into memory and read records
+                          from a memory map, or as a standard file if mmap is
+                          unavailable. Pure Python.
               * MODE_AUTO - tries MODE_MMAP_EXT, MODE_MMAP, MODE_FILE in that
                           order. Default mode.
+        json_cache_size: the maximum number of records whose JSON encoding is
+              cached by ``Reader.get_json``. Defaults to 0, which disables the
+              cache.
+        pointer_cache_size: the maximum number of decoded values shared
+              between records, such as the country of a city, to cache.
+              Defaults to 0, which disables the cache.
+        string_cache_size: the maximum number of decoded string values, such
+              as names and ISO codes, to cache so that records share the same
+              string objects. Defaults to 0, which disables the cache.
+        immutable_records: return maps as ``types.MappingProxyType`` and
+              arrays as tuples rather than as dicts and lists. Such records
+              may be shared safely, e.g., between threads or in caches, and
+              values shared by records are not copied when using the
+              pointer cache.
+        bytes_as_memoryview: return bytes values as ``memoryview`` slices of
+              the database rather than copies. Only supported with
+              MODE_MEMORY and MODE_FD, which then use the pure Python reader.
+        specialize_maps: compile specialized functions for decoding maps
+              whose layout is seen repeatedly, such as the records of GeoIP2
+              databases. This speeds up the pure Python reader, particularly
+              on PyPy, and is ignored by the C extension.
+        map_factory: if set, called with each decoded map as a dict, e.g.,
+              to build instances of a ``__slots__`` class. Its return value
+              is used in place of the map.
+        array_factory: if set, called with each decoded array as a list. Its
+              return value is used in place of the array.
+        file_cache_size: the maximum number of blocks of the database file
+              to cache when reading it as a standard file with MODE_FILE or
+              MODE_HYBRID. Defaults to 0, which disables the cache. Other
+              modes ignore this argument.
+        file_block_size: the size in bytes, a power of two, of the blocks
+              cached when using ``file_cache_size``. Defaults to 4096.
+        madvise_random: advise the kernel that the memory map is read
+              randomly, which disables readahead. This and the following
+              options are only used when the database is memory mapped with
+              MODE_MMAP_EXT, MODE_MMAP, MODE_AUTO, or MODE_HYBRID. Advice the
+              platform does not support is ignored.
+        madvise_willneed: advise the kernel to read the database into the
+              page cache in the background.
+        madvise_hugepage: advise the kernel to back the memory map with huge
+              pages.
+        mmap_populate: read the database into memory when opening it, as
+              with ``MAP_POPULATE``.
+        mlock_tree: lock the search tree in memory so that it is not paged
+              out. Raises OSError if the memory cannot be locked, e.g., as it
+              would exceed ``RLIMIT_MEMLOCK``. The pure Python reader requires
+              the C extension for this.
 
     """
     if mode not in (
         MODE_AUTO,
         MODE_FD,
         MODE_FILE,
+        MODE_HYBRID,
         MODE_MEMORY,
         MODE_MMAP,
         MODE_MMAP_EXT,
@@ -70,10 +153,38 @@ def open_database(
         raise ValueError(msg)
 
     has_extension = _extension and hasattr(_extension, "Reader")
-    use_extension = has_extension if mode == MODE_AUTO else mode == MODE_MMAP_EXT
+    if mode == MODE_AUTO:
+        use_extension = has_extension
+    elif mode in (MODE_MEMORY, MODE_FD):
+        # The C extension does not support bytes_as_memoryview.
+        use_extension = has_extension and not bytes_as_memoryview
+    else:
+        use_extension = mode == MODE_MMAP_EXT
 
     if not use_extension:
-        return Reader(database, mode)
+        return Reader(
+            database,
+            mode,
+            json_cache_size=json_cache_size,
+            pointer_cache_size=pointer_cache_size,
+            string_cache_size=string_cache_size,
+            immutable_records=immutable_records,
+            bytes_as_memoryview=bytes_as_memoryview,
+            specialize_maps=specialize_maps,
+            map_factory=map_factory,
+            array_factory=array_factory,
+            file_cache_size=file_cache_size,
+            file_block_size=file_block_size,
+            madvise_random=madvise_random,
+            madvise_willneed=madvise_willneed,
+            madvise_hugepage=madvise_hugepage,
+            mmap_populate=mmap_populate,
+            mlock_tree=mlock_tree,
+        )
+
+    if bytes_as_memoryview:
+        msg = "bytes_as_memoryview requires MODE_MEMORY or MODE_FD"
+        raise ValueError(msg)
 
     if not has_extension:
         msg = "MODE_MMAP_EXT requires the maxminddb.extension module to be available"
@@ -85,7 +196,24 @@ def open_database(
     # checking purposes, pretend it is one. (Ideally this would be a subclass
     # of, or share a common parent class with, the Python Reader
     # implementation.)
-    return cast("Reader", _extension.Reader(database, mode))
+    return cast(
+        "Reader",
+        _extension.Reader(
+            database,
+            mode,
+            json_cache_size=json_cache_size,
+            pointer_cache_size=pointer_cache_size,
+            string_cache_size=string_cache_size,
+            immutable_records=immutable_records,
+            map_factory=map_factory,
+            array_factory=array_factory,
+            madvise_random=madvise_random,
+            madvise_willneed=madvise_willneed,
+            madvise_hugepage=madvise_hugepage,
+            mmap_populate=mmap_populate,
+            mlock_tree=mlock_tree,
+        ),
+    )
 
 
 __version__ = version("maxminddb")
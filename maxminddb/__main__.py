@@ -0,0 +1,7 @@
+"""Allow running the command-line tool with ``python -m maxminddb``."""
+
+import sys
+
+from maxminddb.cli import main
+
+sys.exit(main())
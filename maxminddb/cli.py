@@ -0,0 +1,524 @@
+"""Command-line interface for working with MaxMind DB files."""
+
+from __future__ import annotations
+
+import abc
+import argparse
+import contextlib
+import csv
+import io
+import ipaddress
+import itertools
+import json
+import sys
+from typing import IO, TYPE_CHECKING
+
+from maxminddb import open_database
+from maxminddb.const import Mode
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+    from ipaddress import IPv4Address, IPv4Network, IPv6Address, IPv6Network
+
+    from maxminddb.extension import Reader as ExtensionReader
+    from maxminddb.reader import Reader
+    from maxminddb.types import Record
+
+_OUTPUT_BUFFER_SIZE = 1024 * 1024
+_ROWS_PER_WRITE = 4096
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the ``maxminddb`` command-line tool.
+
+    Arguments:
+        argv: the command-line arguments, excluding the program name. Defaults
+              to ``sys.argv[1:]``.
+
+    Returns:
+        The process exit status.
+
+    """
+    args = _parser().parse_args(argv)
+    return args.func(args)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="maxminddb",
+        description="Look up IP addresses in and export MaxMind DB files.",
+    )
+    subparsers = parser.add_subparsers(required=True, metavar="COMMAND")
+
+    lookup = subparsers.add_parser(
+        "lookup",
+        help="look up IP addresses read one per line from a file or stdin",
+        description=(
+            "Look up IP addresses read one per line from INPUT (or stdin) and "
+            "write one JSONL or CSV row per address."
+        ),
+    )
+    lookup.add_argument("database", help="path to the MaxMind DB file")
+    lookup.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="file with one IP address per line (default: stdin)",
+    )
+    _add_output_arguments(lookup)
+    lookup.add_argument(
+        "--batch-size",
+        type=_positive_int,
+        default=4096,
+        help="number of input lines processed per batch (default: %(default)s)",
+    )
+    lookup.add_argument(
+        "--cache-size",
+        type=_positive_int,
+        default=65536,
+        help=(
+            "maximum number of addresses and networks whose encoded output "
+            "is reused (default: %(default)s)"
+        ),
+    )
+    lookup.set_defaults(func=_lookup)
+
+    dump = subparsers.add_parser(
+        "dump",
+        help="write every network in the database and its record",
+        description=(
+            "Write one JSONL or CSV row for every network in the database. "
+            "The database is streamed, so memory use does not grow with its "
+            "size."
+        ),
+    )
+    dump.add_argument("database", help="path to the MaxMind DB file")
+    _add_output_arguments(dump)
+    dump.add_argument(
+        "--coalesce",
+        action="store_true",
+        help=(
+            "merge adjacent networks with identical output and write "
+            "start_ip and end_ip columns instead of network"
+        ),
+    )
+    dump.add_argument(
+        "--cache-size",
+        type=_positive_int,
+        default=65536,
+        help=(
+            "maximum number of records whose encoded output is reused "
+            "(default: %(default)s)"
+        ),
+    )
+    dump.set_defaults(func=_dump)
+
+    return parser
+
+
+def _add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="file to write the results to (default: stdout)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=("jsonl", "csv"),
+        default="jsonl",
+        help="output format (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--fields",
+        type=_parse_fields,
+        help=(
+            "comma-separated list of dotted paths to output instead of the "
+            "whole record, e.g., country.iso_code,location.latitude"
+        ),
+    )
+    parser.add_argument(
+        "--mode",
+        type=str.upper,
+        choices=[mode.name for mode in Mode if mode != Mode.FD],
+        default=Mode.AUTO.name,
+        help="mode to open the database with (default: %(default)s)",
+    )
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        msg = f"{value} is not a positive integer"
+        raise argparse.ArgumentTypeError(msg)
+    return number
+
+
+def _parse_fields(value: str) -> list[str]:
+    fields = [name.strip() for name in value.split(",") if name.strip()]
+    if not fields:
+        msg = "at least one field is required"
+        raise argparse.ArgumentTypeError(msg)
+    return fields
+
+
+def _json_default(value: object) -> object:
+    # JSON has no binary type, so bytes are written as a hex string, as
+    # Reader.get_json does.
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    msg = f"Object of type {type(value).__name__} is not JSON serializable"
+    raise TypeError(msg)
+
+
+_JSON_ENCODER = json.JSONEncoder(
+    ensure_ascii=False,
+    separators=(",", ":"),
+    default=_json_default,
+)
+
+
+def _to_json(value: Record | None) -> str:
+    return _JSON_ENCODER.encode(value)
+
+
+class _Encoder(abc.ABC):
+    """Encodes output rows.
+
+    A row is split into leading columns, such as the address and network, and
+    a record part. The record part is encoded separately so that it can be
+    reused for every row sharing the same record. It is encoded from the
+    whole record, or from the values of the fields if any were selected.
+    """
+
+    header: str | None = None
+
+    def __init__(
+        self,
+        columns: tuple[str, ...],
+        fields: list[str] | None,
+    ) -> None:
+        self._columns = columns
+        self._fields = fields
+
+    @abc.abstractmethod
+    def record(self, record: Record | None) -> str:
+        """Encode the part of the row with the whole record."""
+
+    @abc.abstractmethod
+    def values(self, values: Sequence[Record | None]) -> str:
+        """Encode the part of the row with the values of the fields."""
+
+    @abc.abstractmethod
+    def row(self, values: tuple[str, ...], record: str) -> str:
+        """Encode a complete row, including the line terminator."""
+
+
+class _JSONLinesEncoder(_Encoder):
+    def record(self, record: Record | None) -> str:
+        return '"record":' + _to_json(record)
+
+    def values(self, values: Sequence[Record | None]) -> str:
+        return ",".join(
+            _to_json(name) + ":" + _to_json(value)
+            for name, value in zip(self._fields or (), values, strict=True)
+        )
+
+    def row(self, values: tuple[str, ...], record: str) -> str:
+        leading = ",".join(
+            f'"{column}":{_to_json(value)}'
+            for column, value in zip(self._columns, values, strict=True)
+        )
+        return f"{{{leading},{record}}}\n"
+
+
+class _CSVEncoder(_Encoder):
+    def __init__(
+        self,
+        columns: tuple[str, ...],
+        fields: list[str] | None,
+    ) -> None:
+        super().__init__(columns, fields)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="")
+        names = ["record"] if fields is None else fields
+        self.header = self._encode([*columns, *names]) + "\n"
+
+    def _encode(self, values: Iterable) -> str:
+        self._writer.writerow(values)
+        line = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return line
+
+    def record(self, record: Record | None) -> str:
+        return self._encode([None if record is None else _to_json(record)])
+
+    def values(self, values: Sequence[Record | None]) -> str:
+        cells: list[Record | None] = []
+        for value in values:
+            if isinstance(value, (dict, list)):
+                cells.append(_to_json(value))
+            elif isinstance(value, (bytes, bytearray)):
+                cells.append(value.hex())
+            else:
+                cells.append(value)
+        return self._encode(cells)
+
+    def row(self, values: tuple[str, ...], record: str) -> str:
+        return f"{self._encode(values)},{record}\n"
+
+
+_ENCODERS: dict[str, type[_Encoder]] = {
+    "csv": _CSVEncoder,
+    "jsonl": _JSONLinesEncoder,
+}
+
+
+@contextlib.contextmanager
+def _open_input(path: str) -> Iterator[IO[str]]:
+    if path != "-":
+        with open(path, encoding="utf-8", errors="replace") as source:
+            yield source
+        return
+    source = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", errors="replace")
+    try:
+        yield source
+    finally:
+        source.detach()
+
+
+@contextlib.contextmanager
+def _open_output(path: str) -> Iterator[IO[str]]:
+    if path != "-":
+        with open(
+            path,
+            "w",
+            buffering=_OUTPUT_BUFFER_SIZE,
+            encoding="utf-8",
+            newline="",
+        ) as out:
+            yield out
+        return
+    sys.stdout.flush()
+    out = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="")
+    try:
+        yield out
+    finally:
+        out.flush()
+        out.detach()
+
+
+def _lookup(args: argparse.Namespace) -> int:
+    encoder = _ENCODERS[args.format](("ip", "network"), args.fields)
+    names = args.fields or []
+    cache_size = args.cache_size
+    # Encoded rows keyed by the input line and encoded record parts keyed by
+    # network. Both are cleared when full to keep memory bounded.
+    rows: dict[str, str] = {}
+    records: dict[str, str] = {}
+    failed = 0
+
+    with (
+        open_database(args.database, Mode[args.mode]) as reader,
+        _open_input(args.input) as source,
+        _open_output(args.output) as out,
+    ):
+        if encoder.header:
+            out.write(encoder.header)
+
+        lines = (line.strip() for line in source)
+        while batch := list(itertools.islice(lines, args.batch_size)):
+            # The addresses without a cached row are looked up at once.
+            ips = [ip for ip in dict.fromkeys(batch) if ip and ip not in rows]
+            results, errors = _lookup_batch(reader, ips, names)
+            new_rows = {}
+            for ip, (address, prefix_len, found) in results.items():
+                network = str(
+                    ipaddress.ip_network((address, prefix_len), strict=False),
+                )
+                encoded = records.get(network)
+                if encoded is None:
+                    if len(records) >= cache_size:
+                        records.clear()
+                    encoded = records[network] = _encode_found(
+                        reader,
+                        encoder,
+                        found,
+                    )
+                new_rows[ip] = encoder.row((ip, network), encoded)
+
+            chunk = []
+            for ip in batch:
+                if not ip:
+                    continue
+                row = rows.get(ip) or new_rows.get(ip)
+                if row is None:
+                    sys.stderr.write(f"{ip}: {errors[ip]}\n")
+                    failed += 1
+                    continue
+                chunk.append(row)
+            out.write("".join(chunk))
+
+            if len(rows) + len(new_rows) > cache_size:
+                rows.clear()
+            rows.update(new_rows)
+
+    return 1 if failed else 0
+
+
+def _encode_found(
+    reader: Reader | ExtensionReader,
+    encoder: _Encoder,
+    found: list[Record | None] | int | None,
+) -> str:
+    """Encode the values of the fields, or the record at the offset found."""
+    if isinstance(found, list):
+        return encoder.values(found)
+    # Only the records of new networks are decoded.
+    return encoder.record(None if found is None else reader.get_by_offset(found))
+
+
+def _lookup_batch(
+    reader: Reader | ExtensionReader,
+    ips: list[str],
+    names: list[str],
+) -> tuple[
+    dict[str, tuple[IPv4Address | IPv6Address, int, list[Record | None] | int | None]],
+    dict[str, ValueError],
+]:
+    """Look up ips at once, decoding only the values of the named fields.
+
+    Without fields, the offsets of the records are returned instead, so that
+    only the records of new networks are decoded.
+
+    Returns:
+        The address, prefix length, and field values or record offset of each
+        IP that was looked up, and the errors of the others.
+
+    """
+    errors: dict[str, ValueError] = {}
+    addresses = {}
+    for ip in ips:
+        try:
+            addresses[ip] = ipaddress.ip_address(ip)
+        except ValueError as ex:  # noqa: PERF203
+            errors[ip] = ex
+    found: list[list[Record | None]] | list[int | None]
+    try:
+        if names:
+            columns, prefix_lens = reader.get_columns_with_prefix_len(
+                addresses.values(),
+                names,
+            )
+            found = [
+                [columns[name][i] for name in names] for i in range(len(addresses))
+            ]
+        else:
+            found, prefix_lens = reader.get_offsets_with_prefix_len(
+                addresses.values(),
+            )
+    except ValueError as ex:
+        if len(addresses) == 1:
+            errors.update(dict.fromkeys(addresses, ex))
+            return {}, errors
+        # Find the addresses that cannot be looked up, such as IPv6
+        # addresses in an IPv4 database, by looking them up one at a time.
+        results = {}
+        for ip in addresses:
+            (result, error) = _lookup_batch(reader, [ip], names)
+            results.update(result)
+            errors.update(error)
+        return results, errors
+
+    results = {
+        ip: (address, prefix_lens[i], found[i])
+        for i, (ip, address) in enumerate(addresses.items())
+    }
+    return results, errors
+
+
+def _dump(args: argparse.Namespace) -> int:
+    columns = ("start_ip", "end_ip") if args.coalesce else ("network",)
+    encoder = _ENCODERS[args.format](columns, args.fields)
+    cache_size = args.cache_size
+
+    with (
+        open_database(args.database, Mode[args.mode]) as reader,
+        _open_output(args.output) as out,
+    ):
+        if encoder.header:
+            out.write(encoder.header)
+
+        # Records shared by many networks are only encoded once.
+        networks = _encode_by_offset(
+            reader,
+            reader.iter_offsets(),
+            encoder,
+            args.fields,
+            cache_size,
+        )
+        rows: Iterator[tuple[tuple[str, ...], str]]
+        if args.coalesce:
+            rows = _coalesce(networks)
+        else:
+            rows = (((str(network),), encoded) for network, encoded in networks)
+
+        chunk = []
+        for values, encoded in rows:
+            chunk.append(encoder.row(values, encoded))
+            if len(chunk) >= _ROWS_PER_WRITE:
+                out.write("".join(chunk))
+                chunk.clear()
+        out.write("".join(chunk))
+
+    return 0
+
+
+def _encode_by_offset(
+    reader: Reader | ExtensionReader,
+    networks: Iterator[tuple[IPv4Network | IPv6Network, int]],
+    encoder: _Encoder,
+    fields: list[str] | None,
+    cache_size: int,
+) -> Iterator[tuple[IPv4Network | IPv6Network, str]]:
+    get_by_offset = reader.get_by_offset
+    records: dict[int, str] = {}
+    for network, offset in networks:
+        encoded = records.get(offset)
+        if encoded is None:
+            if len(records) >= cache_size:
+                records.clear()
+            if fields is None:
+                encoded = encoder.record(get_by_offset(offset))
+            else:
+                # Only the values of the fields are decoded.
+                encoded = encoder.values(
+                    [get_by_offset(offset, name) for name in fields],
+                )
+            records[offset] = encoded
+        yield network, encoded
+
+
+def _coalesce(
+    networks: Iterator[tuple[IPv4Network | IPv6Network, str]],
+) -> Iterator[tuple[tuple[str, ...], str]]:
+    first: IPv4Address | IPv6Address | None = None
+    last: IPv4Address | IPv6Address | None = None
+    current = ""
+    for network, encoded in networks:
+        start = network.network_address
+        if (
+            last is not None
+            and encoded == current
+            and start.version == last.version
+            and int(start) == int(last) + 1
+        ):
+            last = network.broadcast_address
+            continue
+        if first is not None:
+            yield (str(first), str(last)), current
+        first, last, current = start, network.broadcast_address, encoded
+    if first is not None:
+        yield (str(first), str(last)), current
@@ -22,10 +22,15 @@ class Mode(IntEnum):
     """Read database as standard file. Pure Python."""
 
     MEMORY = 8
-    """Load database into memory. Pure Python."""
+    """Load database into memory. Uses the C extension if available."""
 
     FD = 16
-    """Database is a file descriptor, not a path. This mode implies MODE_MEMORY."""
+    """Database is a file object, file descriptor, or bytes-like object, not a
+    path. This mode implies MODE_MEMORY."""
+
+    HYBRID = 32
+    """Load the search tree into memory and read records from a memory map,
+    or as a standard file if mmap is unavailable. Pure Python."""
 
 
 # Backward compatibility: export both enum members and old-style constants
@@ -35,11 +40,13 @@ MODE_MMAP = Mode.MMAP
 MODE_FILE = Mode.FILE
 MODE_MEMORY = Mode.MEMORY
 MODE_FD = Mode.FD
+MODE_HYBRID = Mode.HYBRID
 
 __all__ = [
     "MODE_AUTO",
     "MODE_FD",
     "MODE_FILE",
+    "MODE_HYBRID",
     "MODE_MEMORY",
     "MODE_MMAP",
     "MODE_MMAP_EXT",
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import copy
 import struct
-from typing import TYPE_CHECKING, ClassVar, cast
+from collections import Counter
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, ClassVar, cast
 
 try:
     import mmap
@@ -12,23 +15,67 @@ except ImportError:
 
 from maxminddb.errors import InvalidDatabaseError
 
+try:
+    from maxminddb.extension import decode as _extension_decode
+except ImportError:
+    _extension_decode = None  # type: ignore[assignment]
+
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Sequence
+
+    from typing_extensions import Self
 
     from maxminddb.file import FileBuffer
-    from maxminddb.types import Record
+    from maxminddb.types import Primitive, Record, Visitor
 
     DecoderFunc = Callable[["Decoder", int, int], tuple[Record, int]]
+    _Copier = Callable[[Any], Record]
+
+# The maximum number of map keys cached by a Decoder.
+_KEY_CACHE_SIZE = 4096
+
+# The number of type numbers, including the extended types, which are stored
+# as a byte after the control byte and offset by 7.
+_TYPE_COUNT = 256 + 7
+
+# The number of times a map layout is seen before a plan is compiled for it.
+_PLAN_THRESHOLD = 8
+
+# The maximum number of map layouts counted or planned by a Decoder.
+_MAX_PLANS = 1024
+
+# The values added to pointers of each size in bytes, so that each size
+# covers the values that don't fit in the previous one.
+_POINTER_VALUE_OFFSETS = (0, 0, 2048, 526336, 0)
+
+_DOUBLE = struct.Struct(b"!d")
+_FLOAT = struct.Struct(b"!f")
+_INT32 = struct.Struct(b"!i")
+_UINT16 = struct.Struct(b"!H")
+_UINT32 = struct.Struct(b"!I")
+_UINT64 = struct.Struct(b"!Q")
+
+# Structs reading the bytes of unsigned integers of up to 16 bytes, indexed by
+# size, for the sizes without a Struct of their own.
+_UINT_BYTES = [struct.Struct(f"{size}s") for size in range(17)]
 
 
 class Decoder:
     """Decoder for the data section of the MaxMind DB."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         database_buffer: FileBuffer | mmap.mmap | bytes,
         pointer_base: int = 0,
         pointer_test: bool = False,  # noqa: FBT001, FBT002
+        *,
+        pointer_cache_size: int = 0,
+        string_cache_size: int = 0,
+        immutable: bool = False,
+        bytes_as_memoryview: bool = False,
+        specialize_maps: bool = False,
+        map_factory: Callable[[dict[str, Record]], Any] | None = None,
+        array_factory: Callable[[list[Record]], Any] | None = None,
     ) -> None:
         """Create a Decoder for a MaxMind DB.
 
@@ -36,19 +83,80 @@ class Decoder:
             database_buffer: an mmap'd MaxMind DB file.
             pointer_base: the base number to use when decoding a pointer
             pointer_test: used for internal unit testing of pointer code
+            pointer_cache_size: the maximum number of decoded pointer targets
+                  to cache. Defaults to 0, which disables the cache.
+            string_cache_size: the maximum number of decoded string values to
+                  cache. Defaults to 0, which disables the cache.
+            immutable: decode maps as ``types.MappingProxyType`` and arrays
+                  as tuples rather than as dicts and lists.
+            bytes_as_memoryview: decode bytes as ``memoryview`` slices of
+                  ``database_buffer`` rather than copying them. Requires a
+                  buffer, such as ``bytes``, that supports the buffer
+                  protocol.
+            specialize_maps: compile specialized functions for decoding maps
+                  whose layout, i.e., keys and value types, is seen
+                  repeatedly. They fall back to the generic decoder when a
+                  map does not match.
+            map_factory: if set, called with each decoded map as a dict. Its
+                  return value is used in place of the map.
+            array_factory: if set, called with each decoded array as a list.
+                  Its return value is used in place of the array.
 
         """
         self._pointer_test = pointer_test
         self._buffer = database_buffer
         self._pointer_base = pointer_base
+        self._keys: dict[int, tuple[str, int]] = {}
+        self._pointer_cache_size = pointer_cache_size
+        self._pointer_cache: dict[int, tuple[Record, _Copier | None]] = {}
+        self._string_cache_size = string_cache_size
+        self._strings: dict[int, str] = {}
+        self._map_factory = map_factory
+        self._array_factory = array_factory
+        # Map decoding plans keyed by the map size and the first bytes of its
+        # first key, and the number of times each layout without one was seen.
+        self._plans: dict[int, Callable[[int], tuple[dict, int]]] | None = (
+            {} if specialize_maps else None
+        )
+        self._layouts: Counter[int] = Counter()
+        # Indexed by type number. Unknown types are None. The functions are
+        # looked up by name so that subclasses may override them.
+        self._decoders: list[DecoderFunc | None] = [None] * _TYPE_COUNT
+        for type_num, decoder in self._type_decoder.items():
+            self._decoders[type_num] = getattr(type(self), decoder.__name__)
+        if bytes_as_memoryview:
+            self._view = memoryview(database_buffer)  # type: ignore[arg-type]
+            self._decoders[4] = Decoder._decode_memoryview_bytes
+        if string_cache_size:
+            self._decoders[2] = Decoder._decode_cached_utf8_string
+        if immutable:
+            self._decoders[7] = Decoder._decode_immutable_map
+            self._decoders[11] = Decoder._decode_immutable_array
+        if map_factory is not None:
+            self._decoders[7] = Decoder._decode_factory_map
+        if array_factory is not None:
+            self._decoders[11] = Decoder._decode_factory_array
 
     def _decode_array(self, size: int, offset: int) -> tuple[list[Record], int]:
         array = []
+        decode = self.decode
         for _ in range(size):
-            (value, offset) = self.decode(offset)
+            (value, offset) = decode(offset)
             array.append(value)
         return array, offset
 
+    def _decode_factory_array(self, size: int, offset: int) -> tuple[Record, int]:
+        (array, offset) = self._decode_array(size, offset)
+        return cast("Callable", self._array_factory)(array), offset
+
+    def _decode_immutable_array(
+        self,
+        size: int,
+        offset: int,
+    ) -> tuple[tuple[Record, ...], int]:
+        (array, offset) = self._decode_array(size, offset)
+        return tuple(array), offset
+
     def _decode_boolean(self, size: int, offset: int) -> tuple[bool, int]:
         return size != 0, offset
 
@@ -56,71 +164,266 @@ class Decoder:
         new_offset = offset + size
         return self._buffer[offset:new_offset], new_offset
 
+    def _decode_memoryview_bytes(
+        self,
+        size: int,
+        offset: int,
+    ) -> tuple[memoryview, int]:
+        new_offset = offset + size
+        return self._view[offset:new_offset], new_offset
+
     def _decode_double(self, size: int, offset: int) -> tuple[float, int]:
         self._verify_size(size, 8)
-        new_offset = offset + size
-        packed_bytes = self._buffer[offset:new_offset]
-        (value,) = struct.unpack(b"!d", packed_bytes)
-        return value, new_offset
+        return _DOUBLE.unpack_from(self._buffer, offset)[0], offset + 8  # type: ignore[arg-type]
 
     def _decode_float(self, size: int, offset: int) -> tuple[float, int]:
         self._verify_size(size, 4)
-        new_offset = offset + size
-        packed_bytes = self._buffer[offset:new_offset]
-        (value,) = struct.unpack(b"!f", packed_bytes)
-        return value, new_offset
+        return _FLOAT.unpack_from(self._buffer, offset)[0], offset + 4  # type: ignore[arg-type]
 
     def _decode_int32(self, size: int, offset: int) -> tuple[int, int]:
-        if size == 0:
-            return 0, offset
-        new_offset = offset + size
-        packed_bytes = self._buffer[offset:new_offset]
-
-        if size != 4:
-            packed_bytes = packed_bytes.rjust(4, b"\x00")
-        (value,) = struct.unpack(b"!i", packed_bytes)
-        return value, new_offset
+        if size == 4:
+            return _INT32.unpack_from(self._buffer, offset)[0], offset + 4  # type: ignore[arg-type]
+        if size > 4:
+            self._verify_size(size, 4)
+        # Values shorter than 4 bytes are zero padded, so are not negative.
+        return self._decode_uint(size, offset)
 
     def _decode_map(self, size: int, offset: int) -> tuple[dict[str, Record], int]:
-        container: dict[str, Record] = {}
+        if self._plans is not None and size:
+            planned = self._decode_planned_map(size, offset)
+            if planned is not None:
+                return planned
+        return self._decode_map_entries({}, size, offset)
+
+    def _decode_map_entries(
+        self,
+        container: dict[str, Record],
+        size: int,
+        offset: int,
+    ) -> tuple[dict[str, Record], int]:
+        decode_key = self._decode_key
+        decode = self.decode
         for _ in range(size):
-            (key, offset) = self.decode(offset)
-            (value, offset) = self.decode(offset)
-            container[cast("str", key)] = value
+            (key, offset) = decode_key(offset)
+            (value, offset) = decode(offset)
+            container[key] = value
         return container, offset
 
+    def _decode_planned_map(
+        self,
+        size: int,
+        offset: int,
+    ) -> tuple[dict[str, Record], int] | None:
+        """Decode the map with a plan, or return None if there is none."""
+        plans = cast("dict", self._plans)
+        buf = self._buffer
+        layout = (size << 16) | (buf[offset] << 8) | buf[offset + 1]
+        plan = plans.get(layout)
+        if plan is not None:
+            return plan(offset)
+
+        layouts = self._layouts
+        layouts[layout] += 1
+        if layouts[layout] >= _PLAN_THRESHOLD:
+            if len(plans) >= _MAX_PLANS:
+                plans.clear()
+            del layouts[layout]
+            plans[layout] = self._compile_map_plan(size, offset)
+        elif len(layouts) >= _MAX_PLANS:
+            layouts.clear()
+        return None
+
+    def _compile_map_plan(
+        self,
+        size: int,
+        offset: int,
+    ) -> Callable[[int], tuple[dict, int]]:
+        """Return a function decoding maps laid out like the one at offset.
+
+        The function checks that each key reference has the same bytes as in
+        this map. From the first one that differs, the remaining entries are
+        decoded generically. Values are decoded with the decoder for the type
+        found in this map, or with ``decode`` if the type differs. Only
+        numbers derived from the database are written to the source; keys
+        and bytes are passed as arguments.
+        """
+        namespace: dict[str, object] = {
+            "buf": self._buffer,
+            "decode": self.decode,
+            "finish": self._decode_map_entries,
+        }
+        lines: list[str] = []
+        keys: list[str] = []
+        for i in range(size):
+            key_start = offset
+            (key, offset) = self._decode_key(offset)
+            namespace[f"k{i}"] = key
+            key_bytes = bytes(self._buffer[key_start:offset])
+            if len(key_bytes) <= 3:
+                checks = " or ".join(
+                    f"buf[o + {j}] != {byte}" if j else f"buf[o] != {byte}"
+                    for j, byte in enumerate(key_bytes)
+                )
+            else:
+                namespace[f"b{i}"] = key_bytes
+                checks = f"buf[o : o + {len(key_bytes)}] != b{i}"
+            decoded = ", ".join(keys[:i])
+            lines += [
+                f"    if {checks}:",
+                f"        return finish({{{decoded}}}, {size - i}, o)",
+            ]
+            lines.append(f"    o += {len(key_bytes)}")
+
+            (type_num, _, _) = self._read_control(offset)
+            namespace[f"f{i}"] = cast("DecoderFunc", self._decoders[type_num]).__get__(
+                self,
+            )
+            lines.append("    c = buf[o]")
+            if type_num == 1:
+                # The size bits of pointers are part of the pointer.
+                match, args = "c >> 5 == 1", "c & 31, o + 1"
+            elif type_num < 8:
+                match, args = f"c >> 5 == {type_num} and c & 31 < 29", "c & 31, o + 1"
+            else:
+                match = f"c >> 5 == 0 and c & 31 < 29 and buf[o + 1] == {type_num - 7}"
+                args = "c & 31, o + 2"
+            lines += [
+                f"    if {match}:",
+                f"        (v{i}, o) = f{i}({args})",
+                "    else:",
+                f"        (v{i}, o) = decode(o)",
+            ]
+            offset = self._skip(offset)
+            keys.append(f"k{i}: v{i}")
+
+        source = "\n".join(
+            [
+                f"def plan(o, {', '.join(f'{name}={name}' for name in namespace)}):",
+                *lines,
+                f"    return {{{', '.join(keys)}}}, o",
+            ],
+        )
+        exec(source, namespace)  # noqa: S102
+        return cast("Callable[[int], tuple[dict, int]]", namespace["plan"])
+
+    def _decode_factory_map(self, size: int, offset: int) -> tuple[Record, int]:
+        (container, offset) = self._decode_map(size, offset)
+        return cast("Callable", self._map_factory)(container), offset
+
+    def _decode_immutable_map(
+        self,
+        size: int,
+        offset: int,
+    ) -> tuple[MappingProxyType[str, Record], int]:
+        (container, offset) = self._decode_map(size, offset)
+        return MappingProxyType(container), offset
+
+    def _decode_key(self, offset: int) -> tuple[str, int]:
+        # Map keys are usually pointers to strings shared by every record.
+        # Keys are cached by the offset of the string so that records share
+        # the same key objects.
+        key_offset = offset
+        ctrl_byte = self._buffer[offset]
+        if ctrl_byte >> 5 == 1:
+            (key_offset, new_offset) = self._read_pointer(ctrl_byte & 0x1F, offset + 1)
+
+        keys = self._keys
+        cached = keys.get(key_offset)
+        if cached is None:
+            (key, end) = self.decode(key_offset)
+            if len(keys) >= _KEY_CACHE_SIZE:
+                keys.clear()
+            cached = keys[key_offset] = (cast("str", key), end)
+
+        if key_offset == offset:
+            return cached
+        return cached[0], new_offset
+
     def _decode_pointer(self, size: int, offset: int) -> tuple[Record, int]:
-        pointer_size = (size >> 3) + 1
+        (pointer, new_offset) = self._read_pointer(size, offset)
+        if self._pointer_test:
+            return pointer, new_offset
+        if not self._pointer_cache_size:
+            (value, _) = self.decode(pointer)
+            return value, new_offset
+
+        # Shared structures, such as the names of a country, are stored once
+        # and referenced with pointers, so the decoded targets are cached.
+        # Dicts and lists are copied as the caller may modify them. Values
+        # returned by a map or array factory are shared.
+        cache = self._pointer_cache
+        entry = cache.get(pointer)
+        if entry is None:
+            (value, _) = self.decode(pointer)
+            if len(cache) >= self._pointer_cache_size:
+                cache.clear()
+            entry = cache[pointer] = (value, _copier(value))
+        (value, copier) = entry
+        if copier is not None:
+            value = copier(value)
+        return value, new_offset
 
-        buf = self._buffer[offset : offset + pointer_size]
-        new_offset = offset + pointer_size
+    def _read_pointer(self, size: int, offset: int) -> tuple[int, int]:
+        pointer_size = (size >> 3) + 1
+        buf = self._buffer
 
+        # Indexing is much faster than slicing for the common short pointers.
         if pointer_size == 1:
-            buf = bytes([size & 0x7]) + buf
-            pointer = struct.unpack(b"!H", buf)[0] + self._pointer_base
+            pointer = ((size & 0x7) << 8) | buf[offset]
         elif pointer_size == 2:
-            buf = b"\x00" + bytes([size & 0x7]) + buf
-            pointer = struct.unpack(b"!I", buf)[0] + 2048 + self._pointer_base
-        elif pointer_size == 3:
-            buf = bytes([size & 0x7]) + buf
-            pointer = struct.unpack(b"!I", buf)[0] + 526336 + self._pointer_base
+            pointer = (
+                ((size & 0x7) << 16) | (buf[offset] << 8) | buf[offset + 1]
+            ) + 2048
         else:
-            pointer = struct.unpack(b"!I", buf)[0] + self._pointer_base
+            pointer = self._read_long_pointer(size, offset, pointer_size)
 
-        if self._pointer_test:
-            return pointer, new_offset
-        (value, _) = self.decode(pointer)
-        return value, new_offset
+        return pointer + self._pointer_base, offset + pointer_size
+
+    def _read_long_pointer(self, size: int, offset: int, pointer_size: int) -> int:
+        buf = self._buffer
+        if pointer_size == 4:
+            return _UINT32.unpack_from(buf, offset)[0]  # type: ignore[arg-type]
+        pointer = _UINT16.unpack_from(buf, offset)[0] << 8 | buf[offset + 2]  # type: ignore[arg-type]
+        return ((size & 0x7) << 24 | pointer) + 526336
 
     def _decode_uint(self, size: int, offset: int) -> tuple[int, int]:
+        buf = self._buffer
         new_offset = offset + size
-        uint_bytes = self._buffer[offset:new_offset]
+        # The sizes of most values in GeoIP databases are read directly.
+        if size == 1:
+            return buf[offset], new_offset
+        if size == 2:
+            return _UINT16.unpack_from(buf, offset)[0], new_offset  # type: ignore[arg-type]
+        if size == 3:
+            return (
+                _UINT16.unpack_from(buf, offset)[0] << 8 | buf[offset + 2],  # type: ignore[arg-type]
+                new_offset,
+            )
+        if size == 4:
+            return _UINT32.unpack_from(buf, offset)[0], new_offset  # type: ignore[arg-type]
+        if size == 8:
+            return _UINT64.unpack_from(buf, offset)[0], new_offset  # type: ignore[arg-type]
+        if size > 16:
+            self._verify_size(size, 16)
+        uint_bytes = _UINT_BYTES[size].unpack_from(buf, offset)[0]  # type: ignore[arg-type]
         return int.from_bytes(uint_bytes, "big"), new_offset
 
     def _decode_utf8_string(self, size: int, offset: int) -> tuple[str, int]:
         new_offset = offset + size
         return self._buffer[offset:new_offset].decode("utf-8"), new_offset
 
+    def _decode_cached_utf8_string(self, size: int, offset: int) -> tuple[str, int]:
+        # Records repeat a small set of strings, such as names and ISO codes,
+        # so strings are cached by their offset to share the objects.
+        strings = self._strings
+        value = strings.get(offset)
+        if value is None:
+            (value, _) = self._decode_utf8_string(size, offset)
+            if len(strings) >= self._string_cache_size:
+                strings.clear()
+            strings[offset] = value
+        return value, offset + size
+
     _type_decoder: ClassVar[dict[int, DecoderFunc]] = {
         1: _decode_pointer,
         2: _decode_utf8_string,
@@ -149,19 +452,178 @@ class Decoder:
         type_num = ctrl_byte >> 5
         # Extended type
         if not type_num:
-            (type_num, new_offset) = self._read_extended(new_offset)
+            type_num = self._buffer[new_offset] + 7
+            new_offset += 1
 
-        try:
-            decoder = self._type_decoder[type_num]
-        except KeyError as ex:
+        decoder = self._decoders[type_num]
+        if decoder is None:
             msg = f"Unexpected type number ({type_num}) encountered"
             raise InvalidDatabaseError(
                 msg,
-            ) from ex
+            )
 
-        (size, new_offset) = self._size_from_ctrl_byte(ctrl_byte, new_offset, type_num)
+        # Sizes below 29 are stored in the control byte. Pointers use these
+        # bits for the pointer.
+        size = ctrl_byte & 0x1F
+        if size >= 29 and type_num != 1:
+            (size, new_offset) = self._size_from_ctrl_byte(
+                ctrl_byte,
+                new_offset,
+                type_num,
+            )
         return decoder(self, size, new_offset)
 
+    def decode_path(self, offset: int, path: Sequence[str | int]) -> Record | None:
+        """Decode only the value at path in the data structure at offset.
+
+        Values that are not on the path are skipped without being decoded.
+
+        Arguments:
+            offset: the location of the data structure to decode
+            path: the map keys and array indexes leading to the value
+
+        Returns:
+            The value, or None if the path does not exist.
+
+        """
+        for key in path:
+            (type_num, size, offset) = self._read_control(offset)
+            if type_num == 1:
+                (pointer, _) = self._read_pointer(size, offset)
+                (type_num, size, offset) = self._read_control(pointer)
+            child = self._find_child(type_num, size, offset, key)
+            if child is None:
+                return None
+            offset = child
+
+        (value, _) = self.decode(offset)
+        return value
+
+    def walk(self, offset: int, visitor: Visitor) -> int:
+        """Pass the data structure at offset to visitor as a series of events.
+
+        Maps and arrays are reported to the visitor rather than being built,
+        so that their contents can be processed without creating
+        intermediate containers.
+
+        Arguments:
+            offset: the location of the data structure to walk
+            visitor: the object receiving the events
+
+        Returns:
+            The offset following the data structure.
+
+        """
+        (type_num, size, offset) = self._read_control(offset)
+        if type_num == 1:
+            (pointer, offset) = self._read_pointer(size, offset)
+            self.walk(pointer, visitor)
+            return offset
+        if type_num == 7:
+            visitor.start_map(size)
+            for _ in range(size):
+                (key, offset) = self._decode_key(offset)
+                visitor.key(key)
+                offset = self.walk(offset, visitor)
+            visitor.end_map()
+            return offset
+        if type_num == 11:
+            visitor.start_array(size)
+            for _ in range(size):
+                offset = self.walk(offset, visitor)
+            visitor.end_array()
+            return offset
+
+        decoder = self._decoders[type_num]
+        if decoder is None:
+            msg = f"Unexpected type number ({type_num}) encountered"
+            raise InvalidDatabaseError(msg)
+        (value, offset) = decoder(self, size, offset)
+        visitor.value(cast("Primitive", value))
+        return offset
+
+    def _clear_caches(self) -> None:
+        """Empty the caches, which copies made by with_buffer share."""
+        self._keys.clear()
+        self._pointer_cache.clear()
+        self._strings.clear()
+        if self._plans is not None:
+            self._plans.clear()
+        self._layouts.clear()
+
+    def with_buffer(self, database_buffer: FileBuffer | mmap.mmap | bytes) -> Self:
+        """Return a copy of this decoder reading from database_buffer.
+
+        The copy shares the caches of this decoder, so database_buffer must
+        contain the same database, e.g., a view returned by
+        ``FileBuffer.prefetch``.
+        """
+        decoder = copy.copy(self)
+        decoder._buffer = database_buffer  # noqa: SLF001
+        if self._plans is not None:
+            # Plans hold the buffer they were compiled for.
+            decoder._plans = {}  # noqa: SLF001
+            decoder._layouts = Counter()  # noqa: SLF001
+        return decoder
+
+    def _find_child(
+        self,
+        type_num: int,
+        size: int,
+        offset: int,
+        key: str | int,
+    ) -> int | None:
+        """Return the offset of the value for key in a map or array."""
+        if type_num == 7:
+            key = str(key)
+            for _ in range(size):
+                (map_key, offset) = self._decode_key(offset)
+                if map_key == key:
+                    return offset
+                offset = self._skip(offset)
+            return None
+        if type_num != 11:
+            return None
+        try:
+            index = int(key)
+        except ValueError:
+            return None
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            return None
+        for _ in range(index):
+            offset = self._skip(offset)
+        return offset
+
+    def _read_control(self, offset: int) -> tuple[int, int, int]:
+        ctrl_byte = self._buffer[offset]
+        new_offset = offset + 1
+        type_num = ctrl_byte >> 5
+        if not type_num:
+            (type_num, new_offset) = self._read_extended(new_offset)
+        (size, new_offset) = self._size_from_ctrl_byte(ctrl_byte, new_offset, type_num)
+        return type_num, size, new_offset
+
+    def _skip(self, offset: int) -> int:
+        """Return the offset following the value at offset."""
+        (type_num, size, offset) = self._read_control(offset)
+        if type_num == 1:
+            return offset + (size >> 3) + 1
+        if type_num == 7:
+            size *= 2
+        if type_num in (7, 11):
+            for _ in range(size):
+                offset = self._skip(offset)
+            return offset
+        if type_num == 14:
+            # The size is the value of a boolean.
+            return offset
+        if type_num not in self._type_decoder:
+            msg = f"Unexpected type number ({type_num}) encountered"
+            raise InvalidDatabaseError(msg)
+        return offset + size
+
     def _read_extended(self, offset: int) -> tuple[int, int]:
         next_byte = self._buffer[offset]
         type_num = next_byte + 7
@@ -200,15 +662,142 @@ class Decoder:
             size = 29 + self._buffer[offset]
             return size, offset + 1
 
-        # Using unpack rather than int_from_bytes as it is faster
-        # here and below.
+        buf = self._buffer
+        if size == 30:
+            return 285 + _UINT16.unpack_from(buf, offset)[0], offset + 2  # type: ignore[arg-type]
+
+        size = _UINT16.unpack_from(buf, offset)[0] << 8 | buf[offset + 2]  # type: ignore[arg-type]
+        return size + 65821, offset + 3
+
+
+class FileBufferDecoder(Decoder):
+    """Decoder for a FileBuffer, which does not support the buffer protocol.
+
+    Values are read with a single slice, as each access to the file is a
+    separate read.
+    """
+
+    def _decode_double(self, size: int, offset: int) -> tuple[float, int]:
+        self._verify_size(size, 8)
+        return _DOUBLE.unpack(self._buffer[offset : offset + 8])[0], offset + 8
+
+    def _decode_float(self, size: int, offset: int) -> tuple[float, int]:
+        self._verify_size(size, 4)
+        return _FLOAT.unpack(self._buffer[offset : offset + 4])[0], offset + 4
+
+    def _decode_int32(self, size: int, offset: int) -> tuple[int, int]:
+        if size > 4:
+            self._verify_size(size, 4)
+        new_offset = offset + size
+        packed_bytes = self._buffer[offset:new_offset]
+        return int.from_bytes(packed_bytes, "big", signed=size == 4), new_offset
+
+    def _read_long_pointer(self, size: int, offset: int, pointer_size: int) -> int:
+        pointer = int.from_bytes(self._buffer[offset : offset + pointer_size], "big")
+        if pointer_size == 3:
+            pointer = ((size & 0x7) << 24 | pointer) + 526336
+        return pointer
+
+    def _decode_uint(self, size: int, offset: int) -> tuple[int, int]:
+        new_offset = offset + size
+        if size == 1:
+            return self._buffer[offset], new_offset
+        uint_bytes = self._buffer[offset:new_offset]
+        return int.from_bytes(uint_bytes, "big"), new_offset
+
+    def _size_from_ctrl_byte(
+        self,
+        ctrl_byte: int,
+        offset: int,
+        type_num: int,
+    ) -> tuple[int, int]:
+        size = ctrl_byte & 0x1F
+        if type_num == 1 or size < 29:
+            return size, offset
+        if size == 29:
+            return 29 + self._buffer[offset], offset + 1
         if size == 30:
             new_offset = offset + 2
             size_bytes = self._buffer[offset:new_offset]
-            size = 285 + struct.unpack(b"!H", size_bytes)[0]
-            return size, new_offset
-
+            return 285 + int.from_bytes(size_bytes, "big"), new_offset
         new_offset = offset + 3
         size_bytes = self._buffer[offset:new_offset]
-        size = struct.unpack(b"!I", b"\x00" + size_bytes)[0] + 65821
-        return size, new_offset
+        return 65821 + int.from_bytes(size_bytes, "big"), new_offset
+
+    def _read_pointer(self, size: int, offset: int) -> tuple[int, int]:
+        pointer_size = (size >> 3) + 1
+        if pointer_size == 4:
+            pointer = self._read_long_pointer(size, offset, pointer_size)
+        else:
+            pointer = int.from_bytes(
+                self._buffer[offset : offset + pointer_size],
+                "big",
+            ) | ((size & 0x7) << (8 * pointer_size))
+            pointer += _POINTER_VALUE_OFFSETS[pointer_size]
+        return pointer + self._pointer_base, offset + pointer_size
+
+
+class ExtensionDecoder(Decoder):
+    """Decoder using the C extension to decode values.
+
+    The buffer must support the buffer protocol, e.g., ``bytes`` or
+    ``mmap.mmap``. Values are decoded with the default options, so this is
+    only used when none of the other arguments of Decoder are set.
+    """
+
+    available: ClassVar[bool] = _extension_decode is not None
+
+    def decode(self, offset: int) -> tuple[Record, int]:
+        """Decode a section of the data section starting at offset.
+
+        Arguments:
+            offset: the location of the data structure to decode
+
+        """
+        return _extension_decode(
+            self._buffer,  # type: ignore[arg-type]
+            offset,
+            self._pointer_base,
+        )
+
+
+def _copier(value: Record) -> _Copier | None:
+    """Return a function copying value, or None if value is not copied.
+
+    Only the dicts and lists within value are copied, each with a shallow
+    copy, so that a map of strings, such as the names of a country, is copied
+    with a single call. Other values are immutable and are shared.
+    """
+    if type(value) is dict:
+        nested = [
+            (key, copier)
+            for key, item in value.items()
+            if (copier := _copier(item)) is not None
+        ]
+        if not nested:
+            return dict.copy
+
+        def copy_dict(value: dict[str, Record]) -> dict[str, Record]:
+            value = value.copy()
+            for key, copier in nested:
+                value[key] = copier(value[key])
+            return value
+
+        return copy_dict
+    if type(value) is list:
+        nested_items = [
+            (index, copier)
+            for index, item in enumerate(value)
+            if (copier := _copier(item)) is not None
+        ]
+        if not nested_items:
+            return list.copy
+
+        def copy_list(value: list[Record]) -> list[Record]:
+            value = value.copy()
+            for index, copier in nested_items:
+                value[index] = copier(value[index])
+            return value
+
+        return copy_list
+    return None
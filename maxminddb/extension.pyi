@@ -1,13 +1,14 @@
 """C extension database reader and related classes."""
 
-from collections.abc import Iterator
+from collections.abc import Callable, Iterable, Iterator
 from ipaddress import IPv4Address, IPv4Network, IPv6Address, IPv6Network
 from os import PathLike
 from typing import IO, Any, AnyStr
 
-from typing_extensions import Self
+from typing_extensions import Buffer, Self
 
-from maxminddb.types import Record
+from maxminddb.reader import Residency
+from maxminddb.types import Record, Visitor
 
 class Reader:
     """A C extension implementation of a reader for the MaxMind DB format.
@@ -19,16 +20,65 @@ class Reader:
 
     def __init__(
         self,
-        database: AnyStr | int | PathLike | IO,
+        database: AnyStr | int | PathLike | IO | Buffer,
         mode: int = ...,
+        *,
+        json_cache_size: int = ...,
+        pointer_cache_size: int = ...,
+        string_cache_size: int = ...,
+        immutable_records: bool = ...,
+        map_factory: Callable[[dict[str, Record]], Any] | None = ...,
+        array_factory: Callable[[list[Record]], Any] | None = ...,
+        madvise_random: bool = ...,
+        madvise_willneed: bool = ...,
+        madvise_hugepage: bool = ...,
+        mmap_populate: bool = ...,
+        mlock_tree: bool = ...,
     ) -> None:
         """Reader for the MaxMind DB file format.
 
         Arguments:
             database: A path to a valid MaxMind DB file such as a GeoIP database
-                      file, or a file descriptor in the case of MODE_FD.
-            mode: mode to open the database with. The only supported modes are
-                  MODE_AUTO and MODE_MMAP_EXT.
+                      file, or a file object, file descriptor, or bytes-like
+                      object in the case of MODE_FD. Bytes-like objects are
+                      used without copying them.
+            mode: mode to open the database with. The supported modes are
+                  MODE_AUTO and MODE_MMAP_EXT, which memory map the file,
+                  and MODE_MEMORY and MODE_FD, which read the database from
+                  memory.
+            json_cache_size: the maximum number of records whose JSON encoding
+                  is cached by ``get_json``. Defaults to 0, which disables the
+                  cache.
+            pointer_cache_size: the maximum number of decoded values shared
+                  between records, such as the country of a city, to cache.
+                  Defaults to 0, which disables the cache.
+            string_cache_size: the maximum number of decoded string values,
+                  such as names and ISO codes, to cache so that records share
+                  the same string objects. Defaults to 0, which disables the
+                  cache.
+            immutable_records: return maps as ``types.MappingProxyType`` and
+                  arrays as tuples rather than as dicts and lists. Such records
+                  may be shared safely, e.g., between threads or in caches, and
+                  values shared by records are not copied when using the
+                  pointer cache.
+            map_factory: if set, called with each decoded map as a dict, e.g.,
+                  to build instances of a ``__slots__`` class. Its return
+                  value is used in place of the map.
+            array_factory: if set, called with each decoded array as a list.
+                  Its return value is used in place of the array.
+            madvise_random: advise the kernel that the memory map is read
+                  randomly, which disables readahead. This and the following
+                  options are only used with MODE_AUTO and MODE_MMAP_EXT.
+                  Advice the platform does not support is ignored.
+            madvise_willneed: advise the kernel to read the database into
+                  the page cache in the background.
+            madvise_hugepage: advise the kernel to back the memory map with
+                  huge pages.
+            mmap_populate: read the database into memory when opening it, as
+                  with ``MAP_POPULATE``.
+            mlock_tree: lock the search tree in memory so that it is not paged
+                  out. Raises OSError if the memory cannot be locked, e.g., as
+                  it would exceed ``RLIMIT_MEMLOCK``.
 
         """
 
@@ -54,12 +104,172 @@ class Reader:
 
         """
 
+    def visit(
+        self,
+        ip_address: str | IPv6Address | IPv4Address,
+        visitor: Visitor,
+    ) -> int:
+        """Pass the record for the ip_address to visitor as a series of events.
+
+        The record is not built. Instead, the visitor's ``start_map``,
+        ``key``, ``value``, ``end_map``, ``start_array``, and ``end_array``
+        methods are called for its contents in order. If there is no record,
+        ``value`` is called with None.
+
+        Arguments:
+            ip_address: an IP address in the standard string notation
+            visitor: the object receiving the events
+
+        Returns:
+            The prefix length associated with the record.
+
+        """
+
+    def get_json(self, ip_address: str | IPv6Address | IPv4Address) -> bytes:
+        """Return the record for the ip_address as UTF-8 encoded JSON.
+
+        ``b"null"`` is returned if the database does not contain a record for
+        the address. Bytes values are encoded as hexadecimal strings.
+
+        Arguments:
+            ip_address: an IP address in the standard string notation
+
+        """
+
+    def get_columns(
+        self,
+        ip_addresses: Iterable[str | IPv6Address | IPv4Address],
+        fields: Iterable[str],
+    ) -> dict[str, list[Record | None]]:
+        """Return the values of fields for many IP addresses as columns.
+
+        Each field is a dotted path into the record, e.g.,
+        ``"country.iso_code"`` or ``"subdivisions.0.iso_code"``. Only the
+        requested values are decoded, and each is decoded once per distinct
+        record rather than once per address.
+
+        Arguments:
+            ip_addresses: the IP addresses to look up
+            fields: the dotted paths of the values to return
+
+        Returns:
+            A dictionary mapping each field to a list with one value per
+            address, in the order of ``ip_addresses``. The value is ``None``
+            if the address has no record or the path does not exist in it.
+
+        """
+
+    def get_columns_with_prefix_len(
+        self,
+        ip_addresses: Iterable[str | IPv6Address | IPv4Address],
+        fields: Iterable[str],
+    ) -> tuple[dict[str, list[Record | None]], list[int]]:
+        """Return the values of fields and the prefix lengths for many IPs.
+
+        This is like ``get_columns``, but also returns the prefix length of
+        the network containing each address, like ``get_with_prefix_len``.
+
+        Arguments:
+            ip_addresses: the IP addresses to look up
+            fields: the dotted paths of the values to return
+
+        Returns:
+            A tuple with the dictionary returned by ``get_columns`` and a list
+            with the prefix length for each address.
+
+        """
+
+    def get_offsets_with_prefix_len(
+        self,
+        ip_addresses: Iterable[str | IPv6Address | IPv4Address],
+    ) -> tuple[list[int | None], list[int]]:
+        """Return the offsets of the records and the prefix lengths for many IPs.
+
+        The offset of a record is its location in the data section. Networks
+        sharing a record have the same offset, so callers may process each
+        record once, and ``get_by_offset`` decodes it without searching the
+        tree again.
+
+        Arguments:
+            ip_addresses: the IP addresses to look up
+
+        Returns:
+            A tuple with a list of the offset of the record of each address,
+            or None if the address has no record, and a list with the prefix
+            length for each address.
+
+        """
+
+    def get_by_offset(self, offset: int, field: str | None = None) -> Record | None:
+        """Return the record at offset in the data section, or a value in it.
+
+        Arguments:
+            offset: the offset of a record, as returned by
+                    ``get_offsets_with_prefix_len``
+            field: the dotted path of the value to return, as with
+                   ``get_columns``. Defaults to the whole record.
+
+        Returns:
+            The record, or the value of the field, which is None if the path
+            does not exist in the record.
+
+        """
+
     def metadata(self) -> Metadata:
         """Return the metadata associated with the MaxMind DB file."""
 
+    def warm(
+        self,
+        level: str = "tree",
+        *,
+        budget_seconds: float | None = None,
+        ip_addresses: Iterable[str | IPv6Address | IPv4Address] | None = None,
+    ) -> bool:
+        """Read the database into memory ahead of lookups.
+
+        The search tree, or the whole database if level is ``"all"``, is read
+        sequentially so that the first lookups do not wait for its pages to
+        be read one at a time. The records of ip_addresses are then looked up
+        to fill the caches enabled when opening the reader.
+
+        Arguments:
+            level: ``"tree"`` to read the search tree, or ``"all"`` to also
+                  read the data section. Defaults to ``"tree"``.
+            budget_seconds: stop once this many seconds have passed. Defaults
+                  to None, which does not limit the time taken.
+            ip_addresses: addresses to look up to fill the caches
+
+        Returns:
+            True if everything was read and looked up within the budget.
+
+        """
+
+    def residency(self) -> Residency | None:
+        """Return how much of the search tree and data section is in memory.
+
+        None is returned on platforms without ``mincore``.
+        """
+
+    def iter_offsets(self) -> Iterator[tuple[IPv4Network | IPv6Network, int]]:
+        """Iterate over the networks and the offsets of their records.
+
+        This is like iterating over the reader, but yields the offset of each
+        record in the data section, as returned by
+        ``get_offsets_with_prefix_len``, rather than the record. Networks
+        sharing a record yield the same offset, so callers may process each
+        record once and decode it with ``get_by_offset``.
+        """
+
     def __iter__(self) -> Iterator[tuple[IPv4Network | IPv6Network, Record]]: ...
     def __enter__(self) -> Self: ...
     def __exit__(self, *args) -> None: ...  # noqa: ANN002
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle the reader by the path and identity of the database file.
+
+        The database is opened again when unpickled, which fails if the file
+        has been replaced since it was pickled. Readers opened with MODE_FD
+        cannot be pickled.
+        """
 
 class Metadata:
     """Metadata for the MaxMind DB reader."""
@@ -115,3 +325,31 @@ class Metadata:
 
     def __init__(self, **kwargs: Any) -> None:  # noqa: ANN401
         """Create new Metadata object. kwargs are key/value pairs from spec."""
+
+def decode(
+    buffer: Buffer,
+    offset: int,
+    pointer_base: int,
+    /,
+) -> tuple[Record, int]:
+    """Decode the value at offset in a buffer containing a MaxMind DB.
+
+    Returns a tuple of the value and the location following it.
+
+    Arguments:
+        buffer: an object supporting the buffer protocol, such as ``bytes`` or
+                ``mmap.mmap``, containing the database
+        offset: the location of the value to decode
+        pointer_base: the location of the data section, which pointers are
+                relative to
+
+    """
+
+def _mlock(buffer: Buffer, length: int, /) -> None:
+    """Lock the first length bytes of a buffer in memory."""
+
+def _resident(buffer: Buffer, offset: int, length: int, /) -> int:
+    """Return the number of bytes of a range of a buffer that are in memory."""
+
+def _after_fork() -> None:
+    """Reset the open readers in the child process after a fork."""
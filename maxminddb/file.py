@@ -2,24 +2,80 @@
 
 from __future__ import annotations
 
+import bisect
+import copy
+import functools
 import os
-from typing import overload
+import queue
+import threading
+import weakref
+from typing import IO, TYPE_CHECKING, NamedTuple, cast, overload
 
 try:
     from multiprocessing import Lock
 except ImportError:
     from threading import Lock  # type: ignore[assignment]
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+_HAS_PREAD = hasattr(os, "pread")
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of the block cache of a FileBuffer."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    block_size: int
+
 
 class FileBuffer:
     """A slice-able file reader."""
 
-    def __init__(self, database: str) -> None:
-        """Create FileBuffer."""
+    def __init__(
+        self,
+        database: str,
+        *,
+        cache_size: int = 0,
+        block_size: int = 4096,
+    ) -> None:
+        """Create FileBuffer.
+
+        Arguments:
+            database: the path of the file
+            cache_size: the maximum number of blocks of the file to keep in a
+                  least recently used cache. Defaults to 0, which disables
+                  the cache.
+            block_size: the size in bytes of the blocks read into the cache.
+                  Blocks are aligned to this size, which must be a power of
+                  two.
+
+        """
+        if cache_size < 0:
+            msg = "cache_size must not be negative"
+            raise ValueError(msg)
+        if block_size <= 0 or block_size & (block_size - 1):
+            msg = "block_size must be a power of two"
+            raise ValueError(msg)
         self._handle = open(database, "rb")  # noqa: SIM115
         self._size = os.fstat(self._handle.fileno()).st_size
-        if not hasattr(os, "pread"):
-            self._lock = Lock()
+        self._pool = None if _HAS_PREAD else _HandlePool(database, self._handle)
+
+        self._block_size = block_size
+        self._block_shift = block_size.bit_length() - 1
+        self._block_mask = block_size - 1
+        # lru_cache is thread-safe and keeps the hit and miss counts.
+        self._read_block: functools._lru_cache_wrapper[bytes] | None = None
+        self._read_range: Callable[[int, int], bytes] = self._read
+        if cache_size:
+            self._read_block = functools.lru_cache(maxsize=cache_size)(
+                self._read_uncached_block,
+            )
+            self._read_range = self._read_cached
+        _BUFFERS.add(self)
 
     @overload
     def __getitem__(self, index: int) -> int: ...
@@ -30,12 +86,66 @@ class FileBuffer:
     def __getitem__(self, index: slice | int) -> bytes | int:
         """Get item by index."""
         if isinstance(index, slice):
-            return self._read(index.stop - index.start, index.start)
+            return self._read_range(index.stop - index.start, index.start)
         if isinstance(index, int):
-            return self._read(1, index)[0]
+            if self._read_block is not None:
+                block = self._read_block(index >> self._block_shift)
+                return block[index & self._block_mask]
+            return self._read_range(1, index)[0]
         msg = "Invalid argument type."
         raise TypeError(msg)
 
+    def read(self, offset: int, size: int) -> bytes:
+        """Read size bytes at offset, bypassing the block cache."""
+        return self._read(size, offset)
+
+    def read_ranges(self, ranges: Iterable[tuple[int, int]]) -> list[tuple[int, bytes]]:
+        """Read the (offset, size) ranges with as few reads as possible.
+
+        Ranges closer than the block size to each other are read together
+        with a single read, bypassing the block cache.
+
+        Returns:
+            The (offset, data) tuples of the spans read, sorted by offset.
+
+        """
+        groups: list[list[int]] = []
+        for offset, size in sorted(ranges):
+            stop = min(offset + size, self._size)
+            if groups and offset <= groups[-1][1] + self._block_size:
+                groups[-1][1] = max(groups[-1][1], stop)
+            else:
+                groups.append([offset, stop])
+        return [
+            (start, self._read(stop - start, start))
+            for start, stop in groups
+            if stop > start
+        ]
+
+    def prefetch(self, ranges: Iterable[tuple[int, int]]) -> FileBuffer:
+        """Return a view of the file with the (offset, size) ranges in memory.
+
+        The ranges are read with ``read_ranges``. Reads of the view within
+        them are served from memory, and other reads go to this buffer. The
+        view shares the file of this buffer, so it must not be closed.
+        """
+        spans = self.read_ranges(ranges)
+        starts = [start for start, _ in spans]
+        read = self._read_range
+
+        def read_prefetched(buffersize: int, offset: int) -> bytes:
+            i = bisect.bisect_right(starts, offset) - 1
+            if i >= 0:
+                (start, data) = spans[i]
+                if offset + buffersize <= start + len(data):
+                    return data[offset - start : offset - start + buffersize]
+            return read(buffersize, offset)
+
+        view = copy.copy(self)
+        view._read_block = None  # noqa: SLF001
+        view._read_range = read_prefetched  # noqa: SLF001
+        return view
+
     def rfind(self, needle: bytes, start: int) -> int:
         """Reverse find needle from start."""
         pos = self._read(self._size - start - 1, start).rfind(needle)
@@ -47,28 +157,139 @@ class FileBuffer:
         """Size of file."""
         return self._size
 
+    def cache_info(self) -> CacheInfo:
+        """Return the statistics of the block cache."""
+        if self._read_block is None:
+            return CacheInfo(0, 0, 0, 0, self._block_size)
+        (hits, misses, maxsize, currsize) = self._read_block.cache_info()
+        return CacheInfo(hits, misses, maxsize or 0, currsize, self._block_size)
+
     def close(self) -> None:
         """Close file."""
         self._handle.close()
+        if self._pool is not None:
+            self._pool.close()
+        if self._read_block is not None:
+            self._read_block.cache_clear()
 
-    if hasattr(os, "pread"):  # type: ignore[attr-defined]
+    def _after_fork(self) -> None:
+        """Reset the buffer in the child process after a fork.
 
-        def _read(self, buffersize: int, offset: int) -> bytes:
-            """Read that uses pread."""
+        The cache is cleared so that its statistics are those of the child.
+        """
+        if self._pool is not None:
+            self._pool.reset()
+        if self._read_block is not None:
+            self._read_block.cache_clear()
+
+    def _read_cached(self, buffersize: int, offset: int) -> bytes:
+        """Read through the block cache."""
+        read_block = cast("Callable[[int], bytes]", self._read_block)
+        first = offset >> self._block_shift
+        last = (offset + buffersize - 1) >> self._block_shift
+        start = offset & self._block_mask
+        if first == last:
+            return read_block(first)[start : start + buffersize]
+        data = b"".join(read_block(block) for block in range(first, last + 1))
+        return data[start : start + buffersize]
+
+    def _read_uncached_block(self, block: int) -> bytes:
+        return self._read(self._block_size, block << self._block_shift)
+
+    def _read(self, buffersize: int, offset: int) -> bytes:
+        if self._pool is None:
             return os.pread(self._handle.fileno(), buffersize, offset)  # type: ignore[attr-defined]
+        return self._pool.read(buffersize, offset)
+
+
+class _HandlePool:
+    """Handles of a file for reading it from several threads without pread.
 
-    else:
+    Each handle has its own offset, so reads using different handles may
+    proceed concurrently. Handles are opened by path as needed and are only
+    used if they refer to the same file as the original handle, as the file
+    may have been replaced or unlinked since. Otherwise, reads fall back to
+    seeking the original handle while holding a lock.
+    """
 
-        def _read(self, buffersize: int, offset: int) -> bytes:
-            """Read with a lock.
+    def __init__(self, path: str, handle: IO[bytes]) -> None:
+        self._path = path
+        self._handle = handle
+        stat = os.fstat(handle.fileno())
+        self._identity = _file_identity(stat)
+        # Without an inode number, another file cannot be told apart.
+        self._reopen = stat.st_ino != 0
+        # After a fork, the processes share the file table entry, and as
+        # such the offset, of the original handle, so this lock is shared
+        # between processes.
+        self._lock = Lock()
+        self._open_lock = threading.Lock()
+        self._handles: list[IO[bytes]] = []
+        self._idle: queue.SimpleQueue[IO[bytes]] = queue.SimpleQueue()
 
-            This lock is necessary as after a fork, the different processes
-            will share the same file table entry, even if we dup the fd, and
-            as such the same offsets. There does not appear to be a way to
-            duplicate the file table entry and we cannot re-open based on the
-            original path as that file may have replaced with another or
-            unlinked.
-            """
+    def read(self, buffersize: int, offset: int) -> bytes:
+        handle: IO[bytes] | None
+        try:
+            handle = self._idle.get_nowait()
+        except queue.Empty:
+            handle = self._open()
+        if handle is None:
             with self._lock:
                 self._handle.seek(offset)
                 return self._handle.read(buffersize)
+        try:
+            handle.seek(offset)
+            return handle.read(buffersize)
+        finally:
+            self._idle.put(handle)
+
+    def close(self) -> None:
+        with self._open_lock:
+            self._reopen = False
+            for handle in self._handles:
+                handle.close()
+            self._handles.clear()
+
+    def reset(self) -> None:
+        """Discard the handles, which a forked process shares with its parent.
+
+        Only the forking thread exists in the child, so the lock, which other
+        threads of the parent may have held, is created again.
+        """
+        self._open_lock = threading.Lock()
+        for handle in self._handles:
+            handle.close()
+        self._handles.clear()
+        self._idle = queue.SimpleQueue()
+
+    def _open(self) -> IO[bytes] | None:
+        with self._open_lock:
+            if not self._reopen:
+                return None
+            try:
+                handle = open(self._path, "rb")  # noqa: SIM115
+            except OSError:
+                self._reopen = False
+                return None
+            if _file_identity(os.fstat(handle.fileno())) != self._identity:
+                handle.close()
+                self._reopen = False
+                return None
+            self._handles.append(handle)
+            return handle
+
+
+def _file_identity(stat: os.stat_result) -> tuple[int, int, int, int]:
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+_BUFFERS: weakref.WeakSet[FileBuffer] = weakref.WeakSet()
+
+
+def _reset_buffers() -> None:
+    for buffer in list(_BUFFERS):
+        buffer._after_fork()  # noqa: SLF001
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_buffers)
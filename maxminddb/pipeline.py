@@ -0,0 +1,121 @@
+"""Helpers for looking up streams of IP addresses."""
+
+from __future__ import annotations
+
+import ipaddress
+import itertools
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from ipaddress import IPv4Address, IPv6Address
+
+    from maxminddb.reader import Reader
+    from maxminddb.types import Record
+
+    IPAddress = str | IPv6Address | IPv4Address
+    Result = tuple[Record | None, int]
+
+
+def enrich(
+    reader: Reader,
+    ip_addresses: Iterable[IPAddress],
+    *,
+    chunk_size: int = 1024,
+    dedupe_window: int = 65536,
+) -> Iterator[tuple[IPAddress, Record | None, int]]:
+    """Look up a stream of IP addresses, yielding the results in order.
+
+    The addresses are consumed ``chunk_size`` at a time, so ``ip_addresses``
+    may be an unbounded iterator. Addresses seen recently, or that fall in a
+    network returned by a recent lookup, are answered without searching the
+    database again. Such results share the same record object.
+
+    Arguments:
+        reader: the reader to look up the addresses with
+        ip_addresses: the IP addresses to look up
+        chunk_size: the number of addresses read from ``ip_addresses`` at a
+              time
+        dedupe_window: the maximum number of recent addresses and networks
+              whose results are reused. 0 disables the reuse of results.
+
+    Returns:
+        An iterator of tuples with the IP address as passed in, the record,
+        and the prefix length of the network containing the address.
+
+    """
+    if chunk_size < 1:
+        msg = f"chunk_size must be positive, not {chunk_size}"
+        raise ValueError(msg)
+    if dedupe_window < 0:
+        msg = f"dedupe_window must not be negative, not {dedupe_window}"
+        raise ValueError(msg)
+
+    addresses: OrderedDict[IPAddress, Result] = OrderedDict()
+    networks = _NetworkWindow(dedupe_window)
+    lookup = reader.get_with_prefix_len
+
+    iterator = iter(ip_addresses)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        results = []
+        for ip in chunk:
+            result = addresses.get(ip)
+            if result is not None:
+                addresses.move_to_end(ip)
+            elif dedupe_window:
+                address = ipaddress.ip_address(ip) if isinstance(ip, str) else ip
+                result = networks.get(address)
+                if result is None:
+                    result = lookup(address)
+                    networks.add(address, result)
+                if len(addresses) >= dedupe_window:
+                    addresses.popitem(last=False)
+                addresses[ip] = result
+            else:
+                result = lookup(ip)
+            results.append((ip, *result))
+        yield from results
+
+
+class _NetworkWindow:
+    """The results of the most recent lookups, keyed by network."""
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._results: OrderedDict[tuple[int, int, int], Result] = OrderedDict()
+        # The number of cached networks with each (version, prefix length),
+        # which are the masks to try when looking up an address.
+        self._prefixes: Counter[tuple[int, int]] = Counter()
+
+    def get(self, address: IPv4Address | IPv6Address) -> Result | None:
+        version = address.version
+        bits = address.max_prefixlen
+        number = int(address)
+        results = self._results
+        for prefix_version, prefix_len in self._prefixes:
+            if prefix_version != version:
+                continue
+            key = (version, prefix_len, number >> (bits - prefix_len))
+            result = results.get(key)
+            if result is not None:
+                results.move_to_end(key)
+                return result
+        return None
+
+    def add(self, address: IPv4Address | IPv6Address, result: Result) -> None:
+        prefix_len = result[1]
+        version = address.version
+        key = (
+            version,
+            prefix_len,
+            int(address) >> (address.max_prefixlen - prefix_len),
+        )
+        if len(self._results) >= self._size:
+            ((old_version, old_prefix_len, _), _) = self._results.popitem(last=False)
+            old = (old_version, old_prefix_len)
+            self._prefixes[old] -= 1
+            if not self._prefixes[old]:
+                del self._prefixes[old]
+        self._results[key] = result
+        self._prefixes[version, prefix_len] += 1
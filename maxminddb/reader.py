@@ -9,26 +9,134 @@ except ImportError:
 
 import contextlib
 import ipaddress
+import json
+import math
+import os
 import struct
+import sys
+import time
+import weakref
+from collections.abc import Mapping
 from dataclasses import dataclass
 from ipaddress import IPv4Address, IPv6Address
-from typing import IO, TYPE_CHECKING, Any, AnyStr
-
-from maxminddb.const import MODE_AUTO, MODE_FD, MODE_FILE, MODE_MEMORY, MODE_MMAP
-from maxminddb.decoder import Decoder
+from typing import IO, TYPE_CHECKING, Any, AnyStr, NamedTuple, cast
+
+from maxminddb.const import (
+    MODE_AUTO,
+    MODE_FD,
+    MODE_FILE,
+    MODE_HYBRID,
+    MODE_MEMORY,
+    MODE_MMAP,
+)
+from maxminddb.decoder import Decoder, ExtensionDecoder, FileBufferDecoder
 from maxminddb.errors import InvalidDatabaseError
-from maxminddb.file import FileBuffer
+from maxminddb.file import CacheInfo, FileBuffer, _file_identity
+
+try:
+    from maxminddb.extension import _mlock, _resident
+except ImportError:
+    _mlock = None  # type: ignore[assignment]
+    _resident = None  # type: ignore[assignment]
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Callable, Iterable, Iterator
+    from ipaddress import IPv4Network, IPv6Network
     from os import PathLike
 
-    from typing_extensions import Self
+    from typing_extensions import Buffer, Self
 
-    from maxminddb.types import Record
+    from maxminddb.types import Record, Visitor
 
 _IPV4_MAX_NUM = 2**32
 
+# The number of bytes read in advance at the start of each record when
+# reading many records from a file at once.
+_RECORD_PREFETCH_SIZE = 512
+
+# The number of bytes Reader.warm reads between checks of its budget.
+_WARM_CHUNK_SIZE = 1 << 20
+
+
+def _check_sizes(**sizes: int) -> None:
+    for name, size in sizes.items():
+        if size < 0:
+            msg = f"{name} must not be negative"
+            raise ValueError(msg)
+
+
+def _check_factory(name: str, factory: object) -> None:
+    if factory is not None and not callable(factory):
+        msg = f"{name} must be callable"
+        raise TypeError(msg)
+
+
+class Residency(NamedTuple):
+    """The number of bytes of the search tree and data section in memory."""
+
+    tree_resident: int
+    tree_size: int
+    data_resident: int
+    data_size: int
+
+
+def _map_file(db_file: IO[bytes], *, populate: bool) -> mmap.mmap:
+    """Memory map db_file for reading, reading it into memory if populate."""
+    if populate and hasattr(mmap, "MAP_POPULATE"):
+        return mmap.mmap(
+            db_file.fileno(),
+            0,
+            flags=mmap.MAP_SHARED | mmap.MAP_POPULATE,
+            prot=mmap.PROT_READ,
+        )
+    buffer = mmap.mmap(db_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if populate:
+        for offset in range(0, len(buffer), mmap.PAGESIZE):
+            buffer[offset]
+    return buffer
+
+
+def _absolute_path(database: str | bytes | PathLike) -> str:
+    path = os.fsdecode(database)
+    # The current directory may have been removed.
+    with contextlib.suppress(OSError):
+        return os.path.abspath(path)  # noqa: PTH100
+    return path
+
+
+def _open_pickled(
+    cls: type[Reader],
+    database: str,
+    identity: tuple[int, ...],
+    mode: int,
+    options: dict[str, Any],
+) -> Reader:
+    """Open a pickled reader, checking that the file has not been replaced."""
+    if _file_identity(os.stat(database)) != identity:  # noqa: PTH116
+        msg = (
+            f"The MaxMind DB file ({database}) has changed since the reader was pickled"
+        )
+        raise OSError(msg)
+    return cls(cast("Any", database), mode, **options)
+
+
+def _json_default(value: object) -> object:
+    # JSON has no binary type, so bytes are written as a hex string.
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, Mapping):
+        return dict(value)
+    msg = f"Object of type {type(value).__name__} is not JSON serializable"
+    raise TypeError(msg)
+
+
+# The output matches the encoding done by the C extension.
+_JSON_ENCODER = json.JSONEncoder(
+    ensure_ascii=False,
+    separators=(",", ":"),
+    default=_json_default,
+)
+
 
 class Reader:
     """A pure Python implementation of a reader for the MaxMind DB format.
@@ -40,32 +148,133 @@ class Reader:
     _METADATA_START_MARKER = b"\xab\xcd\xefMaxMind.com"
 
     _buffer: bytes | FileBuffer | "mmap.mmap"  # noqa: UP037
+    _tree: bytes | FileBuffer | "mmap.mmap"  # noqa: UP037
     _buffer_size: int
+    _close_buffer: bool
     closed: bool
     _decoder: Decoder
+    _json_decoder: Decoder
     _metadata: Metadata
     _ipv4_start: int
+    _pickle_args: tuple[str, int, dict[str, Any]] | None
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
-        database: AnyStr | int | PathLike | IO,
+        database: AnyStr | int | PathLike | IO | Buffer,
         mode: int = MODE_AUTO,
+        *,
+        json_cache_size: int = 0,
+        pointer_cache_size: int = 0,
+        string_cache_size: int = 0,
+        immutable_records: bool = False,
+        bytes_as_memoryview: bool = False,
+        specialize_maps: bool = False,
+        map_factory: Callable[[dict[str, Record]], Any] | None = None,
+        array_factory: Callable[[list[Record]], Any] | None = None,
+        file_cache_size: int = 0,
+        file_block_size: int = 4096,
+        madvise_random: bool = False,
+        madvise_willneed: bool = False,
+        madvise_hugepage: bool = False,
+        mmap_populate: bool = False,
+        mlock_tree: bool = False,
     ) -> None:
         """Reader for the MaxMind DB file format.
 
         Arguments:
             database: A path to a valid MaxMind DB file such as a GeoIP database
-                      file, or a file descriptor in the case of MODE_FD.
+                      file, or a file object, file descriptor, or bytes-like
+                      object in the case of MODE_FD.
             mode: mode to open the database with. Valid mode are:
                   * MODE_MMAP - read from memory map.
                   * MODE_FILE - read database as standard file.
                   * MODE_MEMORY - load database into memory.
                   * MODE_AUTO - tries MODE_MMAP and then MODE_FILE. Default.
-                  * MODE_FD - the param passed via database is a file descriptor, not
-                              a path. This mode implies MODE_MEMORY.
+                  * MODE_FD - the param passed via database is a file object,
+                              file descriptor, or bytes-like object, not a
+                              path. This mode implies MODE_MEMORY.
+                  * MODE_HYBRID - load the search tree into memory and read
+                              records from a memory map, or as a standard file
+                              if mmap is unavailable.
+            json_cache_size: the maximum number of records whose JSON encoding
+                  is cached by ``get_json``. Defaults to 0, which disables the
+                  cache.
+            pointer_cache_size: the maximum number of decoded values shared
+                  between records, such as the country of a city, to cache.
+                  Defaults to 0, which disables the cache.
+            string_cache_size: the maximum number of decoded string values,
+                  such as names and ISO codes, to cache so that records share
+                  the same string objects. Defaults to 0, which disables the
+                  cache.
+            immutable_records: return maps as ``types.MappingProxyType`` and
+                  arrays as tuples rather than as dicts and lists. Such records
+                  may be shared safely, e.g., between threads or in caches, and
+                  values shared by records are not copied when using the
+                  pointer cache.
+            bytes_as_memoryview: return bytes values as ``memoryview`` slices
+                  of the database rather than copies. Only supported with
+                  MODE_MEMORY and MODE_FD.
+            specialize_maps: compile specialized functions for decoding maps
+                  whose layout is seen repeatedly, such as the records of
+                  GeoIP2 databases. This speeds up decoding, particularly on
+                  PyPy.
+            map_factory: if set, called with each decoded map as a dict, e.g.,
+                  to build instances of a ``__slots__`` class. Its return
+                  value is used in place of the map.
+            array_factory: if set, called with each decoded array as a list.
+                  Its return value is used in place of the array.
+            file_cache_size: the maximum number of blocks of the database
+                  file to cache when reading it as a standard file with
+                  MODE_FILE or MODE_HYBRID. Defaults to 0, which disables the
+                  cache.
+            file_block_size: the size in bytes, a power of two, of the blocks
+                  cached when using ``file_cache_size``. Defaults to 4096.
+            madvise_random: advise the kernel that the memory map is read
+                  randomly, which disables readahead. This and the following
+                  options are only used when the database is memory mapped
+                  with MODE_MMAP, MODE_AUTO, or MODE_HYBRID. Advice the
+                  platform does not support is ignored.
+            madvise_willneed: advise the kernel to read the database into
+                  the page cache in the background.
+            madvise_hugepage: advise the kernel to back the memory map with
+                  huge pages.
+            mmap_populate: read the database into memory when opening it, as
+                  with ``MAP_POPULATE``.
+            mlock_tree: lock the search tree in memory so that it is not paged
+                  out. This requires the C extension, and raises OSError if
+                  the memory cannot be locked, e.g., as it would exceed
+                  ``RLIMIT_MEMLOCK``.
 
         """
-        filename = self._load_buffer(database, mode)
+        _check_sizes(
+            json_cache_size=json_cache_size,
+            pointer_cache_size=pointer_cache_size,
+            string_cache_size=string_cache_size,
+            file_cache_size=file_cache_size,
+        )
+        _check_factory("map_factory", map_factory)
+        _check_factory("array_factory", array_factory)
+        if bytes_as_memoryview and mode not in (MODE_MEMORY, MODE_FD):
+            msg = "bytes_as_memoryview requires MODE_MEMORY or MODE_FD"
+            raise ValueError(msg)
+        self._json_cache_size = json_cache_size
+        self._json_cache: dict[int, bytes] = {}
+
+        filename = self._load_buffer(
+            database,
+            mode,
+            file_cache_size=file_cache_size,
+            file_block_size=file_block_size,
+            mmap_populate=mmap_populate,
+        )
+        decoder_class: type[Decoder] = (
+            FileBufferDecoder if isinstance(self._buffer, FileBuffer) else Decoder
+        )
+        # The C extension, when available, decodes buffers supporting the
+        # buffer protocol much faster, but only with the default options.
+        plain_decoder_class = decoder_class
+        if decoder_class is Decoder and ExtensionDecoder.available:
+            plain_decoder_class = ExtensionDecoder
 
         metadata_start = self._buffer.rfind(
             self._METADATA_START_MARKER,
@@ -83,7 +292,7 @@ class Reader:
             )
 
         metadata_start += len(self._METADATA_START_MARKER)
-        metadata_decoder = Decoder(self._buffer, metadata_start)
+        metadata_decoder = decoder_class(self._buffer, metadata_start)
         (metadata, _) = metadata_decoder.decode(metadata_start)
 
         if not isinstance(metadata, dict):
@@ -94,11 +303,77 @@ class Reader:
 
         self._metadata = Metadata(**metadata)
 
-        self._decoder = Decoder(
-            self._buffer,
-            self._metadata.search_tree_size + self._DATA_SECTION_SEPARATOR_SIZE,
+        # The search tree is read for every lookup, so MODE_HYBRID keeps it
+        # in memory while the records are read from the file as needed.
+        self._tree = self._buffer
+        if mode == MODE_HYBRID:
+            tree_size = self._metadata.search_tree_size
+            self._tree = (
+                self._buffer.read(0, tree_size)
+                if isinstance(self._buffer, FileBuffer)
+                else self._buffer[:tree_size]
+            )
+
+        self._advise(
+            mode,
+            madvise_random=madvise_random,
+            madvise_willneed=madvise_willneed,
+            madvise_hugepage=madvise_hugepage,
+            mlock_tree=mlock_tree,
+        )
+
+        pointer_base = (
+            self._metadata.search_tree_size + self._DATA_SECTION_SEPARATOR_SIZE
         )
+        decoder_options: dict[str, Any] = {
+            "pointer_cache_size": pointer_cache_size,
+            "string_cache_size": string_cache_size,
+            "immutable": immutable_records,
+            "bytes_as_memoryview": bytes_as_memoryview,
+            "specialize_maps": specialize_maps,
+            "map_factory": map_factory,
+            "array_factory": array_factory,
+        }
+        self._decoder = (
+            decoder_class(self._buffer, pointer_base, **decoder_options)
+            if any(decoder_options.values())
+            else plain_decoder_class(self._buffer, pointer_base)
+        )
+        # get_json encodes the records as stored rather than the objects
+        # built by the factories.
+        self._json_decoder = self._decoder
+        if map_factory is not None or array_factory is not None:
+            self._json_decoder = plain_decoder_class(self._buffer, pointer_base)
         self.closed = False
+        _READERS.add(self)
+
+        # Readers opened from a path are pickled by it so that they are cheap
+        # to send to other processes.
+        self._pickle_args = (
+            None
+            if mode == MODE_FD
+            else (
+                _absolute_path(database),  # type: ignore[arg-type]
+                mode,
+                {
+                    "json_cache_size": json_cache_size,
+                    "pointer_cache_size": pointer_cache_size,
+                    "string_cache_size": string_cache_size,
+                    "immutable_records": immutable_records,
+                    "bytes_as_memoryview": bytes_as_memoryview,
+                    "specialize_maps": specialize_maps,
+                    "map_factory": map_factory,
+                    "array_factory": array_factory,
+                    "file_cache_size": file_cache_size,
+                    "file_block_size": file_block_size,
+                    "madvise_random": madvise_random,
+                    "madvise_willneed": madvise_willneed,
+                    "madvise_hugepage": madvise_hugepage,
+                    "mmap_populate": mmap_populate,
+                    "mlock_tree": mlock_tree,
+                },
+            )
+        )
 
         ipv4_start = 0
         if self._metadata.ip_version == 6:
@@ -117,6 +392,108 @@ class Reader:
         """Return the metadata associated with the MaxMind DB file."""
         return self._metadata
 
+    def file_cache_info(self) -> CacheInfo | None:
+        """Return the statistics of the block cache used with MODE_FILE.
+
+        None is returned if the database is not read with MODE_FILE.
+        """
+        if isinstance(self._buffer, FileBuffer):
+            return self._buffer.cache_info()
+        return None
+
+    def warm(
+        self,
+        level: str = "tree",
+        *,
+        budget_seconds: float | None = None,
+        ip_addresses: Iterable[str | IPv6Address | IPv4Address] | None = None,
+    ) -> bool:
+        """Read the database into memory ahead of lookups.
+
+        The search tree, or the whole database if level is ``"all"``, is read
+        sequentially so that the first lookups, e.g., after a deploy, do not
+        wait for its pages to be read one at a time. The records of
+        ip_addresses, such as a sample of recent traffic, are then looked up
+        to fill the caches enabled when opening the reader.
+
+        Arguments:
+            level: ``"tree"`` to read the search tree, or ``"all"`` to also
+                  read the data section. Defaults to ``"tree"``.
+            budget_seconds: stop once this many seconds have passed. Defaults
+                  to None, which does not limit the time taken.
+            ip_addresses: addresses to look up to fill the caches
+
+        Returns:
+            True if everything was read and looked up within the budget.
+
+        """
+        if level not in ("tree", "all"):
+            msg = "level must be 'tree' or 'all'"
+            raise ValueError(msg)
+        if budget_seconds is not None and budget_seconds < 0:
+            msg = "budget_seconds must not be negative"
+            raise ValueError(msg)
+        if self.closed:
+            msg = "Attempt to read from a closed MaxMind DB."
+            raise ValueError(msg)
+        deadline = (
+            math.inf if budget_seconds is None else time.monotonic() + budget_seconds
+        )
+        if not self._warm_pages(deadline, everything=level == "all"):
+            return False
+        for ip_address in ip_addresses or ():
+            if time.monotonic() >= deadline:
+                return False
+            # Looking up the records fills the caches of the reader.
+            self.get(ip_address)
+            if self._json_cache_size:
+                self.get_json(ip_address)
+        return True
+
+    def _warm_pages(self, deadline: float, *, everything: bool) -> bool:
+        """Read the search tree, and the data section if everything is set."""
+        tree_size = self._metadata.search_tree_size
+        ranges = [(self._tree, 0, tree_size)]
+        if everything:
+            ranges.append((self._buffer, tree_size, self._buffer_size))
+        for buffer, start, end in ranges:
+            for offset in range(start, end, _WARM_CHUNK_SIZE):
+                if time.monotonic() >= deadline:
+                    return False
+                # Buffers read into memory when opening the reader are
+                # skipped.
+                if isinstance(buffer, bytes):
+                    break
+                size = min(_WARM_CHUNK_SIZE, end - offset)
+                if isinstance(buffer, FileBuffer):
+                    buffer.read(offset, size)
+                else:
+                    # Reading a byte of each page of the memory map faults
+                    # it in.
+                    for page in range(offset, offset + size, mmap.PAGESIZE):
+                        buffer[page]
+        return True
+
+    def residency(self) -> Residency | None:
+        """Return how much of the search tree and data section is in memory.
+
+        None is returned if the database is read with MODE_FILE, or if the C
+        extension, which checks the pages with ``mincore``, is unavailable.
+        """
+        if self.closed:
+            msg = "Attempt to read from a closed MaxMind DB."
+            raise ValueError(msg)
+        if _resident is None or isinstance(self._buffer, FileBuffer):
+            return None
+        tree_size = self._metadata.search_tree_size
+        data_size = self._buffer_size - tree_size
+        return Residency(
+            _resident(cast("bytes", self._tree), 0, tree_size),
+            tree_size,
+            _resident(self._buffer, tree_size, data_size),
+            data_size,
+        )
+
     def get(self, ip_address: str | IPv6Address | IPv4Address) -> Record | None:
         """Return the record for the ip_address in the MaxMind DB.
 
@@ -137,6 +514,240 @@ class Reader:
             ip_address: an IP address in the standard string notation
 
         """
+        (pointer, prefix_len) = self._lookup_pointer(ip_address)
+        if pointer:
+            return self._resolve_data_pointer(pointer), prefix_len
+        return None, prefix_len
+
+    def visit(
+        self,
+        ip_address: str | IPv6Address | IPv4Address,
+        visitor: Visitor,
+    ) -> int:
+        """Pass the record for the ip_address to visitor as a series of events.
+
+        The record is not built. Instead, the visitor's ``start_map``,
+        ``key``, ``value``, ``end_map``, ``start_array``, and ``end_array``
+        methods are called for its contents in order. If there is no record,
+        ``value`` is called with None.
+
+        Arguments:
+            ip_address: an IP address in the standard string notation
+            visitor: the object receiving the events
+
+        Returns:
+            The prefix length associated with the record.
+
+        """
+        (pointer, prefix_len) = self._lookup_pointer(ip_address)
+        if pointer:
+            self._decoder.walk(self._data_offset(pointer), visitor)
+        else:
+            visitor.value(None)
+        return prefix_len
+
+    def get_json(self, ip_address: str | IPv6Address | IPv4Address) -> bytes:
+        """Return the record for the ip_address as UTF-8 encoded JSON.
+
+        ``b"null"`` is returned if the database does not contain a record for
+        the address. Bytes values are encoded as hexadecimal strings.
+
+        Arguments:
+            ip_address: an IP address in the standard string notation
+
+        """
+        (pointer, _) = self._lookup_pointer(ip_address)
+        if not pointer:
+            return b"null"
+
+        encoded = self._json_cache.get(pointer)
+        if encoded is None:
+            (record, _) = self._json_decoder.decode(self._data_offset(pointer))
+            encoded = _JSON_ENCODER.encode(record).encode()
+            if self._json_cache_size:
+                if len(self._json_cache) >= self._json_cache_size:
+                    self._json_cache.clear()
+                self._json_cache[pointer] = encoded
+        return encoded
+
+    def get_columns(
+        self,
+        ip_addresses: Iterable[str | IPv6Address | IPv4Address],
+        fields: Iterable[str],
+    ) -> dict[str, list[Record | None]]:
+        """Return the values of fields for many IP addresses as columns.
+
+        Each field is a dotted path into the record, e.g.,
+        ``"country.iso_code"`` or ``"subdivisions.0.iso_code"``. Only the
+        requested values are decoded, and each is decoded once per distinct
+        record rather than once per address.
+
+        Arguments:
+            ip_addresses: the IP addresses to look up
+            fields: the dotted paths of the values to return
+
+        Returns:
+            A dictionary mapping each field to a list with one value per
+            address, in the order of ``ip_addresses``. The value is ``None``
+            if the address has no record or the path does not exist in it.
+
+        """
+        return self.get_columns_with_prefix_len(ip_addresses, fields)[0]
+
+    def get_columns_with_prefix_len(
+        self,
+        ip_addresses: Iterable[str | IPv6Address | IPv4Address],
+        fields: Iterable[str],
+    ) -> tuple[dict[str, list[Record | None]], list[int]]:
+        """Return the values of fields and the prefix lengths for many IPs.
+
+        This is like ``get_columns``, but also returns the prefix length of
+        the network containing each address, like ``get_with_prefix_len``.
+
+        Arguments:
+            ip_addresses: the IP addresses to look up
+            fields: the dotted paths of the values to return
+
+        Returns:
+            A tuple with the dictionary returned by ``get_columns`` and a list
+            with the prefix length for each address.
+
+        """
+        fields = list(fields)
+        paths = [field.split(".") for field in fields]
+        results = self._lookup_pointers(ip_addresses)
+        pointers = [pointer for pointer, _ in results]
+
+        offsets = {
+            pointer: self._data_offset(pointer) for pointer in pointers if pointer
+        }
+        decoder = self._decoder
+        if isinstance(self._buffer, FileBuffer):
+            # Read the start of every record at once rather than piecemeal.
+            decoder = decoder.with_buffer(
+                self._buffer.prefetch(
+                    (offset, _RECORD_PREFETCH_SIZE) for offset in offsets.values()
+                ),
+            )
+        decode_path = decoder.decode_path
+        empty = (None,) * len(paths)
+        rows: dict[int, tuple[Record | None, ...]] = {0: empty}
+        for pointer, offset in offsets.items():
+            rows[pointer] = tuple(decode_path(offset, path) for path in paths)
+
+        columns = {
+            field: [rows[pointer][i] for pointer in pointers]
+            for i, field in enumerate(fields)
+        }
+        return columns, [prefix_len for _, prefix_len in results]
+
+    def get_offsets_with_prefix_len(
+        self,
+        ip_addresses: Iterable[str | IPv6Address | IPv4Address],
+    ) -> tuple[list[int | None], list[int]]:
+        """Return the offsets of the records and the prefix lengths for many IPs.
+
+        The offset of a record is its location in the data section. Networks
+        sharing a record have the same offset, so callers may process each
+        record once, and ``get_by_offset`` decodes it without searching the
+        tree again.
+
+        Arguments:
+            ip_addresses: the IP addresses to look up
+
+        Returns:
+            A tuple with a list of the offset of the record of each address,
+            or None if the address has no record, and a list with the prefix
+            length for each address.
+
+        """
+        results = self._lookup_pointers(ip_addresses)
+        base = self._metadata.node_count + self._DATA_SECTION_SEPARATOR_SIZE
+        return (
+            [pointer - base if pointer else None for pointer, _ in results],
+            [prefix_len for _, prefix_len in results],
+        )
+
+    def get_by_offset(self, offset: int, field: str | None = None) -> Record | None:
+        """Return the record at offset in the data section, or a value in it.
+
+        Arguments:
+            offset: the offset of a record, as returned by
+                    ``get_offsets_with_prefix_len``
+            field: the dotted path of the value to return, as with
+                   ``get_columns``. Defaults to the whole record.
+
+        Returns:
+            The record, or the value of the field, which is None if the path
+            does not exist in the record.
+
+        """
+        pointer_base = (
+            self._metadata.search_tree_size + self._DATA_SECTION_SEPARATOR_SIZE
+        )
+        if not 0 <= offset < self._buffer_size - pointer_base:
+            msg = f"Offset {offset} is outside the data section."
+            raise ValueError(msg)
+        if field is None:
+            (record, _) = self._decoder.decode(pointer_base + offset)
+            return record
+        return self._decoder.decode_path(pointer_base + offset, field.split("."))
+
+    def _lookup_pointer(
+        self,
+        ip_address: str | IPv6Address | IPv4Address,
+    ) -> tuple[int, int]:
+        return self._find_address_in_tree(self._packed_address(ip_address))
+
+    def _lookup_pointers(
+        self,
+        ip_addresses: Iterable[str | IPv6Address | IPv4Address],
+    ) -> list[tuple[int, int]]:
+        """Look up the data pointer and prefix length of many addresses.
+
+        When the search tree is read from a file, the addresses are searched
+        for level by level, reading the distinct nodes of each level at once.
+        """
+        packed = [self._packed_address(ip) for ip in ip_addresses]
+        if not isinstance(self._tree, FileBuffer):
+            find = self._find_address_in_tree
+            return [find(address) for address in packed]
+
+        node_count = self._metadata.node_count
+        node_byte_size = self._metadata.node_byte_size
+        nodes = [self._start_node(len(address) * 8) for address in packed]
+        results = [(0, 0)] * len(packed)
+        searching = list(range(len(packed)))
+        i = 0
+        while searching:
+            found = [
+                j
+                for j in searching
+                if i == len(packed[j]) * 8 or nodes[j] >= node_count
+            ]
+            for j in found:
+                results[j] = self._search_result(nodes[j], i)
+            if found:
+                done = set(found)
+                searching = [j for j in searching if j not in done]
+
+            level = {nodes[j] for j in searching}
+            view = self._tree.prefetch(
+                (node * node_byte_size, node_byte_size) for node in level
+            )
+            children = {
+                node: self._split_node(
+                    view[node * node_byte_size : (node + 1) * node_byte_size],
+                )
+                for node in level
+            }
+            for j in searching:
+                bit = 1 & (packed[j][i >> 3] >> 7 - (i % 8))
+                nodes[j] = children[nodes[j]][bit]
+            i += 1
+        return results
+
+    def _packed_address(self, ip_address: str | IPv6Address | IPv4Address) -> bytearray:
         if isinstance(ip_address, str):
             address = ipaddress.ip_address(ip_address)
         else:
@@ -157,14 +768,25 @@ class Reader:
                 msg,
             )
 
-        (pointer, prefix_len) = self._find_address_in_tree(packed_address)
-
-        if pointer:
-            return self._resolve_data_pointer(pointer), prefix_len
-        return None, prefix_len
+        return packed_address
 
     def __iter__(self) -> Iterator:
-        return self._generate_children(0, 0, 0)
+        resolve = self._resolve_data_pointer
+        for network, pointer in self._generate_children(0, 0, 0):
+            yield network, resolve(pointer)
+
+    def iter_offsets(self) -> Iterator[tuple[IPv4Network | IPv6Network, int]]:
+        """Iterate over the networks and the offsets of their records.
+
+        This is like iterating over the reader, but yields the offset of each
+        record in the data section, as returned by
+        ``get_offsets_with_prefix_len``, rather than the record. Networks
+        sharing a record yield the same offset, so callers may process each
+        record once and decode it with ``get_by_offset``.
+        """
+        base = self._metadata.node_count + self._DATA_SECTION_SEPARATOR_SIZE
+        for network, pointer in self._generate_children(0, 0, 0):
+            yield network, pointer - base
 
     def _generate_children(self, node: int, depth: int, ip_acc: int) -> Iterator:
         if ip_acc != 0 and node == self._ipv4_start:
@@ -177,12 +799,7 @@ class Reader:
             ip_acc <<= bits - depth
             if ip_acc <= _IPV4_MAX_NUM and bits == 128:
                 depth -= 96
-            yield (
-                ipaddress.ip_network((ip_acc, depth)),
-                self._resolve_data_pointer(
-                    node,
-                ),
-            )
+            yield ipaddress.ip_network((ip_acc, depth)), node
         elif node < node_count:
             left = self._read_node(node, 0)
             ip_acc <<= 1
@@ -202,11 +819,16 @@ class Reader:
             node = self._read_node(node, bit)
             i = i + 1
 
+        return self._search_result(node, i)
+
+    def _search_result(self, node: int, prefix_len: int) -> tuple[int, int]:
+        """Return the data pointer and prefix length where a search ended."""
+        node_count = self._metadata.node_count
         if node == node_count:
             # Record is empty
-            return 0, i
+            return 0, prefix_len
         if node > node_count:
-            return node, i
+            return node, prefix_len
 
         msg = "Invalid node in search tree"
         raise InvalidDatabaseError(msg)
@@ -223,10 +845,10 @@ class Reader:
         node_bytes: bytes | bytearray
         if record_size == 24:
             offset = base_offset + index * 3
-            node_bytes = b"\x00" + self._buffer[offset : offset + 3]
+            node_bytes = b"\x00" + self._tree[offset : offset + 3]
         elif record_size == 28:
             offset = base_offset + 3 * index
-            node_bytes = bytearray(self._buffer[offset : offset + 4])
+            node_bytes = bytearray(self._tree[offset : offset + 4])
             if index:
                 node_bytes[0] = 0x0F & node_bytes[0]
             else:
@@ -234,33 +856,71 @@ class Reader:
                 node_bytes.insert(0, middle)
         elif record_size == 32:
             offset = base_offset + index * 4
-            node_bytes = self._buffer[offset : offset + 4]
+            node_bytes = self._tree[offset : offset + 4]
         else:
             msg = f"Unknown record size: {record_size}"
             raise InvalidDatabaseError(msg)
         return struct.unpack(b"!I", node_bytes)[0]
 
+    def _split_node(self, node_bytes: bytes) -> tuple[int, int]:
+        """Return the left and right records of a node."""
+        record_size = self._metadata.record_size
+        if record_size == 24:
+            return (
+                int.from_bytes(node_bytes[:3], "big"),
+                int.from_bytes(node_bytes[3:6], "big"),
+            )
+        if record_size == 28:
+            middle = node_bytes[3]
+            return (
+                ((middle & 0xF0) << 20) | int.from_bytes(node_bytes[:3], "big"),
+                ((middle & 0x0F) << 24) | int.from_bytes(node_bytes[4:7], "big"),
+            )
+        if record_size == 32:
+            return (
+                int.from_bytes(node_bytes[:4], "big"),
+                int.from_bytes(node_bytes[4:8], "big"),
+            )
+        msg = f"Unknown record size: {record_size}"
+        raise InvalidDatabaseError(msg)
+
     def _resolve_data_pointer(self, pointer: int) -> Record:
+        (data, _) = self._decoder.decode(self._data_offset(pointer))
+        return data
+
+    def _data_offset(self, pointer: int) -> int:
         resolved = pointer - self._metadata.node_count + self._metadata.search_tree_size
 
         if resolved >= self._buffer_size:
             msg = "The MaxMind DB file's search tree is corrupt"
             raise InvalidDatabaseError(msg)
 
-        (data, _) = self._decoder.decode(resolved)
-        return data
+        return resolved
 
     def _load_buffer(
-        self, database: AnyStr | int | PathLike | IO, mode: int = MODE_AUTO
+        self,
+        database: AnyStr | int | PathLike | IO | Buffer,
+        mode: int = MODE_AUTO,
+        *,
+        file_cache_size: int = 0,
+        file_block_size: int = 4096,
+        mmap_populate: bool = False,
     ) -> str:
         filename: Any
-        if (mode == MODE_AUTO and mmap) or mode == MODE_MMAP:
+        # Buffers passed in by the caller, such as the memory map of a shared
+        # memory block, are left open for it.
+        self._close_buffer = True
+        if (mode in (MODE_AUTO, MODE_HYBRID) and mmap) or mode == MODE_MMAP:
             with open(database, "rb") as db_file:  # type: ignore[arg-type]
-                self._buffer = mmap.mmap(db_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._buffer = _map_file(db_file, populate=mmap_populate)
                 self._buffer_size = self._buffer.size()
             filename = database
-        elif mode in (MODE_AUTO, MODE_FILE):
-            self._buffer = FileBuffer(database)  # type: ignore[arg-type]
+        elif mode in (MODE_AUTO, MODE_FILE, MODE_HYBRID):
+            self._buffer = FileBuffer(
+                database,  # type: ignore[arg-type]
+                cache_size=file_cache_size,
+                block_size=file_block_size,
+            )
             self._buffer_size = self._buffer.size()
             filename = database
         elif mode == MODE_MEMORY:
@@ -270,18 +930,20 @@ class Reader:
                 self._buffer_size = len(buf)
             filename = database
         elif mode == MODE_FD:
-            self._buffer = database.read()  # type: ignore[union-attr]
+            self._buffer = self._read_fd(database)
             self._buffer_size = len(self._buffer)  # type: ignore[arg-type]
             # io buffers are not guaranteed to have a name attribute
-            if hasattr(database, "name"):
+            if isinstance(database, int):
+                filename = f"<fd {database}>"
+            elif hasattr(database, "name"):
                 filename = database.name  # type: ignore[union-attr]
             else:
                 filename = f"<{type(database)}>"
         else:
             msg = (
                 f"Unsupported open mode ({mode}). Only MODE_AUTO, MODE_FILE, "
-                "MODE_MEMORY and MODE_FD are supported by the pure Python "
-                "Reader"
+                "MODE_MEMORY, MODE_FD and MODE_HYBRID are supported by the pure "
+                "Python Reader"
             )
             raise ValueError(
                 msg,
@@ -289,13 +951,87 @@ class Reader:
 
         return filename
 
+    def _advise(
+        self,
+        mode: int,
+        *,
+        madvise_random: bool,
+        madvise_willneed: bool,
+        madvise_hugepage: bool,
+        mlock_tree: bool,
+    ) -> None:
+        """Apply the options for the memory map of a database opened by path."""
+        if (
+            mode not in (MODE_AUTO, MODE_MMAP, MODE_HYBRID)
+            or mmap is None
+            or not isinstance(self._buffer, mmap.mmap)
+        ):
+            return
+        for enabled, name in (
+            (madvise_random, "MADV_RANDOM"),
+            (madvise_willneed, "MADV_WILLNEED"),
+            (madvise_hugepage, "MADV_HUGEPAGE"),
+        ):
+            if enabled and hasattr(mmap, name) and hasattr(self._buffer, "madvise"):
+                with contextlib.suppress(OSError):
+                    self._buffer.madvise(getattr(mmap, name))
+        if mlock_tree:
+            if _mlock is None:
+                self.close()
+                msg = "mlock_tree requires the maxminddb.extension module"
+                raise OSError(msg)
+            try:
+                _mlock(cast("bytes", self._tree), self._metadata.search_tree_size)
+            except OSError:
+                self.close()
+                raise
+
+    def _read_fd(self, database: object) -> bytes | mmap.mmap:
+        """Return the contents of the database passed with MODE_FD."""
+        if isinstance(database, int) and mmap:
+            # Map the descriptor, e.g., of a memfd, rather than reading it, so
+            # that processes opening it share the same pages.
+            return mmap.mmap(database, 0, access=mmap.ACCESS_READ)
+        if isinstance(database, int):
+            with open(database, "rb", closefd=False) as db_file:
+                db_file.seek(0)
+                return db_file.read()
+        if isinstance(database, bytes):
+            return database
+        if (
+            mmap
+            and isinstance(database, memoryview)
+            and isinstance(database.obj, mmap.mmap)
+            and database.nbytes == len(database.obj)
+        ):
+            # E.g., the buf of a SharedMemory block. Slices of the memory map
+            # are bytes, so it is read directly.
+            self._close_buffer = False
+            return database.obj
+        if hasattr(database, "read"):
+            return database.read()
+        # Slices of other bytes-like objects are not bytes.
+        return bytes(database)  # type: ignore[call-overload]
+
+    def _after_fork(self) -> None:
+        """Empty the caches in the child process after a fork."""
+        self._json_cache.clear()
+        self._decoder._clear_caches()  # noqa: SLF001
+        self._json_decoder._clear_caches()  # noqa: SLF001
+
     def close(self) -> None:
         """Close the MaxMind DB file and returns the resources to the system.
 
         Calling this method while reads are in progress may cause exceptions.
         """
-        with contextlib.suppress(AttributeError):
-            self._buffer.close()  # type: ignore[union-attr]
+        if self._close_buffer:
+            with contextlib.suppress(AttributeError):
+                self._buffer.close()  # type: ignore[union-attr]
+        # Release the search tree of MODE_HYBRID. Lookups then fail as the
+        # buffer is closed.
+        self._tree = self._buffer
+
+        self._json_cache.clear()
 
         self.closed = True
 
@@ -308,6 +1044,37 @@ class Reader:
             raise ValueError(msg)
         return self
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle the reader by the path and identity of the database file.
+
+        The database is opened again when unpickled, which fails if the file
+        has been replaced since it was pickled. Readers opened with MODE_FD
+        cannot be pickled.
+        """
+        if self._pickle_args is None:
+            msg = "Cannot pickle a Reader opened with MODE_FD."
+            raise TypeError(msg)
+        (path, mode, options) = self._pickle_args
+        identity = _file_identity(os.stat(path))  # noqa: PTH116
+        return _open_pickled, (type(self), path, identity, mode, options)
+
+
+_READERS: weakref.WeakSet[Reader] = weakref.WeakSet()
+
+
+def _reset_readers() -> None:
+    # Like the C extension, the caches are emptied when running without the
+    # GIL, as other threads of the parent may have been updating them when
+    # the process forked.
+    if getattr(sys, "_is_gil_enabled", lambda: True)():
+        return
+    for reader in list(_READERS):
+        reader._after_fork()  # noqa: SLF001
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_readers)
+
 
 @dataclass(kw_only=True, frozen=True)
 class Metadata:
@@ -0,0 +1,234 @@
+"""Helpers for sharing a database between and within processes.
+
+A parent process, such as the master process of a prefork server, loads the
+database once, and each worker opens it with ``MODE_FD``. The readers of all
+workers then use the same physical pages rather than a copy each. Within a
+process, ``shared_reader`` returns the same reader to every caller opening a
+file.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+from multiprocessing.shared_memory import SharedMemory
+from typing import IO, TYPE_CHECKING, Any, cast
+
+from maxminddb.const import MODE_AUTO, MODE_FD
+from maxminddb.file import _file_identity
+from maxminddb.reader import Reader
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterator
+
+    from typing_extensions import Buffer, Self
+
+_registry: dict[Hashable, _SharedEntry] = {}
+_registry_lock = threading.Lock()
+
+
+class _SharedEntry:
+    __slots__ = ("count", "reader")
+
+    def __init__(self, reader: Reader) -> None:
+        self.reader = reader
+        self.count = 0
+
+
+class SharedReader:
+    """A reference to a reader shared by the callers of ``shared_reader``.
+
+    Attributes and methods of the reader, such as ``get``, are available on
+    this object. Closing it releases the reference, and the reader is closed
+    once every reference to it has been released.
+    """
+
+    def __init__(self, key: Hashable, entry: _SharedEntry) -> None:
+        """Create a reference to a reader. Use ``shared_reader`` instead."""
+        self._key = key
+        self._entry: _SharedEntry | None = entry
+
+    @property
+    def closed(self) -> bool:
+        """Whether this reference has been released."""
+        return self._entry is None
+
+    def close(self) -> None:
+        """Release this reference, closing the reader if it is the last one."""
+        with _registry_lock:
+            entry = self._entry
+            if entry is None:
+                return
+            self._entry = None
+            entry.count -= 1
+            if entry.count:
+                return
+            if _registry.get(self._key) is entry:
+                del _registry[self._key]
+        entry.reader.close()
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        return getattr(self._reader(), name)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._reader())
+
+    def _reader(self) -> Reader:
+        # Looked up in __dict__ as __getattr__ may be called before
+        # __init__, e.g., when copying.
+        entry = self.__dict__.get("_entry")
+        if entry is None:
+            msg = "Attempt to read from a closed MaxMind DB."
+            raise ValueError(msg)
+        return entry.reader
+
+    def __exit__(self, *_) -> None:  # noqa: ANN002
+        self.close()
+
+    def __enter__(self) -> Self:
+        if self._entry is None:
+            msg = "Attempt to reopen a closed MaxMind DB"
+            raise ValueError(msg)
+        return self
+
+
+def shared_reader(
+    database: str | os.PathLike,
+    mode: int = MODE_AUTO,
+    **kwargs: Any,  # noqa: ANN401
+) -> SharedReader:
+    """Return a reference to a reader of a MaxMind DB file shared by the process.
+
+    Readers are shared by the callers opening the same file, as identified by
+    its device, inode and modification time, with the same mode and options.
+    Once the file is replaced, such as by a database update, later calls open
+    the new file, while existing references keep using the old reader until
+    released.
+
+    Arguments:
+        database: the path of the MaxMind DB file
+        mode: the mode to open the database with, as for ``open_database``
+        **kwargs: other arguments of ``open_database``
+
+    Returns:
+        A reference to the reader, which must be closed, e.g., by using it as
+        a context manager, once no longer used.
+
+    """
+    from maxminddb import open_database  # noqa: PLC0415
+
+    key = (
+        _file_identity(os.stat(database)),  # noqa: PTH116
+        mode,
+        tuple(sorted(kwargs.items())),
+    )
+    with _registry_lock:
+        entry = _registry.get(key)
+        if entry is None:
+            entry = _SharedEntry(open_database(database, mode, **kwargs))
+            _registry[key] = entry
+        entry.count += 1
+    return SharedReader(key, entry)
+
+
+def load_shared_memory(
+    database: str | os.PathLike,
+    *,
+    name: str | None = None,
+) -> SharedMemory:
+    """Copy a MaxMind DB file into a new shared memory block.
+
+    Each process opens the database with
+    ``open_database(block.buf, MODE_FD)``, or attaches to the block by name
+    first. The database is read in place rather than copied by both readers.
+    The caller is responsible for closing and unlinking the block.
+
+    Arguments:
+        database: the path of the MaxMind DB file
+        name: the name of the block. A unique name is chosen if not set.
+
+    Returns:
+        The shared memory block containing the database.
+
+    Raises:
+        InvalidDatabaseError: if the file is not a valid MaxMind DB file. The
+              block is unlinked in this case.
+
+    """
+    with open(database, "rb") as db_file:
+        size = os.fstat(db_file.fileno()).st_size
+        block = SharedMemory(name=name, create=True, size=max(size, 1))
+        try:
+            buf = cast("memoryview", block.buf)
+            _read_into(db_file, buf, size)
+            _check_database(buf)
+        except BaseException:
+            block.close()
+            block.unlink()
+            raise
+    return block
+
+
+def load_memfd(database: str | os.PathLike, *, name: str = "maxminddb") -> int:
+    """Copy a MaxMind DB file into a sealed memfd. Linux only.
+
+    The returned file descriptor is inherited by forked workers, which open
+    the database with ``open_database(fd, MODE_FD)``. The descriptor is
+    memory mapped rather than read, so all workers share its pages. The memfd
+    is sealed against writes and resizing, and is freed once the descriptor
+    is closed in every process and no reader uses it.
+
+    Arguments:
+        database: the path of the MaxMind DB file
+        name: the name of the memfd, as shown in ``/proc/<pid>/fd``
+
+    Returns:
+        The file descriptor of the memfd.
+
+    Raises:
+        InvalidDatabaseError: if the file is not a valid MaxMind DB file.
+
+    """
+    if not hasattr(os, "memfd_create"):
+        msg = "memfd_create is not available on this platform"
+        raise OSError(msg)
+    import fcntl  # noqa: PLC0415
+
+    fd = os.memfd_create(name, os.MFD_CLOEXEC | os.MFD_ALLOW_SEALING)
+    try:
+        with (
+            open(database, "rb") as db_file,
+            open(fd, "wb", closefd=False) as memfd,
+        ):
+            shutil.copyfileobj(db_file, memfd)
+        fcntl.fcntl(
+            fd,
+            fcntl.F_ADD_SEALS,
+            fcntl.F_SEAL_WRITE
+            | fcntl.F_SEAL_SHRINK
+            | fcntl.F_SEAL_GROW
+            | fcntl.F_SEAL_SEAL,
+        )
+        _check_database(fd)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _read_into(db_file: IO[bytes], buf: memoryview, size: int) -> None:
+    """Read size bytes of db_file into buf."""
+    offset = 0
+    while offset < size:
+        with buf[offset:size] as view:
+            read = db_file.readinto(view)  # type: ignore[attr-defined]
+        if not read:
+            msg = f"{db_file.name} was truncated while being read"
+            raise OSError(msg)
+        offset += read
+
+
+def _check_database(database: Buffer | int) -> None:
+    """Validate the metadata of the database as opening a Reader does."""
+    Reader(database, MODE_FD).close()
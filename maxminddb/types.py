@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import AnyStr, TypeAlias
+from typing import AnyStr, Protocol, TypeAlias
 
 Primitive: TypeAlias = AnyStr | bool | float | int
 
@@ -13,3 +13,29 @@ RecordDict: TypeAlias = dict[str, "Record"]
 """RecordDict is a type for dicts in a database record."""
 
 Record: TypeAlias = Primitive | RecordList | RecordDict
+
+
+class Visitor(Protocol):
+    """Receives the contents of a record as a series of events.
+
+    Maps and arrays are reported by their start and end events, with their
+    keys and values reported in between, in the order they are stored.
+    """
+
+    def start_map(self, size: int) -> None:
+        """Start a map with size entries, each reported as a key and a value."""
+
+    def end_map(self) -> None:
+        """End the current map."""
+
+    def start_array(self, size: int) -> None:
+        """Start an array with size values."""
+
+    def end_array(self) -> None:
+        """End the current array."""
+
+    def key(self, key: str) -> None:
+        """Report the key of the next map entry."""
+
+    def value(self, value: Primitive | None) -> None:
+        """Report a value other than a map or an array."""
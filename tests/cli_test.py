@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import csv
+import json
+import pathlib
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+from typing import cast
+from unittest import mock
+
+import maxminddb
+
+try:
+    import maxminddb.extension
+except ImportError:
+    maxminddb.extension = None  # type: ignore[assignment]
+
+from maxminddb.cli import _JSONLinesEncoder, main
+
+
+class TestLookupCommand(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = pathlib.Path(tmp.name)
+
+    def run_lookup(
+        self,
+        database: str,
+        ips: list[str],
+        *args: str,
+    ) -> tuple[int, str]:
+        source = self.tmp / "ips.txt"
+        source.write_text("\n".join(ips) + "\n")
+        output = self.tmp / "out"
+        with redirect_stderr(StringIO()):
+            status = main(["lookup", database, str(source), "-o", str(output), *args])
+        return status, output.read_text(encoding="utf-8")
+
+    def test_jsonl(self) -> None:
+        status, output = self.run_lookup(
+            "tests/data/test-data/MaxMind-DB-test-ipv4-24.mmdb",
+            ["1.1.1.1", "1.1.1.3", "", "1.1.1.3", "2.2.2.2"],
+            "--batch-size",
+            "2",
+        )
+        self.assertEqual(status, 0)
+        self.assertEqual(
+            [json.loads(line) for line in output.splitlines()],
+            [
+                {
+                    "ip": "1.1.1.1",
+                    "network": "1.1.1.1/32",
+                    "record": {"ip": "1.1.1.1"},
+                },
+                {
+                    "ip": "1.1.1.3",
+                    "network": "1.1.1.2/31",
+                    "record": {"ip": "1.1.1.2"},
+                },
+                {
+                    "ip": "1.1.1.3",
+                    "network": "1.1.1.2/31",
+                    "record": {"ip": "1.1.1.2"},
+                },
+                {"ip": "2.2.2.2", "network": "2.0.0.0/7", "record": None},
+            ],
+        )
+
+    def test_csv_fields(self) -> None:
+        status, output = self.run_lookup(
+            "tests/data/test-data/GeoIP2-City-Test.mmdb",
+            ["81.2.69.160", "2001:218::"],
+            "--format",
+            "csv",
+            "--fields",
+            "country.iso_code,location.latitude,subdivisions.0.iso_code,city.names",
+        )
+        self.assertEqual(status, 0)
+        rows = list(csv.reader(StringIO(output)))
+        self.assertEqual(
+            rows[0],
+            [
+                "ip",
+                "network",
+                "country.iso_code",
+                "location.latitude",
+                "subdivisions.0.iso_code",
+                "city.names",
+            ],
+        )
+        self.assertEqual(
+            rows[1][:5], ["81.2.69.160", "81.2.69.160/27", "GB", "51.5142", "ENG"]
+        )
+        self.assertEqual(json.loads(rows[1][5])["en"], "London")
+        self.assertEqual(rows[2][2:], ["JP", "35.68536", "", ""])
+
+    def test_single_search(self) -> None:
+        # The records of new networks are decoded from the offsets found when
+        # looking up the batch, without searching the tree again.
+        with mock.patch.object(
+            maxminddb.reader.Reader,
+            "_find_address_in_tree",
+            autospec=True,
+            side_effect=maxminddb.reader.Reader._find_address_in_tree,  # noqa: SLF001
+        ) as find:
+            status, output = self.run_lookup(
+                "tests/data/test-data/MaxMind-DB-test-ipv4-24.mmdb",
+                ["1.1.1.1", "1.1.1.3", "1.1.1.2"],
+                "--mode",
+                "mmap",
+            )
+        self.assertEqual(status, 0)
+        self.assertEqual(find.call_count, 3)
+        self.assertEqual(
+            [json.loads(line)["record"] for line in output.splitlines()],
+            [{"ip": "1.1.1.1"}, {"ip": "1.1.1.2"}, {"ip": "1.1.1.2"}],
+        )
+
+    def test_invalid_addresses(self) -> None:
+        for args in ((), ("--fields", "ip")):
+            status, output = self.run_lookup(
+                "tests/data/test-data/MaxMind-DB-test-ipv4-24.mmdb",
+                ["not-an-ip", "2001::", "1.1.1.1", "2001::", "1.1.1.3"],
+                *args,
+            )
+            self.assertEqual(status, 1)
+            self.assertEqual(
+                [json.loads(line)["network"] for line in output.splitlines()],
+                ["1.1.1.1/32", "1.1.1.2/31"],
+            )
+
+
+class TestDumpCommand(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output = pathlib.Path(tmp.name) / "out"
+
+    def run_dump(self, database: str, *args: str) -> str:
+        status = main(["dump", database, "-o", str(self.output), *args])
+        self.assertEqual(status, 0)
+        return self.output.read_text(encoding="utf-8")
+
+    def test_jsonl(self) -> None:
+        database = "tests/data/test-data/MaxMind-DB-test-mixed-24.mmdb"
+        modes = ["mmap", "file"]
+        if hasattr(maxminddb.extension, "Reader"):
+            modes.append("mmap_ext")
+        for mode in modes:
+            rows = [
+                json.loads(line)
+                for line in self.run_dump(database, "--mode", mode).splitlines()
+            ]
+            with maxminddb.open_database(database) as reader:
+                expected = [
+                    {"network": str(network), "record": record}
+                    for network, record in reader
+                ]
+            self.assertEqual(rows, expected, mode)
+
+    def test_encode_once(self) -> None:
+        database = "tests/data/test-data/GeoIP2-City-Test.mmdb"
+        modes = ["mmap"]
+        if hasattr(maxminddb.extension, "Reader"):
+            modes.append("mmap_ext")
+        with maxminddb.open_database(database) as reader:
+            offsets = [offset for _, offset in reader.iter_offsets()]
+        for mode in modes:
+            with mock.patch.object(
+                _JSONLinesEncoder,
+                "record",
+                autospec=True,
+                side_effect=_JSONLinesEncoder.record,
+            ) as record:
+                self.run_dump(database, "--mode", mode)
+            # Each record is encoded once, however many networks share it.
+            self.assertEqual(record.call_count, len(set(offsets)), mode)
+            self.assertLess(record.call_count, len(offsets))
+
+    def test_csv_fields(self) -> None:
+        output = self.run_dump(
+            "tests/data/test-data/MaxMind-DB-test-ipv4-24.mmdb",
+            "--format",
+            "csv",
+            "--fields",
+            "ip",
+        )
+        self.assertEqual(
+            output.splitlines()[:3],
+            ["network,ip", "1.1.1.1/32,1.1.1.1", "1.1.1.2/31,1.1.1.2"],
+        )
+
+    def test_coalesce(self) -> None:
+        database = "tests/data/test-data/GeoIP2-Connection-Type-Test.mmdb"
+        args = ("--format", "csv", "--fields", "connection_type")
+        expanded = self.run_dump(database, *args).splitlines()
+        coalesced = self.run_dump(database, "--coalesce", *args).splitlines()
+
+        self.assertEqual(coalesced[0], "start_ip,end_ip,connection_type")
+        self.assertIn("1.0.2.0,1.0.255.255,Cable/DSL", coalesced)
+        self.assertLess(len(coalesced), len(expanded))
+
+        with maxminddb.open_database(database) as reader:
+            for start, end, value in csv.reader(coalesced[1:]):
+                for address in (start, end):
+                    record = cast("dict", reader.get(address))
+                    self.assertEqual(value, record["connection_type"], address)
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import mmap
+import tempfile
 import unittest
-from typing import TYPE_CHECKING, Any, ClassVar
+from typing import TYPE_CHECKING, Any, ClassVar, cast
+from unittest import mock
 
-from maxminddb.decoder import Decoder
+from maxminddb.decoder import Decoder, ExtensionDecoder, FileBufferDecoder
+from maxminddb.errors import InvalidDatabaseError
+from maxminddb.file import FileBuffer
 
 if TYPE_CHECKING:
     from _typeshed import SizedBuffer
@@ -203,16 +207,112 @@ class TestDecoder(unittest.TestCase):
         db = mmap.mmap(-1, len(input_value))
         db.write(input_value)
 
-        decoder = Decoder(db, pointer_test=True)
-        (
-            actual,
-            _,
-        ) = decoder.decode(0)
+        with tempfile.NamedTemporaryFile() as db_file:
+            db_file.write(bytes(input_value))
+            db_file.flush()
+            file_buffer = FileBuffer(db_file.name)
+            decoders = [
+                Decoder(db, pointer_test=True),
+                FileBufferDecoder(file_buffer, pointer_test=True),
+            ]
+            # ExtensionDecoder always follows pointers.
+            if ExtensionDecoder.available and data_type != "pointers":
+                decoders.append(ExtensionDecoder(db))
+            for decoder in decoders:
+                (
+                    actual,
+                    _,
+                ) = decoder.decode(0)
+
+                if data_type in ("float", "double"):
+                    self.assertAlmostEqual(expected, actual, places=3, msg=data_type)
+                else:
+                    self.assertEqual(expected, actual, data_type)
+                self.assertIs(type(actual), type(expected), data_type)
+            file_buffer.close()
+
+    def test_invalid_sizes(self) -> None:
+        for input_value in (
+            b"\x67\x00\x00\x00\x00\x00\x00\x00",  # 7 byte double
+            b"\x05\x08\x00\x00\x00\x00\x00",  # 5 byte float
+            b"\x05\x01\x00\x00\x00\x00\x00",  # 5 byte int32
+            b"\x11\x03" + 17 * b"\xff",  # 17 byte uint128
+        ):
+            with self.assertRaises(InvalidDatabaseError):
+                Decoder(input_value).decode(0)
+            if ExtensionDecoder.available:
+                with self.assertRaises(InvalidDatabaseError):
+                    ExtensionDecoder(input_value).decode(0)
+
+    def test_walk(self) -> None:
+        # A map with "a" set to [1] and "b" set to true, followed by a
+        # pointer to the map.
+        data = b"\xe2\x41a\x01\x04\xa1\x01\x41b\x01\x07\x20\x00"
+        events = [
+            mock.call.start_map(2),
+            mock.call.key("a"),
+            mock.call.start_array(1),
+            mock.call.value(1),
+            mock.call.end_array(),
+            mock.call.key("b"),
+            mock.call.value(True),  # noqa: FBT003
+            mock.call.end_map(),
+        ]
+        for offset, end in ((0, 11), (11, 13)):
+            visitor = mock.Mock()
+            self.assertEqual(Decoder(data).walk(offset, visitor), end)
+            self.assertEqual(visitor.mock_calls, events)
+
+    def test_specialize_maps(self) -> None:
+        maps = [
+            # A map with "a" set to 1 and "b" set to "x"
+            b"\xe2\x41a\xa1\x01\x41b\x41x",
+            # A map whose second key differs
+            b"\xe2\x41a\xa1\x02\x41c\x41y",
+            # A map whose values have different types
+            b"\xe2\x41a\x41z\x41b\x01\x04\xa1\x03",
+            # A map with a long string and a nested map
+            b"\xe2\x41a\x5d\x00" + b"x" * 29 + b"\x41b\xe2\x41a\xa1\x01\x41b\x41x",
+        ]
+        db = b"".join(maps)
+        offsets = [sum(len(m) for m in maps[:i]) for i in range(len(maps))]
+        generic = Decoder(db)
+        decoder = Decoder(db, specialize_maps=True)
+        for _ in range(20):
+            for offset in offsets:
+                self.assertEqual(decoder.decode(offset), generic.decode(offset))
+        self.assertTrue(decoder._plans)  # noqa: SLF001
 
-        if data_type in ("float", "double"):
-            self.assertAlmostEqual(expected, actual, places=3, msg=data_type)
-        else:
-            self.assertEqual(expected, actual, data_type)
+    def test_bytes_as_memoryview(self) -> None:
+        db = b"\xe2\x41a\x83\x00\x00\x2a\x41b\x80"
+        decoder = Decoder(db, bytes_as_memoryview=True)
+        value = cast("dict", decoder.decode(0)[0])
+        self.assertEqual(value, {"a": b"\x00\x00\x2a", "b": b""})
+        self.assertIsInstance(value["a"], memoryview)
+        self.assertIs(value["a"].obj, db)
+
+    def test_decode_path(self) -> None:
+        # A map with "a" set to [true, {"b": 1}, "x"] and "c" set to 0.5
+        db = (
+            b"\xe2\x41a\x03\x04\x01\x07\xe1\x41b\xa1\x01\x41x"
+            b"\x41c\x68\x3f\xe0\x00\x00\x00\x00\x00\x00"
+        )
+        decoder = Decoder(db)
+        paths: dict[tuple[str | int, ...], Any] = {
+            (): {"a": [True, {"b": 1}, "x"], "c": 0.5},
+            ("a",): [True, {"b": 1}, "x"],
+            ("a", 1, "b"): 1,
+            ("a", "1", "b"): 1,
+            ("a", -1): "x",
+            ("a", 3): None,
+            ("a", -4): None,
+            ("a", "b"): None,
+            ("a", 2, "b"): None,
+            ("c",): 0.5,
+            ("d",): None,
+        }
+        for path, expected in paths.items():
+            self.assertEqual(decoder.decode_path(0, path), expected, path)
 
     def test_real_pointers(self) -> None:
         with open("tests/data/test-data/maps-with-pointers.raw", "r+b") as db_file:
@@ -231,4 +331,8 @@ class TestDecoder(unittest.TestCase):
 
             self.assertEqual(({"long_key2": "long_value2"}, 59), decoder.decode(57))
 
+            self.assertEqual("long_value1", decoder.decode_path(55, ["long_key"]))
+
+            self.assertIsNone(decoder.decode_path(57, ["long_key"]))
+
             mm.close()
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import unittest
+from typing import cast
+from unittest import mock
+
+import maxminddb
+from maxminddb.const import Mode
+from maxminddb.file import CacheInfo, FileBuffer, _HandlePool
+
+DATABASE = "tests/data/test-data/GeoIP2-City-Test.mmdb"
+
+
+class TestFileBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        with open(DATABASE, "rb") as db_file:
+            self.data = db_file.read()
+
+    def test_block_cache(self) -> None:
+        for cache_size, block_size in ((0, 4096), (2, 16), (64, 4096)):
+            buffer = FileBuffer(
+                DATABASE,
+                cache_size=cache_size,
+                block_size=block_size,
+            )
+            self.addCleanup(buffer.close)
+            for start, stop in ((0, 1), (15, 17), (10, 100), (0, 0), (1000, 1040)):
+                self.assertEqual(buffer[start:stop], self.data[start:stop])
+            for index in (0, 15, 16, 4097, len(self.data) - 1):
+                self.assertEqual(buffer[index], self.data[index])
+            self.assertEqual(
+                buffer[len(self.data) - 3 : len(self.data) + 10],
+                self.data[-3:],
+            )
+            with self.assertRaises(IndexError):
+                buffer[len(self.data)]
+
+            info = buffer.cache_info()
+            self.assertEqual(info.maxsize, cache_size)
+            self.assertEqual(info.block_size, block_size)
+            self.assertLessEqual(info.currsize, cache_size)
+            if cache_size:
+                self.assertGreater(info.hits, 0)
+                self.assertGreater(info.misses, 0)
+
+    def test_handle_pool(self) -> None:
+        with mock.patch("maxminddb.file._HAS_PREAD", False):  # noqa: FBT003
+            buffer = FileBuffer(DATABASE)
+        self.addCleanup(buffer.close)
+        barrier = threading.Barrier(8)
+        errors: list[str] = []
+
+        def read(start: int) -> None:
+            barrier.wait()
+            errors.extend(
+                f"mismatch at {offset}"
+                for offset in range(start, len(self.data), 997)
+                if buffer[offset : offset + 50] != self.data[offset : offset + 50]
+            )
+
+        threads = [threading.Thread(target=read, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        pool = buffer._pool  # noqa: SLF001
+        self.assertIsNotNone(pool)
+        self.assertGreaterEqual(len(pool._handles), 1)  # type: ignore[union-attr]  # noqa: SLF001
+
+    def test_handle_pool_after_fork(self) -> None:
+        with mock.patch("maxminddb.file._HAS_PREAD", False):  # noqa: FBT003
+            buffer = FileBuffer(DATABASE)
+        self.addCleanup(buffer.close)
+        self.assertEqual(buffer[0:100], self.data[0:100])
+        pool = cast("_HandlePool", buffer._pool)  # noqa: SLF001
+        # A thread of the parent held the lock when forking.
+        pool._open_lock.acquire()  # noqa: SLF001
+        buffer._after_fork()  # noqa: SLF001
+        self.assertEqual(pool._handles, [])  # noqa: SLF001
+        self.assertEqual(buffer[100:200], self.data[100:200])
+
+    def test_handle_pool_replaced_file(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "db.mmdb"
+            shutil.copyfile(DATABASE, path)
+            with mock.patch("maxminddb.file._HAS_PREAD", False):  # noqa: FBT003
+                buffer = FileBuffer(str(path))
+            new_path = path.with_suffix(".new")
+            new_path.write_bytes(b"\x00" * len(self.data))
+            new_path.replace(path)
+
+            # The replacement is not used, so reads use the original handle.
+            self.assertEqual(buffer[0:100], self.data[0:100])
+            self.assertEqual(buffer._pool._handles, [])  # type: ignore[union-attr]  # noqa: SLF001
+            buffer.close()
+
+    def test_read_ranges(self) -> None:
+        buffer = FileBuffer(DATABASE, block_size=16)
+        self.addCleanup(buffer.close)
+        size = len(self.data)
+        spans = buffer.read_ranges(
+            [(100, 4), (0, 10), (20, 5), (5, 10), (size - 2, 10), (size + 5, 1)],
+        )
+        self.assertEqual(
+            spans,
+            [
+                (0, self.data[0:25]),
+                (100, self.data[100:104]),
+                (size - 2, self.data[-2:]),
+            ],
+        )
+        self.assertEqual(buffer.read_ranges([]), [])
+
+        view = buffer.prefetch([(0, 10), (1000, 10)])
+        with mock.patch("os.pread", side_effect=os.pread) as pread:
+            self.assertEqual(view[2:8], self.data[2:8])
+            self.assertEqual(view[1005], self.data[1005])
+            pread.assert_not_called()
+            self.assertEqual(view[5:15], self.data[5:15])
+            self.assertEqual(view[500], self.data[500])
+            self.assertEqual(pread.call_count, 2)
+
+    def test_batched_lookups(self) -> None:
+        for ip_version in (4, 6):
+            for record_size in (24, 28, 32):
+                path = (
+                    f"tests/data/test-data/MaxMind-DB-test-mixed-{record_size}.mmdb"
+                    if ip_version == 6
+                    else f"tests/data/test-data/MaxMind-DB-test-ipv4-{record_size}.mmdb"
+                )
+                with maxminddb.open_database(path, Mode.MEMORY) as reader:
+                    ips = [
+                        str(address)
+                        for network, _ in reader
+                        for address in (network[0], network[-1])
+                    ]
+                    ips.append("1.1.1.1" if ip_version == 4 else "::1")
+                    expected = reader.get_columns(ips, ["ip", "utf8_string"])
+                    prefix_lens = [reader.get_with_prefix_len(ip)[1] for ip in ips]
+                with maxminddb.open_database(path, Mode.FILE) as reader:
+                    self.assertEqual(
+                        reader.get_columns(ips, ["ip", "utf8_string"]),
+                        expected,
+                    )
+                    self.assertEqual(
+                        [
+                            prefix_len
+                            for _, prefix_len in reader._lookup_pointers(ips)  # noqa: SLF001
+                        ],
+                        prefix_lens,
+                    )
+
+    def test_batched_reads(self) -> None:
+        with maxminddb.open_database(DATABASE, Mode.FILE) as reader:
+            ips = [str(network[0]) for network, _ in reader]
+            records = [cast("dict", reader.get(ip)) for ip in ips]
+            with mock.patch("os.pread", side_effect=os.pread) as pread:
+                columns = reader.get_columns(ips, ["country", "location"])
+            # The nodes of each level of the tree, and the start of the
+            # records, are read at once rather than node by node.
+            self.assertLess(pread.call_count, len(ips) / 4)
+        self.assertEqual(
+            columns["country"],
+            [record.get("country") for record in records],
+        )
+        self.assertEqual(
+            columns["location"],
+            [record.get("location") for record in records],
+        )
+
+    @unittest.skipUnless(hasattr(os, "fork"), "fork is not available")
+    def test_fork(self) -> None:
+        with maxminddb.open_database(DATABASE, Mode.FILE, file_cache_size=8) as reader:
+            expected = reader.get("81.2.69.160")
+            self.assertGreater(cast("CacheInfo", reader.file_cache_info()).misses, 0)
+            mp = multiprocessing.get_context("fork")
+            (parent, child) = mp.Pipe()
+
+            def lookup() -> None:
+                # The cache statistics are those of the child.
+                child.send((reader.file_cache_info(), reader.get("81.2.69.160")))
+
+            process = mp.Process(target=lookup)
+            process.start()
+            (info, record) = parent.recv()
+            process.join()
+        self.assertEqual(info, CacheInfo(0, 0, 8, 0, 4096))
+        self.assertEqual(record, expected)
+
+    def test_mlock_tree_without_extension(self) -> None:
+        with (
+            mock.patch("maxminddb.reader._mlock", None),
+            self.assertRaisesRegex(OSError, "requires the maxminddb.extension"),
+        ):
+            maxminddb.reader.Reader(DATABASE, Mode.MMAP, mlock_tree=True)
+
+    def test_invalid_arguments(self) -> None:
+        with self.assertRaisesRegex(ValueError, "cache_size must not be negative"):
+            FileBuffer(DATABASE, cache_size=-1)
+        for block_size in (0, -4096, 1000):
+            with self.assertRaisesRegex(ValueError, "block_size must be a power"):
+                FileBuffer(DATABASE, cache_size=1, block_size=block_size)
+
+    def test_reader(self) -> None:
+        with maxminddb.open_database(DATABASE, Mode.FILE) as reader:
+            expected = list(reader)
+            self.assertEqual(reader.file_cache_info(), CacheInfo(0, 0, 0, 0, 4096))
+        with maxminddb.open_database(
+            DATABASE,
+            Mode.FILE,
+            file_cache_size=4,
+            file_block_size=256,
+        ) as reader:
+            self.assertEqual(list(reader), expected)
+            info = cast("CacheInfo", reader.file_cache_info())
+            self.assertGreater(info.hits, info.misses)
+        with maxminddb.reader.Reader(DATABASE, Mode.MEMORY) as reader:
+            self.assertIsNone(reader.file_cache_info())
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import ipaddress
+import itertools
+import unittest
+
+import maxminddb
+from maxminddb.const import Mode
+
+
+class TestEnrich(unittest.TestCase):
+    def setUp(self) -> None:
+        self.reader = maxminddb.open_database(
+            "tests/data/test-data/GeoIP2-City-Test.mmdb",
+            Mode.MMAP,
+        )
+        self.addCleanup(self.reader.close)
+
+    def test_results_in_order(self) -> None:
+        ips = [
+            "81.2.69.160",
+            "81.2.69.161",
+            ipaddress.ip_address("81.2.69.160"),
+            "1.2.3.4",
+            "2001:218::",
+            "2001:218::1",
+            "81.2.69.142",
+            "81.2.69.160",
+        ]
+        expected = [(ip, *self.reader.get_with_prefix_len(ip)) for ip in ips]
+        for chunk_size, dedupe_window in [(1024, 65536), (3, 2), (2, 0)]:
+            self.assertEqual(
+                list(
+                    maxminddb.enrich(
+                        self.reader,
+                        iter(ips),
+                        chunk_size=chunk_size,
+                        dedupe_window=dedupe_window,
+                    )
+                ),
+                expected,
+                (chunk_size, dedupe_window),
+            )
+
+    def test_reuses_network_results(self) -> None:
+        results = list(
+            maxminddb.enrich(self.reader, ["81.2.69.160", "81.2.69.170"]),
+        )
+        self.assertEqual([prefix_len for _, _, prefix_len in results], [27, 27])
+        self.assertIs(results[0][1], results[1][1])
+
+    def test_unbounded_input(self) -> None:
+        ips = itertools.cycle(["81.2.69.160", "2.125.160.216"])
+        results = maxminddb.enrich(self.reader, ips, chunk_size=4, dedupe_window=1)
+        self.assertEqual(
+            [ip for ip, _, _ in itertools.islice(results, 5)],
+            ["81.2.69.160", "2.125.160.216"] * 2 + ["81.2.69.160"],
+        )
+
+    def test_invalid_arguments(self) -> None:
+        with self.assertRaisesRegex(ValueError, "chunk_size"):
+            next(maxminddb.enrich(self.reader, [], chunk_size=0))
+        with self.assertRaisesRegex(ValueError, "dedupe_window"):
+            next(maxminddb.enrich(self.reader, [], dedupe_window=-1))
+        with self.assertRaisesRegex(ValueError, "does not appear to be"):
+            list(maxminddb.enrich(self.reader, ["1.2.3.4", "not-an-ip"]))
@@ -2,12 +2,17 @@ from __future__ import annotations
 
 import io
 import ipaddress
+import json
 import multiprocessing
 import os
 import pathlib
+import pickle
+import shutil
+import tempfile
 import threading
 import unittest
-from typing import TYPE_CHECKING, cast
+from types import MappingProxyType, SimpleNamespace
+from typing import TYPE_CHECKING, Any, cast
 from unittest import mock
 
 import maxminddb
@@ -22,25 +27,77 @@ from maxminddb.const import (
     MODE_AUTO,
     MODE_FD,
     MODE_FILE,
+    MODE_HYBRID,
     MODE_MEMORY,
     MODE_MMAP,
     MODE_MMAP_EXT,
 )
+from maxminddb.decoder import Decoder, ExtensionDecoder
+from maxminddb.file import CacheInfo, FileBuffer
 
 if TYPE_CHECKING:
     from maxminddb.reader import Reader
 
 
-def get_reader_from_file_descriptor(filepath: str, mode: int) -> Reader:
+def get_reader_from_file_descriptor(filepath: str, mode: int, **kwargs) -> Reader:
     """Patches open_database() for class TestFDReader()."""
     if mode == MODE_FD:
         with open(filepath, "rb") as mmdb_fh:
-            return maxminddb.open_database(mmdb_fh, mode)
+            return maxminddb.open_database(mmdb_fh, mode, **kwargs)
     else:
         # There are a few cases where mode is statically defined in
         # BaseTestReader(). In those cases just call an unpatched
         # open_database() with a string path.
-        return maxminddb.open_database(filepath, mode)
+        return maxminddb.open_database(filepath, mode, **kwargs)
+
+
+def value_types(value: object) -> object:
+    """Return the types of value and of the values within it."""
+    if isinstance(value, dict):
+        return dict, {key: value_types(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value), [value_types(item) for item in value]
+    return type(value)
+
+
+class RecordBuilder:
+    """Visitor building the record from the events, like Reader.get."""
+
+    def __init__(self) -> None:
+        self.stack: list[Any] = [[]]
+        self.sizes: list[int] = []
+        self.keys: list[str] = []
+
+    def start_map(self, size: int) -> None:
+        self.stack.append({})
+        self.sizes.append(size)
+
+    def end_map(self) -> None:
+        self._end()
+
+    def start_array(self, size: int) -> None:
+        self.stack.append([])
+        self.sizes.append(size)
+
+    def end_array(self) -> None:
+        self._end()
+
+    def key(self, key: str) -> None:
+        self.keys.append(key)
+
+    def value(self, value: object) -> None:
+        container = self.stack[-1]
+        if isinstance(container, dict):
+            container[self.keys.pop()] = value
+        else:
+            container.append(value)
+
+    def _end(self) -> None:
+        container = self.stack.pop()
+        if len(container) != self.sizes.pop():
+            msg = "unexpected number of values"
+            raise ValueError(msg)
+        self.value(container)
 
 
 class BaseTestReader(unittest.TestCase):
@@ -49,7 +106,7 @@ class BaseTestReader(unittest.TestCase):
     use_ip_objects = False
 
     # fork doesn't work on Windows and spawn would involve pickling the reader,
-    # which isn't possible.
+    # which isn't possible with MODE_FD.
     if os.name != "nt":
         mp = multiprocessing.get_context("fork")
 
@@ -260,6 +317,14 @@ class BaseTestReader(unittest.TestCase):
         self.assertEqual(record["array"], [1, 2, 3])
         self.assertEqual(record["boolean"], True)
         self.assertEqual(record["bytes"], bytearray(b"\x00\x00\x00*"))
+        # Only the C extension reading a memory mapped file returns bytearray.
+        self.assertIs(
+            type(record["bytes"]),
+            bytearray
+            if self.reader_class is not maxminddb.reader.Reader
+            and self.mode in (MODE_AUTO, MODE_MMAP_EXT)
+            else bytes,
+        )
         self.assertEqual(record["double"], 42.123456)
         self.assertAlmostEqual(record["float"], 1.1)
         self.assertEqual(record["int32"], -268435456)
@@ -278,15 +343,455 @@ class BaseTestReader(unittest.TestCase):
         self.assertEqual(1329227995784915872903807060280344576, record["uint128"])
         reader.close()
 
-    def test_metadata_pointers(self) -> None:
+    def test_get_json(self) -> None:
+        with open_database(
+            "tests/data/test-data/MaxMind-DB-test-decoder.mmdb",
+            self.mode,
+        ) as reader:
+            encoded = reader.get_json(self.ipf("::1.1.1.0"))
+            self.assertIsInstance(encoded, bytes)
+            expected = cast("dict", reader.get(self.ipf("::1.1.1.0")))
+            expected["bytes"] = "0000002a"
+            self.assertEqual(json.loads(encoded), expected)
+            self.assertIn("unicode! ☯ - ♫".encode(), encoded)
+
+        with open_database(
+            "tests/data/test-data/MaxMind-DB-test-ipv4-24.mmdb",
+            self.mode,
+        ) as reader:
+            self.assertEqual(reader.get_json(self.ipf("1.1.1.33")), b"null")
+
+    def test_get_json_cache(self) -> None:
+        with open_database(
+            "tests/data/test-data/GeoIP2-City-Test.mmdb",
+            self.mode,
+            json_cache_size=2,
+        ) as reader:
+            for ip in ["81.2.69.160", "81.2.69.142", "2.125.160.216"] * 3:
+                self.assertEqual(
+                    json.loads(reader.get_json(self.ipf(ip))),
+                    reader.get(self.ipf(ip)),
+                )
+
+        with self.assertRaisesRegex(ValueError, "json_cache_size"):
+            open_database(
+                "tests/data/test-data/GeoIP2-City-Test.mmdb",
+                self.mode,
+                json_cache_size=-1,
+            )
+
+    def test_pointer_cache(self) -> None:
+        ips = ["81.2.69.160", "81.2.69.142", "2.125.160.216", "89.160.20.112"]
+        database = "tests/data/test-data/GeoIP2-City-Test.mmdb"
+        with open_database(database, self.mode) as reader:
+            expected = [reader.get(self.ipf(ip)) for ip in ips]
+        with open_database(database, self.mode, pointer_cache_size=3) as reader:
+            for _ in range(2):
+                for ip, record in zip(ips, expected, strict=True):
+                    actual = cast("dict", reader.get(self.ipf(ip)))
+                    self.assertEqual(actual, record)
+                    # Modifying a record must not affect later lookups.
+                    actual["country"]["names"]["en"] = "Modified"
+                    actual["continent"].clear()
+                    for subdivision in actual.get("subdivisions", []):
+                        subdivision["names"].clear()
+
+        with self.assertRaisesRegex(ValueError, "pointer_cache_size"):
+            open_database(database, self.mode, pointer_cache_size=-1)
+
+    def test_string_cache(self) -> None:
+        ips = ["81.2.69.160", "81.2.69.142", "2.125.160.216", "89.160.20.112"]
+        database = "tests/data/test-data/GeoIP2-City-Test.mmdb"
+        with open_database(database, self.mode) as reader:
+            expected = [reader.get(self.ipf(ip)) for ip in ips]
+        for string_cache_size in (4, 1024):
+            with open_database(
+                database,
+                self.mode,
+                string_cache_size=string_cache_size,
+            ) as reader:
+                for _ in range(2):
+                    records = [cast("dict", reader.get(self.ipf(ip))) for ip in ips]
+                    self.assertEqual(records, expected)
+        # Values stored once in the database are shared between records.
+        self.assertIs(
+            records[0]["location"]["time_zone"],
+            records[1]["location"]["time_zone"],
+        )
+
+        with self.assertRaisesRegex(ValueError, "string_cache_size"):
+            open_database(database, self.mode, string_cache_size=-1)
+
+    def test_specialize_maps(self) -> None:
+        for database in (
+            "tests/data/test-data/GeoIP2-City-Test.mmdb",
+            "tests/data/test-data/GeoIP2-Enterprise-Test.mmdb",
+            "tests/data/test-data/MaxMind-DB-test-decoder.mmdb",
+        ):
+            with open_database(database, self.mode) as reader:
+                expected = list(reader)
+            with open_database(database, self.mode, specialize_maps=True) as reader:
+                for _ in range(2):
+                    self.assertEqual(list(reader), expected)
+
+    def test_extension_decoder(self) -> None:
+        if self.mode not in (MODE_MMAP, MODE_MEMORY, MODE_FD, MODE_HYBRID) or (
+            self.reader_class is not maxminddb.reader.Reader
+        ):
+            self.skipTest("Only the pure Python reader uses ExtensionDecoder")
+        if not ExtensionDecoder.available:
+            self.skipTest("No C extension module found")
+
+        for database in (
+            "tests/data/test-data/GeoIP2-City-Test.mmdb",
+            "tests/data/test-data/MaxMind-DB-test-decoder.mmdb",
+        ):
+            with open_database(database, self.mode) as reader:
+                decoder = reader._decoder  # noqa: SLF001
+                self.assertIsInstance(decoder, ExtensionDecoder)
+                python_decoder = Decoder(
+                    reader._buffer,  # noqa: SLF001
+                    decoder._pointer_base,  # noqa: SLF001
+                )
+                pointer_base = decoder._pointer_base  # noqa: SLF001
+                for _, data_offset in reader.iter_offsets():
+                    offset = pointer_base + data_offset
+                    actual = decoder.decode(offset)
+                    expected = python_decoder.decode(offset)
+                    self.assertEqual(actual, expected)
+                    # bytes and bytearray compare equal.
+                    self.assertEqual(value_types(actual), value_types(expected))
+
+        # The C extension does not support the options of the Python decoder.
+        with open_database(database, self.mode, pointer_cache_size=16) as reader:
+            self.assertNotIsInstance(
+                reader._decoder,  # noqa: SLF001
+                ExtensionDecoder,
+            )
+
+    def test_bytes_as_memoryview(self) -> None:
+        database = "tests/data/test-data/MaxMind-DB-test-decoder.mmdb"
+        if self.mode not in (MODE_MEMORY, MODE_FD):
+            with self.assertRaisesRegex(ValueError, "bytes_as_memoryview requires"):
+                open_database(database, self.mode, bytes_as_memoryview=True)
+            return
+
+        with open_database(database, self.mode) as reader:
+            expected = reader.get(self.ipf("::1.1.1.0"))
+            expected_json = reader.get_json(self.ipf("::1.1.1.0"))
+        with open_database(database, self.mode, bytes_as_memoryview=True) as reader:
+            record = cast("dict", reader.get(self.ipf("::1.1.1.0")))
+            self.assertIsInstance(record["bytes"], memoryview)
+            self.assertEqual(record, expected)
+            self.assertEqual(reader.get_json(self.ipf("::1.1.1.0")), expected_json)
+
+    def test_immutable_records(self) -> None:
+        def thaw(value: object) -> object:
+            if isinstance(value, MappingProxyType):
+                return {k: thaw(v) for k, v in value.items()}
+            if isinstance(value, tuple):
+                return [thaw(v) for v in value]
+            self.assertNotIsInstance(value, (dict, list, bytearray))
+            return value
+
+        for database, ip in (
+            ("tests/data/test-data/GeoIP2-City-Test.mmdb", "89.160.20.112"),
+            ("tests/data/test-data/MaxMind-DB-test-decoder.mmdb", "::1.1.1.0"),
+        ):
+            with open_database(database, self.mode) as reader:
+                expected = reader.get(self.ipf(ip))
+                expected_json = reader.get_json(self.ipf(ip))
+            for pointer_cache_size in (0, 16):
+                with open_database(
+                    database,
+                    self.mode,
+                    pointer_cache_size=pointer_cache_size,
+                    immutable_records=True,
+                ) as reader:
+                    record = reader.get(self.ipf(ip))
+                    self.assertIsInstance(record, MappingProxyType)
+                    self.assertEqual(thaw(record), expected)
+                    with self.assertRaises(TypeError):
+                        cast("dict", record)["new"] = 1
+                    self.assertEqual(reader.get_json(self.ipf(ip)), expected_json)
+
+    def test_record_factories(self) -> None:
+        def thaw(value: object) -> object:
+            if isinstance(value, SimpleNamespace):
+                return {k: thaw(v) for k, v in vars(value).items()}
+            if isinstance(value, tuple):
+                return [thaw(v) for v in value]
+            self.assertNotIsInstance(value, (dict, list))
+            return value
+
+        for database, ip in (
+            ("tests/data/test-data/GeoIP2-City-Test.mmdb", "89.160.20.112"),
+            ("tests/data/test-data/MaxMind-DB-test-decoder.mmdb", "::1.1.1.0"),
+        ):
+            with open_database(database, self.mode) as reader:
+                expected = reader.get(self.ipf(ip))
+                expected_json = reader.get_json(self.ipf(ip))
+            for pointer_cache_size in (0, 16):
+                with open_database(
+                    database,
+                    self.mode,
+                    pointer_cache_size=pointer_cache_size,
+                    map_factory=lambda m: SimpleNamespace(**m),
+                    array_factory=tuple,
+                ) as reader:
+                    record = reader.get(self.ipf(ip))
+                    self.assertIsInstance(record, SimpleNamespace)
+                    self.assertEqual(thaw(record), expected)
+                    self.assertEqual(reader.get_json(self.ipf(ip)), expected_json)
+
+        database = "tests/data/test-data/GeoIP2-City-Test.mmdb"
+        with open_database(database, self.mode, array_factory=tuple) as reader:
+            record = cast("dict", reader.get(self.ipf("89.160.20.112")))
+            self.assertIsInstance(record, dict)
+            self.assertIsInstance(record["subdivisions"], tuple)
+            self.assertIsInstance(cast("tuple", record["subdivisions"])[0], dict)
+
+        def fail(_: object) -> None:
+            msg = "factory failed"
+            raise KeyError(msg)
+
+        with open_database(database, self.mode, map_factory=fail) as reader:
+            with self.assertRaisesRegex(KeyError, "factory failed"):
+                reader.get(self.ipf("89.160.20.112"))
+            # Addresses without a record do not call the factory.
+            self.assertIsNone(reader.get(self.ipf("1.2.3.4")))
+
+        for name in ("map_factory", "array_factory"):
+            with self.assertRaisesRegex(TypeError, f"{name} must be callable"):
+                open_database(database, self.mode, **{name: cast("Any", 1)})
+
+    def test_close_from_factory(self) -> None:
+        if self.reader_class is maxminddb.reader.Reader:
+            self.skipTest("Only the C extension decodes from the open database")
+        database = "tests/data/test-data/GeoIP2-City-Test.mmdb"
+        for name in ("map_factory", "array_factory"):
+            readers: list[Reader] = []
+
+            def close(value: object, readers: list[Reader] = readers) -> object:
+                readers[0].close()
+                return value
+
+            reader = open_database(database, self.mode, **{name: cast("Any", close)})
+            readers.append(reader)
+            with self.assertRaisesRegex(ValueError, "being read"):
+                reader.get(self.ipf("81.2.69.160"))
+            self.assertFalse(reader.closed)
+            reader.close()
+
+    def test_map_keys_are_shared(self) -> None:
+        with open_database(
+            "tests/data/test-data/GeoIP2-City-Test.mmdb",
+            self.mode,
+        ) as reader:
+            records = [
+                cast("dict", reader.get(self.ipf(ip)))
+                for ip in ("81.2.69.160", "2.125.160.216")
+            ]
+            keys = [next(k for k in record if k == "country") for record in records]
+            self.assertIs(keys[0], keys[1])
+
+    def test_visit(self) -> None:
+        for database, ips in (
+            (
+                "tests/data/test-data/GeoIP2-City-Test.mmdb",
+                ["81.2.69.160", "2.125.160.216", "1.1.1.1"],
+            ),
+            (
+                "tests/data/test-data/MaxMind-DB-test-decoder.mmdb",
+                ["::1.1.1.0", "::2.2.0.0", "::0.0.0.0"],
+            ),
+        ):
+            with open_database(database, self.mode) as reader:
+                for ip in ips:
+                    (record, expected_prefix_len) = reader.get_with_prefix_len(
+                        self.ipf(ip),
+                    )
+                    builder = RecordBuilder()
+                    prefix_len = reader.visit(self.ipf(ip), builder)
+                    self.assertEqual(builder.stack, [[record]])
+                    self.assertEqual(prefix_len, expected_prefix_len)
+
+        class FailingVisitor(RecordBuilder):
+            def key(self, key: str) -> None:
+                raise KeyError(key)
+
+        with (
+            open_database(
+                "tests/data/test-data/GeoIP2-City-Test.mmdb",
+                self.mode,
+            ) as reader,
+            self.assertRaisesRegex(KeyError, "city"),
+        ):
+            reader.visit(self.ipf("81.2.69.160"), FailingVisitor())
+
+    def test_close_from_visitor(self) -> None:
+        if self.reader_class is maxminddb.reader.Reader:
+            self.skipTest("Only the C extension decodes from the open database")
+        reader = open_database(
+            "tests/data/test-data/GeoIP2-City-Test.mmdb",
+            self.mode,
+        )
+
+        class ClosingVisitor(RecordBuilder):
+            def start_map(self, size: int) -> None:
+                reader.close()
+                super().start_map(size)
+
+        with self.assertRaisesRegex(ValueError, "being read"):
+            reader.visit(self.ipf("81.2.69.160"), ClosingVisitor())
+        self.assertFalse(reader.closed)
+        reader.close()
+
+    def test_get_columns(self) -> None:
+        ips = ["81.2.69.160", "2001:218::", "81.2.69.160", "1.2.3.4", "89.160.20.112"]
+        fields = [
+            "country.iso_code",
+            "location",
+            "subdivisions.0.iso_code",
+            "subdivisions.-1.iso_code",
+            "subdivisions.9.iso_code",
+            "city.names.en.missing",
+        ]
+        with open_database(
+            "tests/data/test-data/GeoIP2-City-Test.mmdb",
+            self.mode,
+        ) as reader:
+            columns = reader.get_columns([self.ipf(ip) for ip in ips], fields)
+            self.assertEqual(list(columns), fields)
+            self.assertEqual(
+                columns["country.iso_code"],
+                ["GB", "JP", "GB", None, "SE"],
+            )
+            self.assertEqual(
+                columns["subdivisions.0.iso_code"],
+                ["ENG", None, "ENG", None, "E"],
+            )
+            self.assertEqual(
+                columns["subdivisions.-1.iso_code"],
+                ["ENG", None, "ENG", None, "E"],
+            )
+            self.assertEqual(columns["subdivisions.9.iso_code"], [None] * 5)
+            self.assertEqual(columns["city.names.en.missing"], [None] * 5)
+            for ip, location in zip(ips, columns["location"], strict=True):
+                record = cast("dict | None", reader.get(self.ipf(ip)))
+                self.assertEqual(location, record and record["location"])
+
+            self.assertEqual(reader.get_columns([], fields), {f: [] for f in fields})
+
+            with self.assertRaisesRegex(ValueError, "does not appear to be"):
+                reader.get_columns(["81.2.69.160", "not-an-ip"], fields)
+
+    def test_get_columns_with_prefix_len(self) -> None:
+        ips = ["81.2.69.160", "2001:218::", "1.2.3.4", "89.160.20.112"]
+        with open_database(
+            "tests/data/test-data/GeoIP2-City-Test.mmdb",
+            self.mode,
+        ) as reader:
+            addresses = [self.ipf(ip) for ip in ips]
+            (columns, prefix_lens) = reader.get_columns_with_prefix_len(
+                addresses,
+                ["country.iso_code"],
+            )
+            self.assertEqual(
+                columns, reader.get_columns(addresses, ["country.iso_code"])
+            )
+            self.assertEqual(
+                prefix_lens,
+                [reader.get_with_prefix_len(address)[1] for address in addresses],
+            )
+            self.assertEqual(
+                reader.get_columns_with_prefix_len(addresses[:1], []),
+                ({}, [27]),
+            )
+
+    def test_get_by_offset(self) -> None:
+        ips = ["81.2.69.160", "81.2.69.161", "2001:218::", "1.2.3.4"]
         with open_database(
-            "tests/data/test-data/MaxMind-DB-test-metadata-pointers.mmdb",
+            "tests/data/test-data/GeoIP2-City-Test.mmdb",
             self.mode,
         ) as reader:
+            addresses = [self.ipf(ip) for ip in ips]
+            (offsets, prefix_lens) = reader.get_offsets_with_prefix_len(addresses)
+            self.assertEqual(
+                prefix_lens,
+                [reader.get_with_prefix_len(address)[1] for address in addresses],
+            )
+            # Addresses sharing a record have the same offset.
+            self.assertEqual(offsets[0], offsets[1])
+            self.assertNotEqual(offsets[0], offsets[2])
+            self.assertIsNone(offsets[3])
+            for address, offset in zip(addresses[:3], offsets, strict=False):
+                self.assertIsNotNone(offset)
+                record = reader.get_by_offset(cast("int", offset))
+                self.assertEqual(record, reader.get(address))
+                for field in ("country.iso_code", "subdivisions.-1.iso_code", "x"):
+                    self.assertEqual(
+                        reader.get_by_offset(cast("int", offset), field),
+                        reader.get_columns([address], [field])[field][0],
+                    )
+
+            for offset in (-1, 1 << 30):
+                with self.assertRaisesRegex(ValueError, "outside the data section"):
+                    reader.get_by_offset(offset)
+
+    def test_iter_offsets(self) -> None:
+        with open_database(
+            "tests/data/test-data/GeoIP2-City-Test.mmdb",
+            self.mode,
+        ) as reader:
+            records = list(reader)
+            offsets = list(reader.iter_offsets())
+            self.assertEqual(
+                [network for network, _ in offsets],
+                [network for network, _ in records],
+            )
+            for (network, offset), (_, record) in zip(offsets, records, strict=True):
+                self.assertEqual(reader.get_by_offset(offset), record)
+                self.assertEqual(
+                    reader.get_offsets_with_prefix_len([network[0]]),
+                    ([offset], [network.prefixlen]),
+                )
+
+    def test_metadata_pointers(self) -> None:
+        database = "tests/data/test-data/MaxMind-DB-test-metadata-pointers.mmdb"
+        addresses = ("1.1.1.1", "::1:ffff:ffff", "::2:0:1", "2001::1", "::")
+        # libmaxminddb reads the metadata when opening the memory mapped file,
+        # while the C extension reads what lookups need itself with
+        # MODE_MEMORY and MODE_FD.
+        with (
+            maxminddb.extension.Reader(database, MODE_MMAP_EXT)
+            if has_maxminddb_extension()
+            else maxminddb.reader.Reader(database, MODE_MEMORY)
+        ) as expected_reader:
+            expected_metadata = expected_reader.metadata()
+            expected = [expected_reader.get_with_prefix_len(ip) for ip in addresses]
+        with open_database(database, self.mode) as reader:
             self.assertEqual(
                 "Lots of pointers in metadata",
                 reader.metadata().database_type,
             )
+            metadata = reader.metadata()
+            for name in (
+                "node_count",
+                "record_size",
+                "ip_version",
+                "description",
+                "languages",
+            ):
+                self.assertEqual(
+                    getattr(metadata, name),
+                    getattr(expected_metadata, name),
+                    name,
+                )
+            self.assertEqual(
+                [reader.get_with_prefix_len(self.ipf(ip)) for ip in addresses],
+                expected,
+            )
 
     def test_no_ipv4_search_tree(self) -> None:
         reader = open_database(
@@ -535,6 +1040,109 @@ class BaseTestReader(unittest.TestCase):
         self._check_ip_v4(reader, filename)
         reader.close()
 
+    def test_residency(self) -> None:
+        filename = "tests/data/test-data/GeoIP2-City-Test.mmdb"
+        with open_database(
+            filename,
+            self.mode,
+            madvise_random=True,
+            madvise_willneed=True,
+            madvise_hugepage=True,
+            mmap_populate=True,
+        ) as reader:
+            self.assertEqual(
+                cast("dict", reader.get(self.ipf("81.2.69.160")))["city"]["geoname_id"],
+                2643743,
+            )
+            residency = reader.residency()
+            if self.mode == MODE_FILE or (
+                self.reader_class is maxminddb.reader.Reader
+                and maxminddb.reader._resident is None  # noqa: SLF001
+            ):
+                self.assertIsNone(residency)
+                return
+            metadata = reader.metadata()
+            tree_size = metadata.node_count * metadata.record_size // 4
+            self.assertEqual(
+                residency,
+                maxminddb.reader.Residency(
+                    tree_size,
+                    tree_size,
+                    os.path.getsize(filename) - tree_size,  # noqa: PTH202
+                    os.path.getsize(filename) - tree_size,  # noqa: PTH202
+                ),
+            )
+        with self.assertRaisesRegex(ValueError, "closed MaxMind DB"):
+            reader.residency()
+
+    def test_warm(self) -> None:
+        filename = "tests/data/test-data/GeoIP2-City-Test.mmdb"
+        ips = [self.ipf("81.2.69.160"), self.ipf("2.125.160.216")]
+        with open_database(filename, self.mode, json_cache_size=16) as reader:
+            self.assertTrue(reader.warm())
+            self.assertTrue(reader.warm("all", budget_seconds=60))
+            self.assertFalse(reader.warm("all", budget_seconds=0))
+            self.assertTrue(reader.warm(ip_addresses=ips))
+            # The records of the addresses are cached.
+            for ip in ips:
+                self.assertIs(reader.get_json(ip), reader.get_json(ip))
+            with self.assertRaisesRegex(ValueError, "level must be 'tree' or 'all'"):
+                reader.warm("data")
+            with self.assertRaisesRegex(ValueError, "must not be negative"):
+                reader.warm(budget_seconds=-1)
+            with self.assertRaises(ValueError):
+                reader.warm(ip_addresses=["not an ip"])
+        with self.assertRaisesRegex(ValueError, "closed MaxMind DB"):
+            reader.warm()
+
+    def test_mlock_tree(self) -> None:
+        filename = "tests/data/test-data/MaxMind-DB-test-ipv4-24.mmdb"
+        try:
+            reader = open_database(filename, self.mode, mlock_tree=True)
+        except OSError as ex:
+            self.skipTest(f"The search tree could not be locked: {ex}")
+        with reader:
+            self._check_ip_v4(reader, filename)
+
+    def test_pickle(self) -> None:
+        filename = "tests/data/test-data/MaxMind-DB-test-ipv4-24.mmdb"
+        with open_database(filename, self.mode) as reader:
+            if self.mode == MODE_FD:
+                with self.assertRaisesRegex(
+                    TypeError,
+                    "Cannot pickle a Reader opened with MODE_FD",
+                ):
+                    pickle.dumps(reader)
+                return
+            data = pickle.dumps(reader)
+            self.assertLess(len(data), 1024)
+            with pickle.loads(data) as unpickled:  # noqa: S301
+                self.assertIsInstance(unpickled, self.reader_class)
+                self._check_ip_v4(unpickled, filename)
+
+    def test_pickle_replaced_file(self) -> None:
+        if self.mode == MODE_FD:
+            return
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "db.mmdb"
+            shutil.copyfile("tests/data/test-data/MaxMind-DB-test-ipv4-24.mmdb", path)
+            with open_database(str(path), self.mode) as reader:
+                data = pickle.dumps(reader)
+            new_path = path.with_suffix(".new")
+            shutil.copyfile(
+                "tests/data/test-data/MaxMind-DB-test-ipv6-24.mmdb", new_path
+            )
+            new_path.replace(path)
+            with self.assertRaisesRegex(OSError, "has changed since the reader"):
+                pickle.loads(data)  # noqa: S301
+
+            if os.name != "nt":
+                # The identity of the file is only read when pickling.
+                with open_database(str(path), self.mode) as reader:
+                    path.unlink()
+                    with self.assertRaises(FileNotFoundError):
+                        pickle.dumps(reader)
+
     if os.name != "nt":
 
         def test_multiprocessing(self):
@@ -676,6 +1284,30 @@ class TestExtensionReader(BaseTestReader):
     if has_maxminddb_extension():
         reader_class = maxminddb.extension.Reader
 
+    def test_after_fork(self) -> None:
+        filename = "tests/data/test-data/MaxMind-DB-test-ipv4-24.mmdb"
+        closed = open_database(filename, self.mode, pointer_cache_size=16)
+        closed.close()
+        with open_database(filename, self.mode, pointer_cache_size=16) as reader:
+            self._check_ip_v4(reader, filename)
+            # Called in the child process after a fork to reset the readers.
+            maxminddb.extension._after_fork()  # noqa: SLF001
+            self._check_ip_v4(reader, filename)
+
+        # Reads in progress when forking are not counted in the child, where
+        # the threads doing them do not exist. The records of this database
+        # are a single map, so nothing is read after its factory returns.
+        readers: list[Reader] = []
+
+        def fork(value: object) -> object:
+            maxminddb.extension._after_fork()  # noqa: SLF001
+            readers[0].close()
+            return value
+
+        readers.append(open_database(filename, self.mode, map_factory=fork))
+        self.assertEqual(readers[0].get("1.1.1.1"), {"ip": "1.1.1.1"})
+        self.assertTrue(readers[0].closed)
+
 
 @unittest.skipIf(
     not has_maxminddb_extension() and not os.environ.get("MM_FORCE_EXT_TESTS"),
@@ -703,6 +1335,34 @@ class TestMMAPReader(BaseTestReader):
     mode = MODE_MMAP
     reader_class = maxminddb.reader.Reader
 
+    def test_after_fork(self) -> None:
+        with open_database(
+            "tests/data/test-data/GeoIP2-City-Test.mmdb",
+            self.mode,
+            json_cache_size=16,
+            pointer_cache_size=16,
+            string_cache_size=16,
+        ) as reader:
+            expected = reader.get("81.2.69.160")
+            expected_json = reader.get_json("81.2.69.160")
+            decoder = reader._decoder  # noqa: SLF001
+            caches = (
+                reader._json_cache,  # noqa: SLF001
+                decoder._keys,  # noqa: SLF001
+                decoder._pointer_cache,  # noqa: SLF001
+                decoder._strings,  # noqa: SLF001
+            )
+            # Called in the child process after a fork to reset the readers.
+            # The caches are kept when running with the GIL.
+            with mock.patch("sys._is_gil_enabled", return_value=True, create=True):
+                maxminddb.reader._reset_readers()  # noqa: SLF001
+            self.assertTrue(all(caches))
+            with mock.patch("sys._is_gil_enabled", return_value=False, create=True):
+                maxminddb.reader._reset_readers()  # noqa: SLF001
+            self.assertFalse(any(caches))
+            self.assertEqual(reader.get("81.2.69.160"), expected)
+            self.assertEqual(reader.get_json("81.2.69.160"), expected_json)
+
 
 # We want one pure Python test to use IP objects, it doesn't
 # really matter which one.
@@ -719,8 +1379,69 @@ class TestFileReader(BaseTestReader):
 
 class TestMemoryReader(BaseTestReader):
     mode = MODE_MEMORY
+
+    reader_class: type[maxminddb.extension.Reader | maxminddb.reader.Reader]
+    if has_maxminddb_extension():
+        reader_class = maxminddb.extension.Reader
+    else:
+        reader_class = maxminddb.reader.Reader
+
+    def test_bytes_like_objects(self) -> None:
+        filename = "tests/data/test-data/MaxMind-DB-test-ipv4-24.mmdb"
+        with open(filename, "rb") as f:
+            data = f.read()
+        for buf in (data, bytearray(data), memoryview(data)):
+            with maxminddb.open_database(buf, MODE_FD) as reader:
+                self.assertIsInstance(reader, self.reader_class)
+                self._check_ip_v4(reader, filename)
+
+
+class TestPythonMemoryReader(TestMemoryReader):
     reader_class = maxminddb.reader.Reader
 
+    def setUp(self) -> None:
+        patcher = mock.patch("maxminddb._extension", None)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+
+
+class TestHybridReader(BaseTestReader):
+    mode = MODE_HYBRID
+    reader_class = maxminddb.reader.Reader
+
+    def test_search_tree_in_memory(self) -> None:
+        for file_cache_size in (0, 16):
+            with open_database(
+                "tests/data/test-data/GeoIP2-City-Test.mmdb",
+                self.mode,
+                file_cache_size=file_cache_size,
+            ) as reader:
+                tree = reader._tree  # noqa: SLF001
+                self.assertIsInstance(tree, bytes)
+                self.assertEqual(
+                    len(cast("bytes", tree)),
+                    reader.metadata().search_tree_size,
+                )
+                self.assertEqual(
+                    cast("dict", reader.get("81.2.69.160"))["city"]["geoname_id"],
+                    2643743,
+                )
+
+    def test_file_buffer(self) -> None:
+        with mock.patch("maxminddb.reader.mmap", None):
+            reader = open_database(
+                "tests/data/test-data/GeoIP2-City-Test.mmdb",
+                self.mode,
+                file_cache_size=16,
+            )
+        with reader:
+            self.assertIsInstance(reader._buffer, FileBuffer)  # noqa: SLF001
+            self.assertEqual(
+                cast("dict", reader.get("81.2.69.160"))["city"]["geoname_id"],
+                2643743,
+            )
+            self.assertGreater(cast("CacheInfo", reader.file_cache_info()).misses, 0)
+
 
 class TestFDReader(BaseTestReader):
     def setUp(self) -> None:
@@ -730,8 +1451,32 @@ class TestFDReader(BaseTestReader):
         self.open_database.side_effect = get_reader_from_file_descriptor
 
     mode = MODE_FD
+
+    reader_class: type[maxminddb.extension.Reader | maxminddb.reader.Reader]
+    if has_maxminddb_extension():
+        reader_class = maxminddb.extension.Reader
+    else:
+        reader_class = maxminddb.reader.Reader
+
+    def test_nondatabase_descriptor(self) -> None:
+        with open("README.rst", "rb") as f:
+            fd = f.fileno()
+            with self.assertRaisesRegex(
+                InvalidDatabaseError,
+                rf"Error opening database file \(<fd {fd}>\)",
+            ):
+                maxminddb.open_database(fd, MODE_FD)
+
+
+class TestPythonFDReader(TestFDReader):
     reader_class = maxminddb.reader.Reader
 
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = mock.patch("maxminddb._extension", None)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+
 
 class TestOldReader(unittest.TestCase):
     def test_old_reader(self) -> None:
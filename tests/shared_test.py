@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import mmap
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+import uuid
+from multiprocessing.shared_memory import SharedMemory
+from typing import cast
+
+import maxminddb
+import maxminddb.reader
+from maxminddb.const import Mode
+from maxminddb.shared import load_memfd, load_shared_memory, shared_reader
+
+DATABASE = "tests/data/test-data/GeoIP2-City-Test.mmdb"
+
+
+class TestShared(unittest.TestCase):
+    def setUp(self) -> None:
+        with maxminddb.open_database(DATABASE, Mode.MEMORY) as reader:
+            self.expected = list(reader)
+
+    def check_readers(self, database: memoryview | int) -> None:
+        for reader in (
+            maxminddb.open_database(database, Mode.FD),
+            maxminddb.reader.Reader(database, Mode.FD),
+        ):
+            with reader:
+                self.assertEqual(list(reader), self.expected)
+                self.assertEqual(
+                    cast("dict", reader.get("81.2.69.160"))["city"]["geoname_id"],
+                    2643743,
+                )
+                if isinstance(reader, maxminddb.reader.Reader):
+                    # The memory is read in place rather than copied.
+                    self.assertIsInstance(reader._buffer, mmap.mmap)  # noqa: SLF001
+
+    def test_shared_memory(self) -> None:
+        block = load_shared_memory(DATABASE)
+        self.addCleanup(block.unlink)
+        self.addCleanup(block.close)
+        self.check_readers(cast("memoryview", block.buf))
+
+        # Another process attaches to the block by name.
+        attached = SharedMemory(name=block.name)
+        self.addCleanup(attached.close)
+        self.check_readers(cast("memoryview", attached.buf))
+
+    def test_shared_memory_invalid_database(self) -> None:
+        name = f"maxminddb-test-{uuid.uuid4().hex[:8]}"
+        with self.assertRaisesRegex(
+            maxminddb.InvalidDatabaseError,
+            "Is this a valid MaxMind DB file",
+        ):
+            load_shared_memory("README.rst", name=name)
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name=name)
+
+    @unittest.skipUnless(hasattr(os, "memfd_create"), "memfd requires Linux")
+    def test_memfd(self) -> None:
+        fd = load_memfd(DATABASE)
+        self.addCleanup(os.close, fd)
+        self.check_readers(fd)
+        with self.assertRaises(PermissionError):
+            os.pwrite(fd, b"\x00", 0)
+
+    @unittest.skipUnless(hasattr(os, "memfd_create"), "memfd requires Linux")
+    def test_memfd_invalid_database(self) -> None:
+        with self.assertRaisesRegex(
+            maxminddb.InvalidDatabaseError,
+            "Is this a valid MaxMind DB file",
+        ):
+            load_memfd("README.rst")
+
+    def test_shared_reader(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "db.mmdb"
+            shutil.copyfile(DATABASE, path)
+            first = shared_reader(path)
+            second = shared_reader(str(path))
+            reader = first._reader()  # noqa: SLF001
+            self.assertIs(second._reader(), reader)  # noqa: SLF001
+            self.assertEqual(list(second), self.expected)
+            self.assertEqual(
+                cast("dict", first.get("81.2.69.160"))["city"]["geoname_id"],
+                2643743,
+            )
+
+            # Other options use another reader.
+            with shared_reader(path, Mode.MEMORY) as other:
+                self.assertIsNot(other._reader(), reader)  # noqa: SLF001
+
+            # Replacing the file opens the new file.
+            new_path = path.with_suffix(".new")
+            shutil.copyfile("tests/data/test-data/GeoIP2-Country-Test.mmdb", new_path)
+            new_path.replace(path)
+            with shared_reader(path) as replaced:
+                self.assertEqual(
+                    replaced.metadata().database_type,
+                    "GeoIP2-Country",
+                )
+                self.assertEqual(first.metadata().database_type, "GeoIP2-City")
+
+            first.close()
+            first.close()
+            self.assertTrue(first.closed)
+            self.assertFalse(reader.closed)
+            with self.assertRaisesRegex(ValueError, "closed MaxMind DB"):
+                first.get("81.2.69.160")
+            second.close()
+            self.assertTrue(reader.closed)